@@ -1,8 +1,15 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
+import threading
 from dotenv import load_dotenv
 from basic_bot import BasicBot
+from bot_pool import BotPool, AccountConfig, DEFAULT_ACCOUNT, accounts_from_env
+from risk_engine import RiskRejected
+from twap_engine import TwapEngine
+from event_broadcaster import EventBroadcaster
+from lazy_imports import lazy_import
+import metrics
 import logging
 
 load_dotenv()
@@ -14,22 +21,56 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 bot = None
+twap_engine = None
 last_init_error = None
+last_recovery = None
+# Recovery results of sub-accounts, by account id
+account_recovery = {}
+_init_lock = threading.Lock()
+# One producer per event source, fanned out to every open dashboard
+broadcaster = EventBroadcaster()
+
+# numpy and the backtest module load on the first market-data request, not at cold start
+market_store = lazy_import('market_store')
+_store = None
+# Close SSE connections periodically so proxies and dead clients do not hold them forever;
+# EventSource reconnects on its own
+STREAM_MAX_SECONDS = 300
 # Environment variables loaded from Vercel
 
+# One bot per account (API_KEY/API_SECRET plus BOT_ACCOUNTS); requests pick one with ``account``
+pool = BotPool(lambda config: build_account_bot(config), accounts_from_env(),
+               max_workers=int(os.getenv('BOT_POOL_WORKERS', '8')))
+
 def initialize_bot():
-    global bot, last_init_error
+    global bot, twap_engine, last_init_error
     try:
         api_key = os.getenv('API_KEY') or os.environ.get('API_KEY')
         api_secret = os.getenv('API_SECRET') or os.environ.get('API_SECRET')
+        fake_exchange = os.getenv('BOT_FAKE_EXCHANGE') == '1'
         
-        if not api_key or not api_secret:
+        if fake_exchange:
+            api_key, api_secret = api_key or 'fake', api_secret or 'fake'
+        elif not api_key or not api_secret:
             last_init_error = f"Missing credentials. API_KEY set: {bool(api_key)}, API_SECRET set: {bool(api_secret)}"
             logger.error(last_init_error)
             return False
         
         logger.info(f"Initializing bot with API key: {api_key[:10]}...")
-        bot = BasicBot(api_key, api_secret, testnet=True)
+        if bot is not None and hasattr(bot, 'stop_streams'):
+            bot.stop_streams()
+        bot = build_bot(AccountConfig(DEFAULT_ACCOUNT, api_key, api_secret), primary=True)
+        for config in accounts_from_env().values():
+            pool.add_account(config)
+        pool.add_account(AccountConfig(DEFAULT_ACCOUNT, api_key, api_secret))
+        pool.put(DEFAULT_ACCOUNT, bot)
+        if twap_engine is None:
+            twap_engine = TwapEngine(bot)
+            twap_engine.add_listener(broadcaster.publish)
+        else:
+            twap_engine.bot = bot
+        if getattr(bot, 'journal', None) is not None:
+            threading.Thread(target=recover_default, args=(bot, twap_engine), name='recovery', daemon=True).start()
         logger.info("Bot initialized successfully")
         return True
     except Exception as e:
@@ -37,24 +78,149 @@ def initialize_bot():
         logger.error(f"Failed to initialize bot: {e}")
         return False
 
+def build_bot(config, primary=False):
+    """Build one account's bot. Only the primary (default) account feeds dashboards and runs TWAP jobs."""
+    journal_account = None if config.account_id == DEFAULT_ACCOUNT else config.account_id
+    if os.getenv('BOT_FAKE_EXCHANGE') == '1':
+        # In-process exchange for load tests and demos; no keys, no network, no user-data stream
+        from fake_exchange import FakeFuturesClient
+        from order_journal import OrderJournal
+        # The fake forgets its orders on restart, so they must not be reconciled from the real journal
+        journal = OrderJournal(':memory:') if os.getenv('BOT_JOURNAL', '1') != '0' else None
+        new_bot = BasicBot(config.api_key, config.api_secret, testnet=config.testnet,
+                           client=FakeFuturesClient.from_env(), journal=journal)
+        new_bot.logger.warning("Using the in-process FAKE exchange (BOT_FAKE_EXCHANGE=1)")
+        if primary:
+            new_bot.oco_manager.add_listener(broadcaster.publish)
+            new_bot.position_book.add_listener(broadcaster.publish)
+    elif os.getenv('BOT_ASYNC_CLIENT') == '1':
+        from async_bot import create_sync_bot
+        new_bot = create_sync_bot(config.api_key, config.api_secret, testnet=config.testnet)
+    else:
+        from order_journal import OrderJournal
+        new_bot = BasicBot(config.api_key, config.api_secret, testnet=config.testnet,
+                           journal=OrderJournal.open_default(account=journal_account) if journal_account else None)
+        if os.getenv('BOT_USER_STREAM', '1') == '1':
+            # Serve order status and balances from memory once the stream is up
+            stream = new_bot.start_user_stream()
+            if primary:
+                stream.add_listener(broadcaster.publish)
+            # Positions seed once, then follow fills and the mark-price stream
+            new_bot.start_position_stream()
+        if primary:
+            new_bot.oco_manager.add_listener(broadcaster.publish)
+            new_bot.position_book.add_listener(broadcaster.publish)
+    return new_bot
+
+def build_account_bot(config):
+    """BotPool factory: the default account goes through get_bot, sub-accounts get their own bot."""
+    if config.account_id == DEFAULT_ACCOUNT:
+        default_bot = get_bot()
+        if default_bot is None:
+            raise ValueError(f"Bot not initialized: {last_init_error}")
+        return default_bot
+    account_bot = build_bot(config)
+    if getattr(account_bot, 'journal', None) is not None:
+        threading.Thread(target=recover_account, args=(config.account_id, account_bot),
+                         name=f'recovery-{config.account_id}', daemon=True).start()
+    return account_bot
+
+def recover_state(recovering_bot, engine=None):
+    """Reconcile journaled orders with the exchange, then resume OCO pairs and TWAP jobs that were running."""
+    try:
+        orders = recovering_bot.reconcile_orders()
+        pairs = recovering_bot.oco_manager.resume()
+        resumed = engine.resume() if engine is not None else []
+        return {
+            'orders': orders,
+            'resumedOcoGroups': [pair.group_id for pair in pairs],
+            'resumedTwapJobs': [job.job_id for job in resumed],
+        }
+    except Exception as e:
+        logger.error(f"Order recovery failed: {e}")
+        return {'error': str(e)}
+
+def recover_default(recovering_bot, engine):
+    global last_recovery
+    last_recovery = recover_state(recovering_bot, engine)
+
+def recover_account(account_id, recovering_bot):
+    account_recovery[account_id] = recover_state(recovering_bot)
+
+def get_bot(account=None):
+    """Return the shared bot, creating it on first use; ``account`` picks a sub-account's bot from the pool.
+
+    Concurrent first requests wait on one initialization instead of each building
+    their own client. Construction does no network I/O. An unknown account raises ValueError.
+    """
+    if account is not None and account != DEFAULT_ACCOUNT:
+        return pool.get(account)
+    if bot is not None:
+        return bot
+    with _init_lock:
+        if bot is None:
+            initialize_bot()
+    return bot
+
+def request_account():
+    """The ``account`` a request targets, from the query string or the JSON body; None is the default account."""
+    account = request.args.get('account')
+    if account is None and request.is_json:
+        account = (request.get_json(silent=True) or {}).get('account')
+    return account
+
+def requested_accounts():
+    """``?accounts=a,b`` for fan-out routes; None means every configured account."""
+    names = request.args.get('accounts')
+    return [name.strip() for name in names.split(',') if name.strip()] if names else None
+
+def current_bot(account=None):
+    """The bot already built for ``account`` (default: the shared one), without building it."""
+    if account is None or account == DEFAULT_ACCOUNT:
+        return bot
+    return pool.peek(account)
+
+def live_stream_ready():
+    stream = getattr(bot, 'user_stream', None)
+    return stream is not None and stream.ready
+
+def publish_order(order, source):
+    # Dashboards follow the default account; with its user-data stream up, order events reach them from the exchange
+    if source is bot and not live_stream_ready():
+        broadcaster.publish('order', order)
+
+def bot_unavailable():
+    return jsonify({'success': False, 'message': 'Bot not initialized. Failed to connect to API.', 'details': last_init_error}), 400
+
+def order_error(error):
+    body = {'success': False, 'message': str(error)}
+    if isinstance(error, RiskRejected):
+        # Which checks failed, with their limits, so clients can show more than a string
+        body['risk'] = error.to_dict()
+    return jsonify(body), 400
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/api/init', methods=['POST'])
 def init_bot():
-    if initialize_bot():
-        return jsonify({'success': True, 'message': 'Bot initialized successfully'})
-    return jsonify({'success': False, 'message': 'Failed to initialize bot'}), 500
+    with _init_lock:
+        initialized = initialize_bot()
+    if initialized:
+        try:
+            bot.check_connection()
+            return jsonify({'success': True, 'message': 'Bot initialized successfully'})
+        except Exception as e:
+            return jsonify({'success': False, 'message': f'Bot initialized but API is unreachable: {e}'}), 500
+    return jsonify({'success': False, 'message': 'Failed to initialize bot', 'details': last_init_error}), 500
 
 @app.route('/api/market-order', methods=['POST'])
 def market_order():
     try:
-        # Reinitialize bot if needed
+        bot = get_bot(request_account())
         if bot is None:
-            logger.info("Bot is None, reinitializing...")
-            if not initialize_bot():
-                return jsonify({'success': False, 'message': 'Bot not initialized. Failed to connect to API.'}), 400
+            return bot_unavailable()
         
         data = request.json
         order = bot.place_market_order(
@@ -62,20 +228,18 @@ def market_order():
             data['side'],
             float(data['quantity'])
         )
+        publish_order(order, bot)
         return jsonify({'success': True, 'order': order})
     except Exception as e:
         logger.error(f"Market order error: {e}")
-        return jsonify({'success': False, 'message': str(e)}), 400
+        return order_error(e)
 
 @app.route('/api/limit-order', methods=['POST'])
 def limit_order():
-    global bot
     try:
-        # Reinitialize bot if needed
+        bot = get_bot(request_account())
         if bot is None:
-            logger.info("Bot is None, reinitializing...")
-            if not initialize_bot():
-                return jsonify({'success': False, 'message': 'Bot not initialized. Failed to connect to API.'}), 400
+            return bot_unavailable()
         
         data = request.json
         order = bot.place_limit_order(
@@ -84,14 +248,19 @@ def limit_order():
             float(data['quantity']),
             float(data['price'])
         )
+        publish_order(order, bot)
         return jsonify({'success': True, 'order': order})
     except Exception as e:
         logger.error(f"Limit order error: {e}")
-        return jsonify({'success': False, 'message': str(e)}), 400
+        return order_error(e)
 
 @app.route('/api/stop-limit-order', methods=['POST'])
 def stop_limit_order():
     try:
+        bot = get_bot(request_account())
+        if bot is None:
+            return bot_unavailable()
+        
         data = request.json
         order = bot.place_stop_limit_order(
             data['symbol'],
@@ -100,13 +269,18 @@ def stop_limit_order():
             float(data['price']),
             float(data['stopPrice'])
         )
+        publish_order(order, bot)
         return jsonify({'success': True, 'order': order})
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 400
+        return order_error(e)
 
 @app.route('/api/oco-order', methods=['POST'])
 def oco_order():
     try:
+        bot = get_bot(request_account())
+        if bot is None:
+            return bot_unavailable()
+        
         data = request.json
         order = bot.place_oco_order(
             data['symbol'],
@@ -115,34 +289,116 @@ def oco_order():
             float(data['takeProfitPrice']),
             float(data['stopLossPrice'])
         )
+        publish_order(order['take_profit_order'], bot)
+        publish_order(order['stop_loss_order'], bot)
         return jsonify({'success': True, 'order': order})
     except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 400
+        return order_error(e)
+
+@app.route('/api/oco', methods=['GET'])
+def oco_pairs():
+    manager = getattr(current_bot(request_account()), 'oco_manager', None)
+    pairs = manager.list_pairs() if manager else []
+    return jsonify({'success': True, 'pairs': [pair.to_dict() for pair in pairs]})
+
+@app.route('/api/oco/<group_id>', methods=['GET'])
+def oco_status(group_id):
+    manager = getattr(current_bot(request_account()), 'oco_manager', None)
+    pair = manager.get(group_id) if manager else None
+    if pair is None:
+        return jsonify({'success': False, 'message': f'Unknown OCO group: {group_id}'}), 404
+    return jsonify({'success': True, 'pair': pair.to_dict()})
+
+@app.route('/api/orders/batch', methods=['POST'])
+def batch_orders():
+    try:
+        bot = get_bot(request_account())
+        if bot is None:
+            return bot_unavailable()
+        
+        data = request.json
+        results = bot.place_orders_batch(data['orders'])
+        for result in results:
+            if result['success']:
+                publish_order(result['order'], bot)
+        return jsonify({
+            'success': all(r['success'] for r in results),
+            'placed': sum(1 for r in results if r['success']),
+            'results': results
+        })
+    except Exception as e:
+        logger.error(f"Batch order error: {e}")
+        return order_error(e)
 
 @app.route('/api/twap', methods=['POST'])
 def twap_strategy():
     try:
+        if get_bot() is None:
+            return bot_unavailable()
+        
         data = request.json
-        result = bot.execute_twap(
+        job = twap_engine.submit(
             data['symbol'],
             data['side'],
             float(data['totalQuantity']),
             int(data['duration']),
             int(data.get('numOrders', 10))
         )
-        return jsonify({'success': True, 'result': result})
+        return jsonify({'success': True, 'job': job.to_dict(include_slices=False)}), 202
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 400
 
+@app.route('/api/vwap', methods=['POST'])
+def vwap_strategy():
+    try:
+        if get_bot() is None:
+            return bot_unavailable()
+        
+        data = request.json
+        limit_offset_ticks = data.get('limitOffsetTicks', 0)
+        job = twap_engine.submit_vwap(
+            data['symbol'],
+            data['side'],
+            float(data['totalQuantity']),
+            int(data['duration']),
+            int(data.get('numOrders', 10)),
+            participation_cap=float(data.get('participationCap', 0.1)),
+            limit_offset_ticks=int(limit_offset_ticks) if limit_offset_ticks is not None else None,
+            limit_wait_fraction=float(data.get('limitWaitFraction', 0.5))
+        )
+        return jsonify({'success': True, 'job': job.to_dict(include_slices=False)}), 202
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/twap/jobs', methods=['GET'])
+def twap_jobs():
+    jobs = twap_engine.list_jobs() if twap_engine else []
+    return jsonify({'success': True, 'jobs': [job.to_dict(include_slices=False) for job in jobs]})
+
+@app.route('/api/twap/<job_id>', methods=['GET'])
+@app.route('/api/vwap/<job_id>', methods=['GET'])
+def twap_status(job_id):
+    job = twap_engine.get_job(job_id) if twap_engine else None
+    if job is None:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@app.route('/api/twap/<job_id>/cancel', methods=['POST'])
+@app.route('/api/vwap/<job_id>/cancel', methods=['POST'])
+def twap_cancel(job_id):
+    job = twap_engine.get_job(job_id) if twap_engine else None
+    if job is None:
+        return jsonify({'success': False, 'message': f'Unknown job: {job_id}'}), 404
+    if not twap_engine.cancel(job_id):
+        return jsonify({'success': False, 'message': f'{job.strategy} job already {job.status}', 'job': job.to_dict()}), 409
+    return jsonify({'success': True, 'job': job.to_dict()})
+
 @app.route('/api/balance', methods=['GET'])
 def get_balance():
-    global bot
     try:
-        # Reinitialize bot if needed
+        bot = get_bot(request_account())
         if bot is None:
-            logger.info("Bot is None, reinitializing...")
-            if not initialize_bot():
-                return jsonify({'success': False, 'message': 'Bot not initialized. Failed to connect to API.', 'details': last_init_error}), 400
+            return bot_unavailable()
         
         balance = bot.get_account_balance()
         return jsonify({'success': True, 'balance': balance})
@@ -150,15 +406,173 @@ def get_balance():
         logger.error(f"Balance error: {e}")
         return jsonify({'success': False, 'message': str(e)}), 400
 
+@app.route('/api/positions', methods=['GET'])
+def positions():
+    """Per-symbol positions, entry and mark prices and PnL from memory; ``?resync=1`` reloads them from the exchange."""
+    try:
+        bot = get_bot(request_account())
+        if bot is None:
+            return bot_unavailable()
+        if not hasattr(bot, 'get_positions'):
+            return jsonify({'success': False, 'message': 'Positions not available with this client'}), 400
+        
+        book = bot.get_positions(resync=request.args.get('resync') == '1')
+        return jsonify({'success': True, **book})
+    except Exception as e:
+        logger.error(f"Positions error: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/risk', methods=['GET'])
+def risk_status():
+    """Risk limits, kill-switch state, today's PnL and the current order rate."""
+    target = current_bot(request_account())
+    if target is None or not hasattr(target, 'get_risk_status'):
+        return jsonify({'success': False, 'message': 'Risk engine not available'}), 400
+    return jsonify({'success': True, 'risk': target.get_risk_status()})
+
+@app.route('/api/risk/kill-switch', methods=['POST'])
+def risk_kill_switch():
+    """``{"active": true, "reason": "..."}`` blocks every order that does not reduce a position; false releases it."""
+    try:
+        target = current_bot(request_account())
+        if target is None or not hasattr(target, 'risk'):
+            return jsonify({'success': False, 'message': 'Risk engine not available'}), 400
+        data = request.json or {}
+        if data.get('active', True):
+            target.risk.trip(data.get('reason') or 'Engaged via API')
+        else:
+            target.risk.reset()
+        return jsonify({'success': True, 'risk': target.get_risk_status()})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
 @app.route('/api/order-status', methods=['POST'])
 def order_status():
     try:
+        bot = get_bot(request_account())
+        if bot is None:
+            return bot_unavailable()
+        
         data = request.json
         order = bot.get_order_status(data['symbol'], int(data['orderId']))
         return jsonify({'success': True, 'order': order})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 400
 
+@app.route('/api/orderbook/<symbol>', methods=['GET'])
+def order_book(symbol):
+    """Best bid/ask, mid, spread and top levels from the local book; watching starts on first request."""
+    try:
+        bot = get_bot()
+        if bot is None:
+            return bot_unavailable()
+        if not hasattr(bot, 'watch_order_book'):
+            return jsonify({'success': False, 'message': 'Order book not available with this client'}), 400
+        
+        book = bot.get_order_book(symbol) or bot.watch_order_book(symbol)
+        levels = min(int(request.args.get('levels', 10)), 100)
+        return jsonify({'success': True, 'book': book.snapshot(levels)})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/klines/<symbol>', methods=['GET'])
+def stored_klines(symbol):
+    """Recent 1m klines from the local market-data store (filled by `python market_store.py sync`)."""
+    global _store
+    try:
+        if _store is None:
+            _store = market_store.MarketStore()
+        limit = min(int(request.args.get('limit', 500)), 5000)
+        start = request.args.get('startTime')
+        klines = _store.klines(symbol, start=int(start) if start else None)
+        rows = {name: values[:limit] if start else values[-limit:] for name, values in klines.items()}
+        return jsonify({
+            'success': True,
+            'symbol': symbol.upper(),
+            'klines': [list(row) for row in zip(rows['open_time'].tolist(), rows['open'].tolist(),
+                                                rows['high'].tolist(), rows['low'].tolist(),
+                                                rows['close'].tolist(), rows['volume'].tolist())],
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+@app.route('/api/stream', methods=['GET'])
+def event_stream():
+    """Push order updates, TWAP progress, position and balance changes as Server-Sent Events.
+
+    Every tab reads from the same in-process broadcaster, so open dashboards add
+    no exchange API load. The initial snapshot is served from memory only.
+    """
+    get_bot()
+
+    def initial_frames():
+        if live_stream_ready():
+            yield broadcaster.format_event('balance', bot.user_stream.get_balances())
+        book = getattr(bot, 'position_book', None)
+        if book is not None and book.seeded:
+            for position in book.snapshot()['positions']:
+                yield broadcaster.format_event('position', position)
+        if twap_engine is not None:
+            for job in twap_engine.list_jobs():
+                if not job.done:
+                    yield broadcaster.format_event('twap', job.to_dict(include_slices=False))
+
+    def generate():
+        subscription = broadcaster.subscribe()
+        yield from broadcaster.stream(subscription, initial_frames(), max_seconds=STREAM_MAX_SECONDS)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+@app.route('/api/rate-limits', methods=['GET'])
+def rate_limits():
+    target = current_bot(request_account())
+    if target is None or not hasattr(target, 'get_rate_limit_status'):
+        return jsonify({'success': False, 'message': 'Rate limiter not available'}), 400
+    return jsonify({'success': True, 'rateLimits': target.get_rate_limit_status()})
+
+@app.route('/api/accounts', methods=['GET'])
+def accounts():
+    """Configured accounts, whether each bot is built yet, and its rate-limit headroom."""
+    get_bot()
+    rows = pool.snapshot()
+    for row in rows:
+        account_bot = current_bot(row['account'])
+        if account_bot is not None and hasattr(account_bot, 'get_rate_limit_status'):
+            row['rateLimits'] = account_bot.get_rate_limit_status()
+        if row['account'] in account_recovery:
+            row['recovery'] = account_recovery[row['account']]
+    return jsonify({'success': True, 'accounts': rows})
+
+@app.route('/api/accounts/balance', methods=['GET'])
+def accounts_balance():
+    """Balances of every account (or ``?accounts=a,b``), fetched concurrently; one failure does not fail the rest."""
+    get_bot()
+    results = pool.fan_out(lambda account_bot: account_bot.get_account_balance(), requested_accounts())
+    return jsonify({'success': all(r['success'] for r in results.values()), 'accounts': results})
+
+@app.route('/api/accounts/positions', methods=['GET'])
+def accounts_positions():
+    """Positions and PnL of every account, fetched concurrently, with totals across them."""
+    get_bot()
+    resync = request.args.get('resync') == '1'
+    results = pool.fan_out(lambda account_bot: account_bot.get_positions(resync=resync), requested_accounts())
+    books = [r['result'] for r in results.values() if r['success']]
+    totals = {key: sum(book['totals'][key] for book in books)
+              for key in ('unrealizedPnl', 'realizedPnl', 'grossNotional', 'openPositions')}
+    return jsonify({'success': all(r['success'] for r in results.values()), 'accounts': results, 'totals': totals})
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Exchange call latency/errors/weight and order-stage timings in Prometheus text format."""
+    if bot is not None and hasattr(bot, 'get_rate_limit_status'):
+        status = bot.get_rate_limit_status()
+        for bucket in ('weight_headroom_1m', 'orders_headroom_10s', 'orders_headroom_1m'):
+            metrics.RATE_LIMIT_HEADROOM.set(status[bucket], (bucket,))
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Expose environment and bot init status for debugging in serverless."""
@@ -169,13 +583,17 @@ def health():
         'env': {
             'API_KEY': api_key_exists,
             'API_SECRET': api_secret_exists,
+            'BOT_FAKE_EXCHANGE': os.getenv('BOT_FAKE_EXCHANGE') == '1',
         },
         'botInitialized': bot is not None,
+        'accounts': pool.account_ids,
         'lastInitError': last_init_error,
+        'recovery': last_recovery,
+        'ocoActive': bot.oco_manager.active_count if getattr(bot, 'oco_manager', None) else None,
+        'riskKillSwitch': bot.risk.killed_by is not None if getattr(bot, 'risk', None) else None,
+        'userStream': bot.user_stream.snapshot() if getattr(bot, 'user_stream', None) else None,
+        'dashboardSubscribers': broadcaster.subscriber_count,
     })
 
-# Initialize bot on module load for Vercel
-initialize_bot()
-
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,425 @@
+import asyncio
+import threading
+import time
+from typing import Optional, Dict, Any
+
+import aiohttp
+from binance.async_client import AsyncClient
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+from basic_bot import (BaseBot, DUPLICATE_CLIENT_ID_CODE, ORDER_NOT_FOUND_CODE, MARK_MAX_AGE_SECONDS,
+                       ORDER_RETRIES, ORDER_RETRY_BACKOFF, TRANSIENT_ERROR_CODES)
+from order_ids import ClientOrderIds, OrderDedupIndex
+from metrics import RISK_PRICE_FALLBACKS
+from positions import PositionBook
+from rate_limiter import RateLimiter, AsyncRateLimitedClient
+from risk_engine import RiskEngine, RiskLimits, RiskRejected
+from symbol_filters import SymbolFilterCache
+
+
+class AsyncBasicBot(BaseBot):
+    """asyncio counterpart of BasicBot.
+
+    All requests share one AsyncClient and its aiohttp connection pool, so many
+    orders can be in flight at once. Every call goes through the same kind of
+    RateLimiter budget as BasicBot's, awaited rather than blocking. Create it
+    with ``await AsyncBasicBot.create(...)`` and release the pool with
+    ``await bot.close()``.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True, pool_size: int = 100,
+                 filters_ttl: float = 3600.0, client=None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self.pool_size = pool_size
+        # Injected AsyncClient stand-in (e.g. fake_exchange.AsyncFakeFuturesClient); wrapped on connect
+        self._injected_client = client
+        self.client: Optional[AsyncRateLimitedClient] = None
+        self.rate_limiter = RateLimiter()
+        self.client_order_ids = ClientOrderIds()
+        self.order_index = OrderDedupIndex()
+        # client order id -> set once its submission finishes; only touched from the event loop
+        self._inflight: Dict[str, asyncio.Event] = {}
+        # Folded from this bot's own order responses; there is no REST seed or mark stream here
+        self.position_book = PositionBook(None)
+        # The same pre-trade checks as BasicBot; a stale mark is refetched in the background, never awaited
+        self.risk = RiskEngine(RiskLimits.from_env(), self.position_book, self._mark_price)
+        self._mark_refreshes: Dict[str, asyncio.Task] = {}
+        # Refreshed from the event loop by _ensure_symbol_filters, so the cache itself has no loader
+        self.symbol_filters = SymbolFilterCache(ttl=filters_ttl)
+
+        self._setup_logging()
+
+    @classmethod
+    async def create(cls, api_key: str, api_secret: str, testnet: bool = True,
+                     pool_size: int = 100, client=None) -> 'AsyncBasicBot':
+        bot = cls(api_key, api_secret, testnet=testnet, pool_size=pool_size, client=client)
+        await bot.connect()
+        return bot
+
+    async def connect(self):
+        if self.client is not None:
+            return
+        if self._injected_client is not None:
+            self.client = AsyncRateLimitedClient(self._injected_client, self.rate_limiter)
+            return
+
+        # The plain constructor (unlike AsyncClient.create) does not ping, so connecting is free of network I/O
+        connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300, keepalive_timeout=60)
+        self.client = AsyncRateLimitedClient(AsyncClient(
+            self.api_key,
+            self.api_secret,
+            testnet=self.testnet,
+            session_params={'connector': connector}
+        ), self.rate_limiter)
+
+        if self.testnet:
+            self.logger.info("Using Binance Futures TESTNET: https://testnet.binancefuture.com")
+        else:
+            self.logger.warning("Using Binance Futures PRODUCTION environment")
+
+    async def check_connection(self) -> bool:
+        try:
+            await self.client.ping()
+            self.logger.info("Successfully connected to Binance Futures API (async)")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to connect to Binance API: {e}")
+            raise
+
+    async def close(self):
+        for task in list(self._mark_refreshes.values()):
+            task.cancel()
+        if self.client is not None:
+            await self.client.close_connection()
+            self.client = None
+
+    async def _ensure_symbol_filters(self):
+        if not self.symbol_filters.needs_refresh():
+            return
+        try:
+            exchange_info = await self.client.futures_exchange_info()
+            self.rate_limiter.configure(exchange_info.get('rateLimits'))
+            self.symbol_filters.load(exchange_info)
+        except Exception as e:
+            self.symbol_filters.mark_failed(e)
+
+    def get_rate_limit_status(self) -> Dict[str, Any]:
+        return self.rate_limiter.snapshot()
+
+    def get_risk_status(self) -> Dict[str, Any]:
+        return self.risk.snapshot()
+
+    def _mark_price(self, symbol: str) -> Optional[float]:
+        # Runs inside the risk check on the event loop, so it only reads the cache
+        mark = self.position_book.marks.get(symbol)
+        if mark is not None and time.time() - mark[1] < MARK_MAX_AGE_SECONDS:
+            return mark[0]
+        if symbol not in self._mark_refreshes:
+            task = self._mark_refreshes[symbol] = asyncio.get_running_loop().create_task(self._refresh_mark(symbol))
+            task.add_done_callback(lambda _: self._mark_refreshes.pop(symbol, None))
+        RISK_PRICE_FALLBACKS.inc(('stale_mark' if mark is not None else 'none',))
+        return mark[0] if mark is not None else None
+
+    async def _refresh_mark(self, symbol: str):
+        try:
+            mark_price = await self.client.futures_mark_price(symbol=symbol)
+            self.position_book.on_mark_price(symbol, float(mark_price['markPrice']))
+        except Exception as e:
+            self.logger.warning(f"Mark price for {symbol} unavailable: {e}")
+
+    async def find_order_by_client_id(self, symbol: str, client_order_id: str,
+                                      conditional: bool = False) -> Optional[Dict[str, Any]]:
+        """Look an order up by its client id on the exchange; None if it was never placed."""
+        lookup = {'clientAlgoId': client_order_id} if conditional else {'origClientOrderId': client_order_id}
+        try:
+            return await self.client.futures_get_order(symbol=symbol, **lookup)
+        except BinanceAPIException as e:
+            if e.code == ORDER_NOT_FOUND_CODE:
+                return None
+            raise
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """True when the request may or may not have reached the matching engine."""
+        if isinstance(error, BinanceAPIException):
+            return error.code in TRANSIENT_ERROR_CODES or (error.status_code or 0) >= 500
+        return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError, BinanceRequestException))
+
+    async def _create_order_with_retry(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = self._client_id_key(params)
+        client_order_id = params[key]
+        for attempt in range(ORDER_RETRIES + 1):
+            try:
+                if attempt:
+                    # The previous attempt may have landed; never resend an order that exists
+                    existing = await self.find_order_by_client_id(params['symbol'], client_order_id,
+                                                                  conditional=key == 'clientAlgoId')
+                    if existing is not None:
+                        self.logger.info(f"Order {client_order_id} found after a failed attempt; not resending")
+                        return existing
+                return await self.client.futures_create_order(**params)
+            except BinanceAPIException as e:
+                if e.code == DUPLICATE_CLIENT_ID_CODE:
+                    # Sent before (e.g. by a previous run); the exchange has the original
+                    existing = await self.find_order_by_client_id(params['symbol'], client_order_id,
+                                                                  conditional=key == 'clientAlgoId')
+                    if existing is not None:
+                        return existing
+                if not self._is_transient(e) or attempt == ORDER_RETRIES:
+                    raise
+                error = e
+            except Exception as e:
+                if not self._is_transient(e) or attempt == ORDER_RETRIES:
+                    raise
+                error = e
+            delay = ORDER_RETRY_BACKOFF * 2 ** attempt
+            self.logger.warning(f"Order {client_order_id} attempt {attempt + 1} failed ({error}); "
+                                f"retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _create_order(self, params: Dict[str, Any],
+                            client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send an order under a client id; resending the id returns the original order instead."""
+        params = self._apply_symbol_filters(params)
+        key = self._client_id_key(params)
+        client_order_id = self._assign_client_order_id(params, client_order_id)
+        while True:
+            known = self.order_index.get(client_order_id)
+            if known is not None:
+                self.logger.info(f"Order {client_order_id} already placed; returning the original")
+                return known
+            pending = self._inflight.get(client_order_id)
+            if pending is None:
+                break
+            await pending.wait()
+        pending = self._inflight[client_order_id] = asyncio.Event()
+
+        order = None
+        try:
+            self.risk.check(params)
+            order = await self._create_order_with_retry(params)
+        except (BinanceAPIException, RiskRejected) as e:
+            self._log_order_event('rejected', params, error=e)
+            raise
+        except Exception as e:
+            self._log_order_event('failed', params, error=e)
+            raise
+        finally:
+            if order is not None:
+                self.order_index.remember(client_order_id, order)
+            del self._inflight[client_order_id]
+            pending.set()
+
+        self.position_book.apply_order(order)
+        self._log_order_event('placed', params, order)
+        return order
+
+    async def place_market_order(self, symbol: str, side: str, quantity: float,
+                                 client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        await self._ensure_symbol_filters()
+        symbol = self._validate_symbol(symbol)
+        side = self._validate_side(side)
+        quantity = self._validate_quantity(quantity)
+
+        return await self._create_order({
+            'symbol': symbol, 'side': side, 'type': 'MARKET', 'quantity': quantity
+        }, client_order_id)
+
+    async def place_limit_order(self, symbol: str, side: str, quantity: float, price: float,
+                                time_in_force: str = 'GTC',
+                                client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        await self._ensure_symbol_filters()
+        symbol = self._validate_symbol(symbol)
+        side = self._validate_side(side)
+        quantity = self._validate_quantity(quantity)
+        price = self._validate_price(price)
+
+        return await self._create_order({
+            'symbol': symbol, 'side': side, 'type': 'LIMIT', 'timeInForce': time_in_force,
+            'quantity': quantity, 'price': price
+        }, client_order_id)
+
+    async def place_stop_limit_order(self, symbol: str, side: str, quantity: float,
+                                     price: float, stop_price: float,
+                                     client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        await self._ensure_symbol_filters()
+        symbol = self._validate_symbol(symbol)
+        side = self._validate_side(side)
+        quantity = self._validate_quantity(quantity)
+        price = self._validate_price(price)
+        stop_price = self._validate_price(stop_price)
+
+        return await self._create_order({
+            'symbol': symbol, 'side': side, 'type': 'STOP', 'timeInForce': 'GTC',
+            'quantity': quantity, 'price': price, 'stopPrice': stop_price
+        }, client_order_id)
+
+    async def place_oco_order(self, symbol: str, side: str, quantity: float,
+                              price: float, stop_price: float,
+                              stop_limit_price: Optional[float] = None) -> Dict[str, Any]:
+        await self._ensure_symbol_filters()
+        symbol = self._validate_symbol(symbol)
+        side = self._validate_side(side)
+        quantity = self._validate_quantity(quantity)
+        price = self._validate_price(price)
+        stop_price = self._validate_price(stop_price)
+        stop_limit_price = stop_limit_price if stop_limit_price else stop_price
+
+        opposite_side = 'SELL' if side == 'BUY' else 'BUY'
+
+        self.logger.info(f"PLACING OCO ORDER: {opposite_side} {quantity} {symbol} | TP: {price} | SL: {stop_price}")
+
+        tp_order, sl_order = await asyncio.gather(
+            self.place_limit_order(symbol, opposite_side, quantity, price),
+            self.place_stop_limit_order(symbol, opposite_side, quantity, stop_limit_price, stop_price),
+            return_exceptions=True
+        )
+
+        legs = {'take_profit_order': tp_order, 'stop_loss_order': sl_order}
+        errors = {name: leg for name, leg in legs.items() if isinstance(leg, BaseException)}
+        if errors:
+            for name, order in legs.items():
+                if name not in errors:
+                    await self._rollback_oco_leg(symbol, name, order)
+            failed_leg, error = next(iter(errors.items()))
+            self.logger.error(f"OCO ORDER FAILED on {failed_leg}: {error}")
+            raise error
+
+        self.logger.info("OCO ORDERS PLACED SUCCESSFULLY")
+        return {
+            'oco_type': 'OCO',
+            'take_profit_order': tp_order,
+            'stop_loss_order': sl_order
+        }
+
+    async def _rollback_oco_leg(self, symbol: str, leg: str, order: Dict[str, Any]):
+        if order.get('algoId') is not None:
+            params = {'algoId': order['algoId']}
+        else:
+            params = {'orderId': order.get('orderId')}
+
+        try:
+            self.position_book.apply_order(await self.client.futures_cancel_order(symbol=symbol, **params))
+            self.logger.warning(f"OCO ROLLBACK: cancelled {leg} {params}")
+        except Exception as e:
+            self.logger.critical(f"OCO ROLLBACK FAILED: {leg} {params} is still live without its sibling: {e}")
+
+    async def execute_twap(self, symbol: str, side: str, total_quantity: float,
+                           duration_minutes: int, num_orders: int = 10) -> Dict[str, Any]:
+        # Slice sizes are rounded to the step size when planning
+        await self._ensure_symbol_filters()
+        plan = self._plan_twap(symbol, side, total_quantity, duration_minutes, num_orders)
+
+        self.logger.info(
+            f"EXECUTING TWAP STRATEGY: {plan['side']} {plan['total_quantity']} {plan['symbol']} | "
+            f"Orders: {num_orders} | Interval: {plan['interval_seconds']:.2f}s"
+        )
+
+        executed_orders = []
+
+        try:
+            for i in range(num_orders):
+                order = await self.place_market_order(plan['symbol'], plan['side'], plan['slice_quantities'][i])
+                executed_orders.append(order)
+
+                if i < num_orders - 1:
+                    await asyncio.sleep(plan['interval_seconds'])
+
+            if plan['residue']:
+                self.logger.warning(f"TWAP left {plan['residue']} {plan['symbol']} unsent: below the step size")
+            self.logger.info("TWAP STRATEGY COMPLETED")
+            return {
+                'strategy': 'TWAP',
+                'total_orders': num_orders,
+                'successful_orders': len(executed_orders),
+                'orders': executed_orders,
+                'residue': plan['residue'],
+            }
+        except Exception as e:
+            self.logger.error(f"TWAP FAILED: {e}")
+            raise
+
+    async def get_account_balance(self) -> Dict[str, Any]:
+        try:
+            self.logger.info("Fetching account balance...")
+            return await self.client.futures_account_balance()
+        except Exception as e:
+            self.logger.error(f"Failed to get balance: {e}")
+            raise
+
+    async def get_order_status(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        try:
+            symbol = self._validate_symbol(symbol)
+            self.logger.info(f"Fetching order status for Order ID: {order_id}")
+
+            order = await self.client.futures_get_order(symbol=symbol, orderId=order_id)
+            self.logger.info(f"Order Status: {order.get('status')}")
+            self.position_book.apply_order(order)
+
+            return order
+        except Exception as e:
+            self.logger.error(f"Failed to get order status: {e}")
+            raise
+
+    async def cancel_order(self, symbol: str, order_id: int) -> Dict[str, Any]:
+        try:
+            symbol = self._validate_symbol(symbol)
+            self.logger.info(f"Cancelling order: {order_id}")
+
+            result = await self.client.futures_cancel_order(symbol=symbol, orderId=order_id)
+            self.logger.info(f"Order cancelled: {order_id}")
+            self.position_book.apply_order(result)
+
+            return result
+        except Exception as e:
+            self.logger.error(f"Failed to cancel order: {e}")
+            raise
+
+
+class SyncBotAdapter:
+    """Blocking facade over AsyncBasicBot for Flask and the CLI.
+
+    The async bot lives on a private event loop in a daemon thread. Coroutine
+    methods are exposed as plain blocking methods, and ``submit`` returns a
+    ``concurrent.futures.Future`` so sync callers can fan out many requests.
+    """
+
+    def __init__(self, async_bot: AsyncBasicBot):
+        self._bot = async_bot
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-bot-loop', daemon=True)
+        self._thread.start()
+        self._run(self._bot.connect())
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def submit(self, method: str, *args, **kwargs):
+        return asyncio.run_coroutine_threadsafe(getattr(self._bot, method)(*args, **kwargs), self._loop)
+
+    def close(self):
+        self._run(self._bot.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def _plan_twap(self, *args, **kwargs) -> Dict[str, Any]:
+        # TwapEngine plans synchronously; load the step sizes the slices are rounded to first
+        self._run(self._bot._ensure_symbol_filters())
+        return self._bot._plan_twap(*args, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._bot, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return self._run(attr(*args, **kwargs))
+
+        call.__name__ = name
+        return call
+
+
+def create_sync_bot(api_key: str, api_secret: str, testnet: bool = True) -> SyncBotAdapter:
+    return SyncBotAdapter(AsyncBasicBot(api_key, api_secret, testnet=testnet))
@@ -0,0 +1,332 @@
+"""Vectorized TWAP backtests over historical futures klines or aggTrades.
+
+TWAP runs are started every ``--every`` minutes across the whole history and
+every slice of every run is priced at once with NumPy, so a year of 1-minute
+bars takes seconds. Slicing, sizing and validation come from
+``BaseBot._plan_twap`` (the same code ``BasicBot`` and ``TwapEngine`` run), so
+the parameters being tested are the ones that would go live.
+
+    python backtest.py BTCUSDT-1m-2024.csv --symbol BTCUSDT --side BUY \\
+        --quantity 1 --duration 60 --orders 10 --every 60 --limit-offset 1
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from typing import Optional, Dict, Any
+
+import numpy as np
+
+from basic_bot import BaseBot
+from symbol_filters import SymbolFilterCache
+
+# Column order of Binance's public kline and aggTrades CSV dumps
+KLINE_COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+AGG_TRADE_COLUMNS = ('agg_trade_id', 'price', 'quantity', 'first_trade_id', 'last_trade_id',
+                     'transact_time', 'is_buyer_maker')
+
+
+class Bars:
+    """OHLCV columns as contiguous float64 arrays, one row per fixed-width bar."""
+
+    __slots__ = ('open_time', 'open', 'high', 'low', 'close', 'volume', 'interval_ms')
+
+    def __init__(self, open_time: np.ndarray, open_: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        self.open_time = np.ascontiguousarray(open_time, dtype=np.int64)
+        self.open = np.ascontiguousarray(open_, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume, dtype=np.float64)
+        if len(self.open_time) > 1:
+            self.interval_ms = int(np.median(np.diff(self.open_time[:1000])))
+        else:
+            self.interval_ms = 60_000
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+
+def _read_csv(path: str, usecols) -> np.ndarray:
+    with open(path) as f:
+        first = f.readline()
+    # Newer dumps start with a header row
+    skip = 0 if first[:1].isdigit() else 1
+    return np.loadtxt(path, delimiter=',', usecols=usecols, skiprows=skip, ndmin=2)
+
+
+def _to_millis(times: np.ndarray) -> np.ndarray:
+    times = times.astype(np.int64)
+    # Some dumps switched to microsecond timestamps
+    return times // 1000 if len(times) and times[0] > 10 ** 14 else times
+
+
+def load_klines_csv(path: str) -> Bars:
+    data = _read_csv(path, usecols=range(6))
+    return Bars(_to_millis(data[:, 0]), data[:, 1], data[:, 2], data[:, 3], data[:, 4], data[:, 5])
+
+
+def bars_from_trades(times_ms: np.ndarray, prices: np.ndarray, quantities: np.ndarray,
+                     interval_ms: int = 60_000) -> Bars:
+    """Bucket time-ordered trades into bars; empty buckets carry the previous close with zero volume."""
+    bucket = (times_ms - times_ms[0] // interval_ms * interval_ms) // interval_ms
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)] - 1
+    filled = bucket[starts]
+
+    count = int(bucket[-1]) + 1
+    close = np.full(count, np.nan)
+    close[filled] = prices[ends]
+    # Forward-fill closes through empty buckets
+    last = np.maximum.accumulate(np.where(np.isnan(close), -1, np.arange(count)))
+    close = close[last]
+
+    open_, high, low = close.copy(), close.copy(), close.copy()
+    open_[filled] = prices[starts]
+    high[filled] = np.maximum.reduceat(prices, starts)
+    low[filled] = np.minimum.reduceat(prices, starts)
+    volume = np.zeros(count)
+    volume[filled] = np.add.reduceat(quantities, starts)
+
+    open_time = times_ms[0] // interval_ms * interval_ms + np.arange(count, dtype=np.int64) * interval_ms
+    return Bars(open_time, open_, high, low, close, volume)
+
+
+def load_agg_trades_csv(path: str, interval_ms: int = 60_000) -> Bars:
+    data = _read_csv(path, usecols=(1, 2, 5))
+    return bars_from_trades(_to_millis(data[:, 2]), data[:, 0], data[:, 1], interval_ms)
+
+
+def load_parquet(path: str, interval_ms: int = 60_000) -> Bars:
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise ImportError("Reading Parquet needs pandas and pyarrow: pip install pandas pyarrow") from e
+
+    frame = pd.read_parquet(path)
+    if 'transact_time' in frame.columns:
+        return bars_from_trades(_to_millis(frame['transact_time'].to_numpy()), frame['price'].to_numpy(float),
+                                frame['quantity'].to_numpy(float), interval_ms)
+    return Bars(_to_millis(frame['open_time'].to_numpy()), *(frame[c].to_numpy(float) for c in KLINE_COLUMNS[1:]))
+
+
+def load_bars(path: str, interval_ms: int = 60_000) -> Bars:
+    """Load klines or aggTrades from CSV or Parquet, telling them apart by name or columns."""
+    if path.endswith('.parquet'):
+        return load_parquet(path, interval_ms)
+    with open(path) as f:
+        first = f.readline()
+    if 'aggTrades' in os.path.basename(path) or 'agg_trade_id' in first or first.count(',') == 6:
+        return load_agg_trades_csv(path, interval_ms)
+    return load_klines_csv(path)
+
+
+def synthetic_bars(minutes: int, start_price: float = 50_000.0, volatility: float = 0.0008,
+                   seed: int = 7) -> Bars:
+    """Random-walk 1-minute bars for smoke tests and benchmarks."""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, minutes)))
+    open_ = np.r_[start_price, close[:-1]]
+    wick = np.abs(rng.normal(0, volatility / 2, (2, minutes))) * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+    volume = rng.gamma(2.0, 50.0, minutes)
+    open_time = 1_704_067_200_000 + np.arange(minutes, dtype=np.int64) * 60_000
+    return Bars(open_time, open_, high, low, close, volume)
+
+
+class BacktestBot(BaseBot):
+    """Offline BaseBot: same validation, symbol filters and TWAP planning, no client."""
+
+    def __init__(self, exchange_info: Optional[Dict[str, Any]] = None):
+        self.testnet = True
+        self.logger = logging.getLogger('BasicBot.Backtest')
+        if exchange_info is not None:
+            self.symbol_filters = SymbolFilterCache(ttl=math.inf)
+            self.symbol_filters.load(exchange_info)
+
+
+class BacktestResult:
+
+    def __init__(self, plan: Dict[str, Any], params: Dict[str, Any], start_times: np.ndarray,
+                 arrival: np.ndarray, vwap: np.ndarray, avg_fill: np.ndarray,
+                 passive_fills: np.ndarray, elapsed: float):
+        sign = 1.0 if plan['side'] == 'BUY' else -1.0
+        self.plan = plan
+        self.params = params
+        self.start_times = start_times
+        self.arrival = arrival
+        self.vwap = vwap
+        self.avg_fill = avg_fill
+        self.passive_fills = passive_fills
+        # Positive = paid more than the benchmark (BUY) / received less (SELL)
+        self.slippage_vs_arrival_bps = sign * (avg_fill - arrival) / arrival * 1e4
+        self.slippage_vs_vwap_bps = sign * (avg_fill - vwap) / vwap * 1e4
+        self.elapsed = elapsed
+
+    @staticmethod
+    def _stats(values: np.ndarray) -> Dict[str, float]:
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return {}
+        p5, p50, p95 = np.percentile(values, [5, 50, 95])
+        return {'mean': round(float(values.mean()), 3), 'p5': round(float(p5), 3),
+                'median': round(float(p50), 3), 'p95': round(float(p95), 3)}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'symbol': self.plan['symbol'],
+            'side': self.plan['side'],
+            'total_quantity': self.plan['total_quantity'],
+            'num_orders': self.plan['num_orders'],
+            'interval_seconds': self.plan['interval_seconds'],
+            **self.params,
+            'runs': int(len(self.avg_fill)),
+            'passive_fill_rate': round(float(self.passive_fills.mean()), 4) if self.passive_fills.size else None,
+            'slippage_vs_arrival_bps': self._stats(self.slippage_vs_arrival_bps),
+            'slippage_vs_vwap_bps': self._stats(self.slippage_vs_vwap_bps),
+            'elapsed_seconds': round(self.elapsed, 3),
+        }
+
+
+def _window_extreme(values: np.ndarray, width: int, use_max: bool) -> np.ndarray:
+    if width == 1:
+        return values
+    view = np.lib.stride_tricks.sliding_window_view(values, width)
+    return view.max(axis=1) if use_max else view.min(axis=1)
+
+
+def backtest_twap(bot: BaseBot, bars: Bars, symbol: str, side: str, total_quantity: float,
+                  duration_minutes: float, num_orders: int, start_every_minutes: float = 60.0,
+                  limit_offset_ticks: Optional[int] = None, tick_size: Optional[float] = None,
+                  slippage_bps: float = 1.0) -> BacktestResult:
+    """Replay one TWAP configuration from every ``start_every_minutes`` across ``bars``.
+
+    Fill model per slice:
+
+    * market (``limit_offset_ticks`` is None): the slice bar's open, worsened by
+      ``slippage_bps``;
+    * limit: a passive order ``limit_offset_ticks`` ticks behind the slice bar's
+      open. It fills at its price if the market trades through it before the
+      next slice, otherwise it is replaced by a market order at that bar's close.
+
+    Slices are equal-sized, so the run's average fill is the mean slice price.
+    """
+    started = time.perf_counter()
+    plan = bot._plan_twap(symbol, side, total_quantity, duration_minutes, num_orders)
+    sign = 1.0 if plan['side'] == 'BUY' else -1.0
+
+    bar_ms = bars.interval_ms
+    offsets = np.round(np.arange(num_orders) * plan['interval_seconds'] * 1000 / bar_ms).astype(np.int64)
+    slice_bars = max(1, int(offsets[1] - offsets[0])) if num_orders > 1 else 1
+    run_bars = int(offsets[-1]) + slice_bars
+    step = max(1, int(round(start_every_minutes * 60_000 / bar_ms)))
+
+    if len(bars) <= run_bars:
+        raise ValueError(f"Need more than {run_bars} bars for this TWAP; got {len(bars)}")
+    starts = np.arange(0, len(bars) - run_bars, step)
+    index = starts[:, None] + offsets[None, :]
+
+    reference = bars.open[index]
+    if limit_offset_ticks is None:
+        fills = reference * (1 + sign * slippage_bps / 1e4)
+        passive = np.zeros(0, dtype=bool)
+    else:
+        if tick_size is None:
+            filters = bot.symbol_filters.get(plan['symbol']) if bot.symbol_filters is not None else None
+            if filters is None or not filters.tick_size:
+                raise ValueError("Limit backtests need tick_size or exchange info with a PRICE_FILTER")
+            tick_size = float(filters.tick_size)
+        limit = reference - sign * limit_offset_ticks * tick_size
+        if sign > 0:
+            touched = _window_extreme(bars.low, slice_bars, use_max=False)[index] < limit
+        else:
+            touched = _window_extreme(bars.high, slice_bars, use_max=True)[index] > limit
+        fallback = bars.close[index + slice_bars - 1] * (1 + sign * slippage_bps / 1e4)
+        fills = np.where(touched, limit, fallback)
+        passive = touched
+
+    # Volume-weighted typical price over each run's window
+    typical_volume = np.r_[0.0, np.cumsum((bars.high + bars.low + bars.close) / 3 * bars.volume)]
+    volume = np.r_[0.0, np.cumsum(bars.volume)]
+    ends = starts + run_bars
+    window_volume = volume[ends] - volume[starts]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = (typical_volume[ends] - typical_volume[starts]) / window_volume
+
+    params = {
+        'duration_minutes': duration_minutes,
+        'start_every_minutes': start_every_minutes,
+        'limit_offset_ticks': limit_offset_ticks,
+        'slippage_bps': slippage_bps,
+    }
+    return BacktestResult(plan, params, bars.open_time[starts], bars.open[starts], vwap,
+                          fills.mean(axis=1), passive, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data', nargs='?', help='Kline or aggTrades CSV/Parquet file')
+    parser.add_argument('--synthetic-days', type=float, default=None,
+                        help='Use random-walk 1m bars instead of a data file')
+    parser.add_argument('--store', default=None, help='Read --symbol klines from this MarketStore directory')
+    parser.add_argument('--symbol', default='BTCUSDT')
+    parser.add_argument('--side', default='BUY')
+    parser.add_argument('--quantity', type=float, default=1.0)
+    parser.add_argument('--duration', type=float, default=60, help='TWAP duration in minutes')
+    parser.add_argument('--orders', type=int, default=10)
+    parser.add_argument('--every', type=float, default=60, help='Start a run every N minutes')
+    parser.add_argument('--limit-offset', type=int, default=None,
+                        help='Ticks behind the market for passive limit slices (default: market slices)')
+    parser.add_argument('--tick-size', type=float, default=None)
+    parser.add_argument('--slippage-bps', type=float, default=1.0)
+    parser.add_argument('--exchange-info', default=None,
+                        help='futures exchangeInfo JSON for symbol filters (tick/step sizes)')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    if args.synthetic_days:
+        bars = synthetic_bars(int(args.synthetic_days * 1440))
+    elif args.store:
+        # market_store imports this module for Bars
+        from market_store import MarketStore
+        bars = MarketStore(args.store).bars(args.symbol)
+        if not len(bars):
+            parser.error(f'no {args.symbol} klines in {args.store}')
+    elif args.data:
+        bars = load_bars(args.data)
+    else:
+        parser.error('a data file, --store or --synthetic-days is required')
+
+    exchange_info = None
+    if args.exchange_info:
+        with open(args.exchange_info) as f:
+            exchange_info = json.load(f)
+
+    result = backtest_twap(
+        BacktestBot(exchange_info), bars, args.symbol, args.side, args.quantity, args.duration,
+        args.orders, start_every_minutes=args.every, limit_offset_ticks=args.limit_offset,
+        tick_size=args.tick_size, slippage_bps=args.slippage_bps,
+    )
+    summary = result.summary()
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+
+    print(f"TWAP {summary['side']} {summary['total_quantity']} {summary['symbol']} | "
+          f"{summary['num_orders']} orders over {args.duration:g} min | {summary['runs']} runs "
+          f"over {len(bars)} bars in {summary['elapsed_seconds']:.3f}s")
+    if summary['passive_fill_rate'] is not None:
+        print(f"Passive fill rate: {summary['passive_fill_rate'] * 100:.1f}%")
+    for key, label in (('slippage_vs_arrival_bps', 'vs arrival'), ('slippage_vs_vwap_bps', 'vs VWAP')):
+        stats = summary[key]
+        print(f"Slippage {label:<11} (bps): mean {stats.get('mean')} | median {stats.get('median')} | "
+              f"p5 {stats.get('p5')} | p95 {stats.get('p95')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,78 +1,102 @@
-from binance.client import Client
-from binance.exceptions import BinanceAPIException, BinanceOrderException
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 import logging
-from typing import Optional, Dict, Any
+import random
+import threading
+from typing import Optional, Dict, Any, List
 import time
 import os
 
+from lazy_imports import lazy_import
+from log_pipeline import configure_logger, order_event
+from metrics import ORDER_STAGE_SECONDS, RISK_PRICE_FALLBACKS
+from oco_manager import OcoManager
+from order_book import OrderBookManager, LocalOrderBook
+from order_ids import ClientOrderIds, OrderDedupIndex
+from order_journal import OrderJournal, NOT_PLACED, PENDING, UNKNOWN
+from positions import PositionBook
+from rate_limiter import RateLimiter, RateLimitedClient
+from risk_engine import RiskEngine, RiskLimits, RiskRejected
+from symbol_filters import SymbolFilterCache
+from user_stream import UserDataStream
+from vwap import VolumeProfile, VwapRun, plan_vwap_slices, MINUTES_PER_DAY
 
-class BasicBot:
+
+ORDER_TYPES = ('MARKET', 'LIMIT', 'STOP')
+# Conditional orders go through the algo-order endpoint and cannot be sent in a batchOrders request
+CONDITIONAL_ORDER_TYPES = ('STOP',)
+BATCH_CHUNK_SIZE = 5
+MAX_BATCH_ORDERS = 100
+MAX_PARALLEL_BATCHES = 4
+
+# Per-request HTTP timeout; safe to keep tight because order submission retries idempotently
+DEFAULT_REQUEST_TIMEOUT = 10.0
+ORDER_RETRIES = 3
+ORDER_RETRY_BACKOFF = 0.2
+# -1001 disconnected, -1007 backend timeout (order status unknown), -1008 server overloaded
+TRANSIENT_ERROR_CODES = (-1001, -1007, -1008)
+DUPLICATE_CLIENT_ID_CODE = -4116
+ORDER_NOT_FOUND_CODE = -2013
+# GTX order would have crossed the book and was rejected instead of resting
+POST_ONLY_REJECTED_CODE = -5022
+
+VWAP_PROFILE_DAYS = 30
+# Live volume can scale a VWAP slice by at most this factor either way
+VWAP_LIVE_SCALE_LIMIT = 2.0
+# A mark older than this means the mark-price stream is down (it ticks every second); refetch it over REST
+MARK_MAX_AGE_SECONDS = 10.0
+FINAL_ORDER_STATUSES = ('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED')
+
+# Loaded on first attribute access (client construction or an API error), not at import time
+binance = lazy_import('binance')
+requests = lazy_import('requests')
+# Pulls in numpy; only needed when a VWAP profile is read from the local store
+market_store = lazy_import('market_store')
+
+
+class BaseBot:
     
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
-        self.api_key = api_key
-        self.api_secret = api_secret
-        self.testnet = testnet
-        
-        self._setup_logging()
-        
-        if testnet:
-            # Use testnet with the built-in support
-            self.client = Client(api_key, api_secret, testnet=True)
-            self.logger.info("Using Binance Futures TESTNET: https://testnet.binancefuture.com")
-        else:
-            self.client = Client(api_key, api_secret, testnet=False)
-            self.logger.warning("Using Binance Futures PRODUCTION environment")
-        
-        self._test_connection()
+    symbol_filters: Optional[SymbolFilterCache] = None
+    client_order_ids: ClientOrderIds
+    
+    @staticmethod
+    def _client_id_key(params: Dict[str, Any]) -> str:
+        # python-binance sends conditional types to the algo endpoint, which names the field clientAlgoId
+        return 'clientAlgoId' if params.get('type') in CONDITIONAL_ORDER_TYPES else 'newClientOrderId'
+    
+    def _assign_client_order_id(self, params: Dict[str, Any], client_order_id: Optional[str] = None) -> str:
+        key = self._client_id_key(params)
+        if client_order_id:
+            params[key] = client_order_id
+        return params.setdefault(key, self.client_order_ids.next())
     
     def _setup_logging(self):
         self.logger = logging.getLogger('BasicBot')
         self.logger.setLevel(logging.INFO)
 
         if not self.logger.handlers:
-            # Console handler first (always available, also safe on serverless)
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.INFO)
-
-            formatter = logging.Formatter(
-                '%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
-
-            # Try to add a file handler (works locally). On Vercel, fallback to /tmp or disable.
-            file_handler = None
-            try:
-                file_handler = logging.FileHandler('bot.log')
-            except Exception as e:
-                # Serverless (e.g., Vercel) root FS is read-only; /tmp is writable
-                try:
-                    tmp_path = os.environ.get('LOG_FILE', '/tmp/bot.log')
-                    file_handler = logging.FileHandler(tmp_path)
-                    self.logger.warning(f"File logging redirected to {tmp_path}: {e}")
-                except Exception as e2:
-                    # If even /tmp fails, continue with console-only logging
-                    self.logger.warning(f"File logging disabled due to: {e} | {e2}")
-                    file_handler = None
-
-            if file_handler is not None:
-                file_handler.setLevel(logging.INFO)
-                file_handler.setFormatter(formatter)
-                self.logger.addHandler(file_handler)
+            # Console plus rotating JSON file, written from a background thread unless BOT_LOG_MODE=sync
+            configure_logger(self.logger)
 
-        self.logger.info("=" * 80)
-        self.logger.info("BasicBot initialized")
-        self.logger.info(f"Testnet mode: {self.testnet}")
-        self.logger.info("=" * 80)
+        self.logger.info(f"BasicBot initialized | Testnet mode: {self.testnet}")
     
-    def _test_connection(self):
-        try:
-            self.client.ping()
-            self.logger.info("Successfully connected to Binance Futures API")
-        except Exception as e:
-            self.logger.error(f"Failed to connect to Binance API: {e}")
-            raise
+    def _log_order_event(self, event: str, params: Dict[str, Any],
+                         order: Optional[Dict[str, Any]] = None, error: Optional[Exception] = None):
+        """Log one compact record per order event instead of a multi-line banner."""
+        level = logging.INFO if error is None else logging.ERROR
+        if not self.logger.isEnabledFor(level):
+            return
+        with ORDER_STAGE_SECONDS.time(('log',)):
+            summary = f"ORDER {event.upper()}: {params.get('type')} {params.get('side')} {params.get('quantity')} {params.get('symbol')}"
+            if params.get('price') is not None:
+                summary += f" @ {params['price']}"
+            if params.get('stopPrice') is not None:
+                summary += f" (stop: {params['stopPrice']})"
+            if order is not None:
+                summary += f" | id={order.get('orderId', order.get('algoId'))} status={order.get('status', order.get('algoStatus'))}"
+            if error is not None:
+                summary += f" | {getattr(error, 'code', None) or type(error).__name__}: {getattr(error, 'message', None) or error}"
+            self.logger.log(level, summary, extra={'order': order_event(event, params, order, error)})
     
     def _validate_symbol(self, symbol: str) -> str:
         if not symbol:
@@ -83,6 +107,13 @@ class BasicBot:
         if not symbol.endswith('USDT'):
             raise ValueError(f"Symbol must end with 'USDT' for USDT-M Futures. Got: {symbol}")
         
+        if self.symbol_filters is not None:
+            filters = self.symbol_filters.get(symbol)
+            if filters is None and self.symbol_filters.loaded:
+                raise ValueError(f"Unknown symbol: {symbol}. Not listed on USDT-M Futures")
+            if filters is not None and filters.status != 'TRADING':
+                raise ValueError(f"Symbol {symbol} is not trading. Status: {filters.status}")
+        
         return symbol
     
     def _validate_side(self, side: str) -> str:
@@ -118,137 +149,605 @@ class BasicBot:
         
         return prc
     
-    def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict[str, Any]:
+    def _apply_symbol_filters(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Round to tick/step size and check min qty/notional locally, before any round trip
+        if self.symbol_filters is None:
+            return params
+        with ORDER_STAGE_SECONDS.time(('validate',)):
+            filters = self.symbol_filters.get(params['symbol'])
+            if filters is None:
+                return params
+            return filters.apply(params)
+    
+    def _plan_twap(self, symbol: str, side: str, total_quantity: float,
+                   duration_minutes: int, num_orders: int) -> Dict[str, Any]:
         symbol = self._validate_symbol(symbol)
         side = self._validate_side(side)
-        quantity = self._validate_quantity(quantity)
+        total_quantity = self._validate_quantity(total_quantity)
+        
+        if num_orders < 2:
+            raise ValueError("Number of orders must be at least 2")
         
-        self.logger.info("=" * 80)
-        self.logger.info(f"PLACING MARKET ORDER: {side} {quantity} {symbol}")
-        self.logger.info("=" * 80)
+        if duration_minutes < 0:
+            raise ValueError(f"Duration must not be negative. Got: {duration_minutes}")
         
+        # Fail now rather than on the first slice if each slice is below the symbol's minimum size
+        self._apply_symbol_filters({
+            'symbol': symbol, 'side': side, 'type': 'MARKET', 'quantity': total_quantity / num_orders
+        })
+        slice_quantities, residue = self._split_twap_quantity(symbol, total_quantity, num_orders)
+        
+        return {
+            'symbol': symbol,
+            'side': side,
+            'total_quantity': total_quantity,
+            'num_orders': num_orders,
+            'quantity_per_order': total_quantity / num_orders,
+            'slice_quantities': slice_quantities,
+            'residue': residue,
+            'interval_seconds': (duration_minutes * 60) / num_orders,
+        }
+    
+    def _split_twap_quantity(self, symbol: str, total_quantity: float, num_orders: int):
+        """Slice sizes rounded down to the step size, and the part of the total too small to send.
+
+        Whatever rounding takes off a slice is carried into the next, and the last slice
+        takes what is left, so only a remainder below one step goes unsent.
+        """
+        filters = self.symbol_filters.get(symbol) if self.symbol_filters is not None else None
+        if filters is None:
+            return [total_quantity / num_orders] * num_orders, 0.0
+        total = Decimal(str(total_quantity))
+        sent = Decimal(0)
+        quantities = []
+        for i in range(1, num_orders + 1):
+            target = total if i == num_orders else total * i / num_orders
+            quantity = filters.round_quantity(target - sent, market=True)
+            quantities.append(float(quantity))
+            sent += quantity
+        return quantities, float(total - sent)
+    
+    def _build_order_params(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        order_type = str(spec.get('type') or 'MARKET').upper()
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"Order type must be one of {', '.join(ORDER_TYPES)}. Got: {order_type}")
+        
+        params = {
+            'symbol': self._validate_symbol(spec.get('symbol')),
+            'side': self._validate_side(spec.get('side')),
+            'type': order_type,
+            'quantity': self._validate_quantity(spec.get('quantity')),
+        }
+        
+        if order_type in ('LIMIT', 'STOP'):
+            params['price'] = self._validate_price(spec.get('price'))
+            params['timeInForce'] = str(spec.get('timeInForce') or 'GTC').upper()
+        if order_type == 'STOP':
+            params['stopPrice'] = self._validate_price(spec.get('stopPrice'))
+        
+        return self._apply_symbol_filters(params)
+
+
+class BasicBot(BaseBot):
+    
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True, client=None,
+                 filters_ttl: float = 3600.0, request_timeout: Optional[float] = None,
+                 journal: Optional[OrderJournal] = None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.client_order_ids = ClientOrderIds()
+        self.order_index = OrderDedupIndex()
+        
+        self._setup_logging()
+        
+        if request_timeout is None:
+            request_timeout = float(os.environ.get('BOT_REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT))
+        requests_params = {'timeout': request_timeout}
+        
+        if client is not None:
+            # Injected client (e.g. fake_exchange.FakeFuturesClient for local testing)
+            self.client = client
+        elif testnet:
+            # Use testnet with the built-in support; ping=False keeps construction free of network I/O
+            self.client = binance.Client(api_key, api_secret, testnet=True, ping=False,
+                                         requests_params=requests_params)
+            self.logger.info("Using Binance Futures TESTNET: https://testnet.binancefuture.com")
+        else:
+            self.client = binance.Client(api_key, api_secret, testnet=False, ping=False,
+                                         requests_params=requests_params)
+            self.logger.warning("Using Binance Futures PRODUCTION environment")
+        
+        # Every exchange call is scheduled through one weight/order-count budget
+        self.rate_limiter = RateLimiter()
+        self.client = RateLimitedClient(self.client, self.rate_limiter)
+        self.symbol_filters = SymbolFilterCache(self._load_exchange_info, ttl=filters_ttl)
+        self.user_stream: Optional[UserDataStream] = None
+        self.order_books: Optional[OrderBookManager] = None
+        # Durable record of every order this bot sends (BOT_JOURNAL=0 disables it)
+        self.journal = journal if journal is not None else OrderJournal.open_default(self.logger)
+        # Cancels the remaining leg once either side of an OCO pair is hit
+        self.oco_manager = OcoManager(self)
+        # Positions and PnL folded from every fill the bot sees
+        self.position_book = PositionBook(self.client, api_key, api_secret, testnet=testnet)
+        # Every order passes these in-memory checks before it is sent (RISK_* env vars set the limits)
+        self.risk = RiskEngine(RiskLimits.from_env(), self.position_book, self._mark_price)
+        # Symbols with a background mark-price fetch in flight
+        self._mark_refreshes = set()
+        self._mark_lock = threading.Lock()
+    
+    def start_user_stream(self) -> UserDataStream:
+        """Keep orders and balances in memory from the user-data stream.
+
+        Connects in the background; until the stream is ready, status and balance
+        reads keep going to REST.
+        """
+        if self.user_stream is None:
+            self.user_stream = UserDataStream(self.client, self.api_key, self.api_secret, testnet=self.testnet)
+            # OCO first: its sibling cancel is the latency-critical reaction to a fill
+            self.user_stream.add_listener(self.oco_manager.on_stream_event)
+            self.user_stream.add_listener(self.position_book.on_stream_event)
+            self.user_stream.add_listener(self._journal_stream_event)
+        self.user_stream.start()
+        return self.user_stream
+    
+    def stop_user_stream(self):
+        if self.user_stream is not None:
+            self.user_stream.stop()
+    
+    def start_position_stream(self) -> PositionBook:
+        """Seed positions from REST once and mark them from the mark-price stream, in the background."""
+        self.position_book.start()
+        return self.position_book
+    
+    def _mark_price(self, symbol: str) -> Optional[float]:
+        """Latest mark from the stream, else the local book's mid, else the last mark seen.
+
+        It runs inside the pre-trade check, so it never calls the exchange: a
+        missing or stale mark is refetched in the background for the next order,
+        and every fallback is counted in ``bot_risk_price_fallbacks_total``.
+        """
+        mark = self.position_book.marks.get(symbol)
+        if mark is not None and time.time() - mark[1] < MARK_MAX_AGE_SECONDS:
+            return mark[0]
+        book = self.get_order_book(symbol)
+        mid = book.mid() if book is not None else None
+        if mid is not None:
+            RISK_PRICE_FALLBACKS.inc(('book_mid',))
+            return mid
+        self._refresh_mark_later(symbol)
+        RISK_PRICE_FALLBACKS.inc(('stale_mark' if mark is not None else 'none',))
+        return mark[0] if mark is not None else None
+    
+    def _refresh_mark_later(self, symbol: str):
+        with self._mark_lock:
+            if symbol in self._mark_refreshes:
+                return
+            self._mark_refreshes.add(symbol)
+        self._get_executor().submit(self._refresh_mark, symbol)
+    
+    def _refresh_mark(self, symbol: str):
         try:
-            self.logger.info(f"API Request: futures_create_order(symbol={symbol}, side={side}, type=MARKET, quantity={quantity})")
-            
-            order = self.client.futures_create_order(
-                symbol=symbol,
-                side=side,
-                type='MARKET',
-                quantity=quantity
-            )
-            
-            self.logger.info(f"API Response: {order}")
-            self.logger.info("=" * 80)
-            self.logger.info("MARKET ORDER PLACED SUCCESSFULLY")
-            self.logger.info(f"Order ID: {order.get('orderId')}")
-            self.logger.info(f"Status: {order.get('status')}")
-            self.logger.info(f"Executed Qty: {order.get('executedQty')}")
-            self.logger.info("=" * 80)
-            
-            return order
-            
-        except BinanceAPIException as e:
-            self.logger.error("=" * 80)
-            self.logger.error("BINANCE API ERROR")
-            self.logger.error(f"Error Code: {e.code}")
-            self.logger.error(f"Error Message: {e.message}")
-            self.logger.error("=" * 80)
-            raise
+            self.position_book.on_mark_price(symbol, float(self.client.futures_mark_price(symbol=symbol)['markPrice']))
         except Exception as e:
-            self.logger.error("=" * 80)
-            self.logger.error(f"UNEXPECTED ERROR: {e}")
-            self.logger.error("=" * 80)
-            raise
+            self.logger.warning(f"Mark price for {symbol} unavailable: {e}")
+        finally:
+            with self._mark_lock:
+                self._mark_refreshes.discard(symbol)
     
-    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float, 
-                         time_in_force: str = 'GTC') -> Dict[str, Any]:
+    def get_risk_status(self) -> Dict[str, Any]:
+        return self.risk.snapshot()
+    
+    def get_positions(self, resync: bool = False) -> Dict[str, Any]:
+        """Positions, entry prices and PnL from memory.
+
+        The first call (or ``resync=True``) loads the exchange's positions with one
+        REST request; after that fills and mark prices keep them current.
+        """
+        if resync or not self.position_book.seeded:
+            self.position_book.seed()
+        return self.position_book.snapshot()
+    
+    def stop_streams(self):
+        self.stop_user_stream()
+        self.oco_manager.stop()
+        self.position_book.stop()
+        if self.order_books is not None:
+            self.order_books.stop()
+    
+    def watch_order_book(self, symbol: str) -> LocalOrderBook:
+        """Start keeping a local order book for ``symbol`` from the diff-depth stream."""
+        symbol = self._validate_symbol(symbol)
+        if self.order_books is None:
+            streaming = getattr(self.client.raw_client, 'supports_streams', True)
+            self.order_books = OrderBookManager(self.client, self.api_key, self.api_secret, testnet=self.testnet,
+                                                streaming=streaming)
+        return self.order_books.watch(symbol)
+    
+    def get_order_book(self, symbol: str) -> Optional[LocalOrderBook]:
+        """Return the synced local book for ``symbol``, or None if it is not watched or resyncing."""
+        if self.order_books is None:
+            return None
+        return self.order_books.get(symbol)
+    
+    def quote_limit_price(self, symbol: str, side: str, offset_ticks: int = 0) -> float:
+        """Passive limit price from the local book: join the best bid (BUY) or best ask (SELL).
+
+        Positive ``offset_ticks`` moves the price away from the spread, negative steps
+        inside it (capped so the order never crosses). No REST call is made.
+        """
         symbol = self._validate_symbol(symbol)
         side = self._validate_side(side)
-        quantity = self._validate_quantity(quantity)
-        price = self._validate_price(price)
+        book = self.get_order_book(symbol)
+        if book is None:
+            raise ValueError(f"No synced order book for {symbol}; call watch_order_book first")
+        bid, ask = book.top()
+        if bid is None or ask is None:
+            raise ValueError(f"Order book for {symbol} is empty")
+        
+        filters = self.symbol_filters.get(symbol) if self.symbol_filters is not None else None
+        tick = float(filters.tick_size) if filters is not None and filters.tick_size else 0.0
+        if side == 'BUY':
+            price = bid - offset_ticks * tick
+            price = min(price, ask - tick) if tick else min(price, bid)
+        else:
+            price = ask + offset_ticks * tick
+            price = max(price, bid + tick) if tick else max(price, ask)
+        if filters is not None:
+            return float(filters.round_price(price))
+        return price
+    
+    def _load_exchange_info(self) -> Dict[str, Any]:
+        exchange_info = self.client.futures_exchange_info()
+        self.rate_limiter.configure(exchange_info.get('rateLimits'))
+        return exchange_info
+    
+    def get_rate_limit_status(self) -> Dict[str, Any]:
+        return self.rate_limiter.snapshot()
+    
+    def place_orders_batch(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not orders:
+            raise ValueError("Batch must contain at least one order")
+        if len(orders) > MAX_BATCH_ORDERS:
+            raise ValueError(f"Batch cannot contain more than {MAX_BATCH_ORDERS} orders. Got: {len(orders)}")
         
-        self.logger.info("=" * 80)
-        self.logger.info(f"PLACING LIMIT ORDER: {side} {quantity} {symbol} @ {price}")
-        self.logger.info("=" * 80)
+        # Validate everything before sending anything, so a bad spec never leaves a partial basket live
+        params_list = []
+        for index, spec in enumerate(orders):
+            try:
+                params = self._build_order_params(spec)
+            except ValueError as e:
+                raise ValueError(f"Order {index}: {e}")
+            self._assign_client_order_id(params, spec.get('clientOrderId'))
+            params_list.append(params)
+        
+        with ORDER_STAGE_SECONDS.time(('risk',)):
+            self.risk.check_batch(params_list)
+        
+        batchable = [i for i, p in enumerate(params_list) if p['type'] not in CONDITIONAL_ORDER_TYPES]
+        chunks = [batchable[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(batchable), BATCH_CHUNK_SIZE)]
+        chunks += [[i] for i, p in enumerate(params_list) if p['type'] in CONDITIONAL_ORDER_TYPES]
+        
+        self.logger.info(f"PLACING BATCH: {len(params_list)} orders in {len(chunks)} requests")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(params_list)
+        slots = threading.BoundedSemaphore(MAX_PARALLEL_BATCHES)
+        executor = self._get_executor()
+        futures = [
+            executor.submit(self._submit_batch_chunk, [params_list[i] for i in chunk], slots)
+            for chunk in chunks
+        ]
+        
+        for chunk, future in zip(chunks, futures):
+            for index, result in zip(chunk, future.result()):
+                results[index] = result
+        
+        failed = sum(1 for r in results if not r['success'])
+        self.logger.info(f"BATCH COMPLETED: {len(results) - failed} placed, {failed} rejected")
+        return results
+    
+    def _submit_batch_chunk(self, chunk: List[Dict[str, Any]],
+                            slots: threading.BoundedSemaphore) -> List[Dict[str, Any]]:
+        for params in chunk:
+            key = self._client_id_key(params)
+            self._journal_write('record_intent', params[key], params, algo=key == 'clientAlgoId')
         
+        with slots:
+            try:
+                if len(chunk) == 1:
+                    responses = [self.client.futures_create_order(**chunk[0])]
+                else:
+                    batch = [{k: self._format_param(v) for k, v in params.items()} for params in chunk]
+                    responses = self.client.futures_place_batch_order(batchOrders=batch)
+            except Exception as e:
+                if self._is_transient(e):
+                    # Some or all of the chunk may have been placed; ask the exchange by client id
+                    return [self._recover_batch_order(params, e) for params in chunk]
+                self.logger.error(f"BATCH REQUEST FAILED: {e}")
+                for params in chunk:
+                    self._journal_failure(params[self._client_id_key(params)], e)
+                return [{'success': False, 'code': getattr(e, 'code', None),
+                         'message': getattr(e, 'message', None) or str(e)} for _ in chunk]
+        
+        results = []
+        for params, response in zip(chunk, responses):
+            # batchOrders reports per-order rejections inline as {"code": ..., "msg": ...}
+            client_order_id = params[self._client_id_key(params)]
+            if 'code' in response and 'orderId' not in response:
+                self._journal_write('record_status', client_order_id, 'REJECTED')
+                results.append({'success': False, 'code': response['code'], 'message': response.get('msg')})
+            else:
+                self._journal_write('record_order', client_order_id, response)
+                self.order_index.remember(client_order_id, response)
+                self.position_book.apply_order(response)
+                results.append({'success': True, 'order': response})
+        return results
+    
+    def _recover_batch_order(self, params: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        key = self._client_id_key(params)
         try:
-            self.logger.info(
-                f"API Request: futures_create_order(symbol={symbol}, side={side}, "
-                f"type=LIMIT, quantity={quantity}, price={price}, timeInForce={time_in_force})"
-            )
-            
-            order = self.client.futures_create_order(
-                symbol=symbol,
-                side=side,
-                type='LIMIT',
-                timeInForce=time_in_force,
-                quantity=quantity,
-                price=price
-            )
-            
-            self.logger.info(f"API Response: {order}")
-            self.logger.info("=" * 80)
-            self.logger.info("LIMIT ORDER PLACED SUCCESSFULLY")
-            self.logger.info(f"Order ID: {order.get('orderId')}")
-            self.logger.info(f"Status: {order.get('status')}")
-            self.logger.info(f"Price: {order.get('price')}")
-            self.logger.info("=" * 80)
-            
-            return order
-            
-        except BinanceAPIException as e:
-            self.logger.error("=" * 80)
-            self.logger.error("BINANCE API ERROR")
-            self.logger.error(f"Error Code: {e.code}")
-            self.logger.error(f"Error Message: {e.message}")
-            self.logger.error("=" * 80)
+            order = self.find_order_by_client_id(params['symbol'], params[key], conditional=key == 'clientAlgoId')
+        except Exception as e:
+            self.logger.error(f"BATCH ORDER {params[key]} UNKNOWN after {error}: lookup failed: {e}")
+            self._journal_write('record_status', params[key], UNKNOWN, e)
+            return {'success': False, 'code': getattr(e, 'code', None), 'message': f"Order state unknown: {e}"}
+        if order is None:
+            self._journal_write('record_status', params[key], NOT_PLACED, error)
+            return {'success': False, 'code': getattr(error, 'code', None),
+                    'message': getattr(error, 'message', None) or str(error)}
+        self._journal_write('record_order', params[key], order)
+        self.order_index.remember(params[key], order)
+        self.position_book.apply_order(order)
+        return {'success': True, 'order': order}
+    
+    @staticmethod
+    def _format_param(value: Any) -> str:
+        if isinstance(value, float):
+            return format(Decimal(str(value)), 'f')
+        return str(value)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='bot-io')
+        return self._executor
+    
+    def check_connection(self, max_age: float = 60.0) -> bool:
+        """Ping the API unless a request succeeded within the last ``max_age`` seconds.
+
+        Construction no longer pings, so callers that want early feedback (``/api/init``,
+        the CLI) call this explicitly; trading calls never wait on it.
+        """
+        last_success = self.client.last_success
+        if last_success is not None and time.monotonic() - last_success < max_age:
+            return True
+        
+        try:
+            self.client.ping()
+            self.logger.info("Successfully connected to Binance Futures API")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to connect to Binance API: {e}")
             raise
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """True when the request may or may not have reached the matching engine."""
+        if isinstance(error, binance.BinanceAPIException):
+            return error.code in TRANSIENT_ERROR_CODES or (error.status_code or 0) >= 500
+        return isinstance(error, (requests.exceptions.RequestException, binance.BinanceRequestException))
+    
+    def find_order_by_client_id(self, symbol: str, client_order_id: str,
+                                conditional: bool = False) -> Optional[Dict[str, Any]]:
+        """Look an order up by its client id on the exchange; None if it was never placed."""
+        lookup = {'clientAlgoId': client_order_id} if conditional else {'origClientOrderId': client_order_id}
+        try:
+            return self.client.futures_get_order(symbol=symbol, **lookup)
+        except binance.BinanceAPIException as e:
+            if e.code == ORDER_NOT_FOUND_CODE:
+                return None
+            raise
+    
+    def _create_order_with_retry(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = self._client_id_key(params)
+        client_order_id = params[key]
+        for attempt in range(ORDER_RETRIES + 1):
+            try:
+                if attempt:
+                    # The previous attempt may have landed; never resend an order that exists
+                    existing = self.find_order_by_client_id(params['symbol'], client_order_id,
+                                                            conditional=key == 'clientAlgoId')
+                    if existing is not None:
+                        self.logger.info(f"Order {client_order_id} found after a failed attempt; not resending")
+                        return existing
+                return self.client.futures_create_order(**params)
+            except binance.BinanceAPIException as e:
+                if e.code == DUPLICATE_CLIENT_ID_CODE:
+                    existing = self.find_order_by_client_id(params['symbol'], client_order_id,
+                                                            conditional=key == 'clientAlgoId')
+                    if existing is not None:
+                        return existing
+                if not self._is_transient(e) or attempt == ORDER_RETRIES:
+                    raise
+                error = e
+            except Exception as e:
+                if not self._is_transient(e) or attempt == ORDER_RETRIES:
+                    raise
+                error = e
+            delay = ORDER_RETRY_BACKOFF * 2 ** attempt
+            self.logger.warning(f"Order {client_order_id} attempt {attempt + 1} failed ({error}); "
+                                f"retrying in {delay:.1f}s")
+            time.sleep(delay)
+    
+    def _journal_write(self, method: str, *args, **kwargs):
+        # A journal failure is logged, never allowed to block trading
+        if self.journal is None:
+            return
+        try:
+            with ORDER_STAGE_SECONDS.time(('journal',)):
+                getattr(self.journal, method)(*args, **kwargs)
         except Exception as e:
-            self.logger.error("=" * 80)
-            self.logger.error(f"UNEXPECTED ERROR: {e}")
-            self.logger.error("=" * 80)
+            self.logger.error(f"Order journal {method} failed: {e}")
+    
+    def _journal_order(self, order: Dict[str, Any], kind: str):
+        client_order_id = order.get('clientOrderId') or order.get('clientAlgoId')
+        if client_order_id:
+            self._journal_write('record_order', client_order_id, order, kind=kind)
+    
+    def _journal_stream_event(self, event: str, data: Dict[str, Any]):
+        if event in ('order', 'algo'):
+            self._journal_order(data, 'update')
+    
+    def _journal_failure(self, client_order_id: str, error: Exception):
+        status = UNKNOWN if self._is_transient(error) else 'REJECTED'
+        self._journal_write('record_status', client_order_id, status, error)
+    
+    def _previously_sent(self, client_order_id: str) -> bool:
+        """True when the journal shows this id was sent before (e.g. a resumed TWAP slice)."""
+        if self.journal is None:
+            return False
+        try:
+            row = self.journal.get_order(client_order_id)
+        except Exception as e:
+            self.logger.error(f"Order journal lookup failed: {e}")
+            return False
+        return row is not None and row['status'] not in (NOT_PLACED, 'REJECTED')
+    
+    def _submit_order(self, params: Dict[str, Any], client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send an order under a client id, retrying transient failures without ever placing it twice."""
+        supplied = client_order_id or params.get(self._client_id_key(params))
+        client_order_id = self._assign_client_order_id(params, client_order_id)
+        known = self.order_index.begin(client_order_id)
+        if known is not None:
+            self.logger.info(f"Order {client_order_id} already placed; returning the original")
+            return known
+        
+        order = None
+        try:
+            # Only new orders are risk-checked; a resent id may already be live on the exchange
+            if not supplied or not self._previously_sent(client_order_id):
+                with ORDER_STAGE_SECONDS.time(('risk',)):
+                    self.risk.check(params)
+            # Written before the request leaves, so a crash mid-call still leaves a record to reconcile
+            self._journal_write('record_intent', client_order_id, params,
+                                algo=self._client_id_key(params) == 'clientAlgoId')
+            with ORDER_STAGE_SECONDS.time(('exchange',)):
+                order = self._create_order_with_retry(params)
+        except RiskRejected as e:
+            self._log_order_event('rejected', params, error=e)
             raise
+        except binance.BinanceAPIException as e:
+            self._journal_failure(client_order_id, e)
+            self._log_order_event('rejected', params, error=e)
+            raise
+        except Exception as e:
+            self._journal_failure(client_order_id, e)
+            self._log_order_event('failed', params, error=e)
+            raise
+        finally:
+            self.order_index.finish(client_order_id, order)
+        
+        self._journal_write('record_order', client_order_id, order)
+        self.position_book.apply_order(order)
+        self._log_order_event('placed', params, order)
+        return order
+    
+    def reconcile_orders(self) -> Dict[str, int]:
+        """Bring every journaled open order up to date after a restart.
+
+        One ``futures_get_open_orders`` call (plus open algo orders if any are
+        journaled) settles everything still working; orders that closed while the
+        process was down are resolved with one order-history call per symbol
+        instead of one status request per order.
+        """
+        counts = {'open': 0, 'closed': 0, 'not_placed': 0, 'unresolved': 0, 'untracked': 0}
+        if self.journal is None:
+            return counts
+        journaled = self.journal.open_orders()
+        
+        # Keyed by (algo, client id): the order a triggered stop becomes may carry the stop's client id
+        live = {}
+        for order in self.client.futures_get_open_orders():
+            live[(False, order.get('clientOrderId'))] = order
+        if any(row['algo'] for row in journaled):
+            for order in self.client.futures_get_open_algo_orders():
+                live[(True, order.get('clientAlgoId'))] = order
+        
+        missing: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in journaled:
+            order = live.get((bool(row['algo']), row['client_order_id']))
+            if order is None:
+                missing.setdefault((row['symbol'], bool(row['algo'])), []).append(row)
+                continue
+            self.journal.record_order(row['client_order_id'], order, kind='reconcile')
+            self.order_index.remember(row['client_order_id'], order)
+            counts['open'] += 1
+        
+        for (symbol, algo), rows in missing.items():
+            since = int(min(row['created'] for row in rows) * 1000) - 60_000
+            if algo:
+                history = self.client.futures_get_all_algo_orders(symbol=symbol, startTime=since)
+                key = 'clientAlgoId'
+            else:
+                history = self.client.futures_get_all_orders(symbol=symbol, startTime=since, limit=1000)
+                key = 'clientOrderId'
+            by_id = {order.get(key): order for order in history}
+            for row in rows:
+                order = by_id.get(row['client_order_id'])
+                if order is not None:
+                    self.journal.record_order(row['client_order_id'], order, kind='reconcile')
+                    self.order_index.remember(row['client_order_id'], order)
+                    counts['closed'] += 1
+                elif row['status'] in (PENDING, UNKNOWN):
+                    # The intent was written but the exchange never saw the order
+                    self.journal.record_status(row['client_order_id'], NOT_PLACED)
+                    counts['not_placed'] += 1
+                else:
+                    counts['unresolved'] += 1
+        
+        counts['untracked'] = sum(1 for _, client_order_id in live if self.journal.get_order(client_order_id) is None)
+        self.logger.info(
+            f"Reconciled {len(journaled)} journaled orders: {counts['open']} open, {counts['closed']} closed, "
+            f"{counts['not_placed']} never placed, {counts['unresolved']} unresolved; "
+            f"{counts['untracked']} open orders not in the journal"
+        )
+        return counts
+    
+    def place_market_order(self, symbol: str, side: str, quantity: float,
+                           client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        symbol = self._validate_symbol(symbol)
+        side = self._validate_side(side)
+        quantity = self._validate_quantity(quantity)
+        params = self._apply_symbol_filters({
+            'symbol': symbol, 'side': side, 'type': 'MARKET', 'quantity': quantity
+        })
+        return self._submit_order(params, client_order_id)
+    
+    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float, 
+                         time_in_force: str = 'GTC', client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        symbol = self._validate_symbol(symbol)
+        side = self._validate_side(side)
+        quantity = self._validate_quantity(quantity)
+        price = self._validate_price(price)
+        params = self._apply_symbol_filters({
+            'symbol': symbol, 'side': side, 'type': 'LIMIT', 'timeInForce': time_in_force,
+            'quantity': quantity, 'price': price
+        })
+        return self._submit_order(params, client_order_id)
     
     def place_stop_limit_order(self, symbol: str, side: str, quantity: float, 
-                              price: float, stop_price: float) -> Dict[str, Any]:
+                              price: float, stop_price: float,
+                              client_order_id: Optional[str] = None) -> Dict[str, Any]:
         symbol = self._validate_symbol(symbol)
         side = self._validate_side(side)
         quantity = self._validate_quantity(quantity)
         price = self._validate_price(price)
         stop_price = self._validate_price(stop_price)
-        
-        self.logger.info("=" * 80)
-        self.logger.info(f"PLACING STOP-LIMIT ORDER: {side} {quantity} {symbol} @ {price} (stop: {stop_price})")
-        self.logger.info("=" * 80)
-        
-        try:
-            self.logger.info(
-                f"API Request: futures_create_order(symbol={symbol}, side={side}, "
-                f"type=STOP, quantity={quantity}, price={price}, stopPrice={stop_price})"
-            )
-            
-            order = self.client.futures_create_order(
-                symbol=symbol,
-                side=side,
-                type='STOP',
-                timeInForce='GTC',
-                quantity=quantity,
-                price=price,
-                stopPrice=stop_price
-            )
-            
-            self.logger.info(f"API Response: {order}")
-            self.logger.info("STOP-LIMIT ORDER PLACED SUCCESSFULLY")
-            self.logger.info(f"Order ID: {order.get('orderId')}")
-            
-            return order
-            
-        except BinanceAPIException as e:
-            self.logger.error(f"API ERROR: {e.code} - {e.message}")
-            raise
-        except Exception as e:
-            self.logger.error(f"UNEXPECTED ERROR: {e}")
-            raise
+        params = self._apply_symbol_filters({
+            'symbol': symbol, 'side': side, 'type': 'STOP', 'timeInForce': 'GTC',
+            'quantity': quantity, 'price': price, 'stopPrice': stop_price
+        })
+        return self._submit_order(params, client_order_id)
     
     def place_oco_order(self, symbol: str, side: str, quantity: float, 
                        price: float, stop_price: float, 
@@ -262,47 +761,88 @@ class BasicBot:
         
         opposite_side = 'SELL' if side == 'BUY' else 'BUY'
         
-        self.logger.info("=" * 80)
-        self.logger.info(f"PLACING OCO ORDER: {opposite_side} {quantity} {symbol}")
-        self.logger.info(f"Take-Profit: {price} | Stop-Loss: {stop_price}")
-        self.logger.info("=" * 80)
+        # Check both legs against the symbol filters first so a bad leg never triggers a rollback
+        self._apply_symbol_filters({
+            'symbol': symbol, 'side': opposite_side, 'type': 'LIMIT', 'quantity': quantity, 'price': price
+        })
+        self._apply_symbol_filters({
+            'symbol': symbol, 'side': opposite_side, 'type': 'STOP', 'quantity': quantity,
+            'price': stop_limit_price, 'stopPrice': stop_price
+        })
+        
+        self.logger.info(f"PLACING OCO ORDER: {opposite_side} {quantity} {symbol} | TP: {price} | SL: {stop_price}")
+        
+        take_profit_id = self.client_order_ids.next()
+        stop_loss_id = self.client_order_ids.next()
+        
+        # Send both legs at once so the position is protected after one round trip
+        executor = self._get_executor()
+        legs = {
+            'take_profit_order': executor.submit(
+                self.place_limit_order, symbol, opposite_side, quantity, price, client_order_id=take_profit_id
+            ),
+            'stop_loss_order': executor.submit(
+                self.place_stop_limit_order, symbol, opposite_side, quantity, stop_limit_price, stop_price,
+                client_order_id=stop_loss_id
+            ),
+        }
+        
+        placed = {}
+        errors = {}
+        for name, future in legs.items():
+            try:
+                placed[name] = future.result()
+            except Exception as e:
+                errors[name] = e
+        
+        if errors:
+            for name, order in placed.items():
+                self._rollback_oco_leg(symbol, name, order)
+            failed_leg, error = next(iter(errors.items()))
+            self.logger.error(f"OCO ORDER FAILED on {failed_leg}: {error}")
+            raise error
+        
+        group_id = f"oco-{take_profit_id}"
+        self._journal_write('link', group_id, 'OCO', [take_profit_id, stop_loss_id])
+        self.oco_manager.track(group_id, symbol, placed['take_profit_order'], placed['stop_loss_order'])
+        
+        result = {
+            'oco_type': 'OCO',
+            'group_id': group_id,
+            'take_profit_order': placed['take_profit_order'],
+            'stop_loss_order': placed['stop_loss_order']
+        }
+        
+        self.logger.info("OCO ORDERS PLACED SUCCESSFULLY")
+        return result
+    
+    def _rollback_oco_leg(self, symbol: str, leg: str, order: Dict[str, Any]):
+        # Conditional legs are placed through the algo endpoint and carry an algoId instead of an orderId
+        if order.get('algoId') is not None:
+            params = {'algoId': order['algoId']}
+        else:
+            params = {'orderId': order.get('orderId')}
         
         try:
-            tp_order = self.place_limit_order(symbol, opposite_side, quantity, price)
-            
-            sl_order = self.place_stop_limit_order(
-                symbol, opposite_side, quantity, stop_limit_price, stop_price
-            )
-            
-            result = {
-                'oco_type': 'OCO',
-                'take_profit_order': tp_order,
-                'stop_loss_order': sl_order
-            }
-            
-            self.logger.info("OCO ORDERS PLACED SUCCESSFULLY")
-            return result
-            
+            result = self.client.futures_cancel_order(symbol=symbol, **params)
+            self._journal_order(result, 'cancel')
+            self.logger.warning(f"OCO ROLLBACK: cancelled {leg} {params}")
         except Exception as e:
-            self.logger.error(f"OCO ORDER FAILED: {e}")
-            raise
+            self.logger.critical(f"OCO ROLLBACK FAILED: {leg} {params} is still live without its sibling: {e}")
     
     def execute_twap(self, symbol: str, side: str, total_quantity: float, 
                      duration_minutes: int, num_orders: int = 10) -> Dict[str, Any]:
-        symbol = self._validate_symbol(symbol)
-        side = self._validate_side(side)
-        total_quantity = self._validate_quantity(total_quantity)
-        
-        if num_orders < 2:
-            raise ValueError("Number of orders must be at least 2")
+        plan = self._plan_twap(symbol, side, total_quantity, duration_minutes, num_orders)
+        symbol = plan['symbol']
+        side = plan['side']
+        total_quantity = plan['total_quantity']
+        slice_quantities = plan['slice_quantities']
+        interval_seconds = plan['interval_seconds']
         
-        quantity_per_order = total_quantity / num_orders
-        interval_seconds = (duration_minutes * 60) / num_orders
-        
-        self.logger.info("=" * 80)
-        self.logger.info(f"EXECUTING TWAP STRATEGY: {side} {total_quantity} {symbol}")
-        self.logger.info(f"Orders: {num_orders} | Interval: {interval_seconds:.2f}s")
-        self.logger.info("=" * 80)
+        self.logger.info(
+            f"EXECUTING TWAP STRATEGY: {side} {total_quantity} {symbol} | "
+            f"Orders: {num_orders} | Interval: {interval_seconds:.2f}s"
+        )
         
         executed_orders = []
         
@@ -310,7 +850,7 @@ class BasicBot:
             for i in range(num_orders):
                 self.logger.info(f"TWAP Order {i+1}/{num_orders}")
                 
-                order = self.place_market_order(symbol, side, quantity_per_order)
+                order = self.place_market_order(symbol, side, slice_quantities[i])
                 executed_orders.append(order)
                 
                 if i < num_orders - 1:
@@ -320,9 +860,12 @@ class BasicBot:
                 'strategy': 'TWAP',
                 'total_orders': num_orders,
                 'successful_orders': len(executed_orders),
-                'orders': executed_orders
+                'orders': executed_orders,
+                'residue': plan['residue'],
             }
             
+            if plan['residue']:
+                self.logger.warning(f"TWAP left {plan['residue']} {symbol} unsent: below the step size")
             self.logger.info("TWAP STRATEGY COMPLETED")
             return summary
             
@@ -330,11 +873,290 @@ class BasicBot:
             self.logger.error(f"TWAP FAILED: {e}")
             raise
     
+    def load_volume_profile(self, symbol: str, days: int = VWAP_PROFILE_DAYS) -> VolumeProfile:
+        """Intraday volume profile from the local market-data store, else hourly klines, else flat."""
+        symbol = self._validate_symbol(symbol)
+        since = int(time.time() * 1000) - days * 86_400_000
+        try:
+            klines = market_store.MarketStore().klines(symbol, start=since)
+            if len(klines['open_time']) >= MINUTES_PER_DAY:
+                return VolumeProfile.from_klines(klines['open_time'], klines['volume'], source='store')
+        except Exception as e:
+            self.logger.warning(f"Could not read stored klines for {symbol}: {e}")
+        try:
+            rows = self.client.futures_klines(symbol=symbol, interval='1h', startTime=since,
+                                              limit=min(days * 24, 1500))
+            if rows:
+                return VolumeProfile.from_klines([row[0] for row in rows], [float(row[5]) for row in rows],
+                                                 interval_ms=3_600_000, source='klines_1h')
+        except Exception as e:
+            self.logger.warning(f"Could not fetch hourly klines for {symbol}: {e}")
+        return VolumeProfile.flat()
+    
+    def _market_volume(self, symbol: str, start: float, end: float) -> Optional[Dict[str, float]]:
+        """Base and quote volume traded between two epoch-second timestamps, from 1m klines."""
+        try:
+            rows = self.client.futures_klines(symbol=symbol, interval='1m', startTime=int(start * 1000),
+                                              endTime=int(end * 1000), limit=1500)
+        except Exception as e:
+            self.logger.warning(f"Could not fetch traded volume for {symbol}: {e}")
+            return None
+        return {
+            'base': sum(float(row[5]) for row in rows),
+            'quote': sum(float(row[7]) for row in rows),
+            # Klines cover whole minutes, so the measured span starts at the first bar's open
+            'since': rows[0][0] / 1000 if rows else start,
+        }
+    
+    def _reference_price(self, symbol: str) -> Optional[float]:
+        book = self.get_order_book(symbol)
+        mid = book.mid() if book is not None else None
+        if mid is not None:
+            return mid
+        try:
+            return float(self.client.futures_symbol_ticker(symbol=symbol)['price'])
+        except Exception as e:
+            self.logger.warning(f"Could not fetch a reference price for {symbol}: {e}")
+            return None
+    
+    def _finish_resting_order(self, symbol: str, order: Dict[str, Any]) -> Dict[str, Any]:
+        """Final state of a resting order: as it stands if it is done, else cancel what is left."""
+        order = self.get_order_status(symbol, order['orderId'])
+        if order.get('status') in FINAL_ORDER_STATUSES:
+            return order
+        try:
+            # The cancel response carries the final executedQty
+            return self.cancel_order(symbol, order['orderId'])
+        except binance.BinanceAPIException:
+            # Filled between the status check and the cancel
+            return self.get_order_status(symbol, order['orderId'])
+    
+    def _place_vwap_passive(self, symbol: str, side: str, quantity: float,
+                            limit_offset_ticks: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Rest a post-only limit behind the touch; None when the slice should go to market instead."""
+        if limit_offset_ticks is None:
+            return None
+        try:
+            price = self.quote_limit_price(symbol, side, limit_offset_ticks)
+            # GTX = post-only: it expires instead of crossing the spread
+            return self.place_limit_order(symbol, side, quantity, price, time_in_force='GTX')
+        except RiskRejected:
+            raise
+        except ValueError as e:
+            self.logger.info(f"VWAP slice going to market: {e}")
+        except binance.BinanceAPIException as e:
+            if e.code != POST_ONLY_REJECTED_CODE:
+                raise
+            # The touch moved through our price before the order arrived
+            self.logger.info(f"VWAP slice going to market: post-only limit at {price} would have crossed")
+        return None
+    
+    def _send_vwap_market(self, symbol: str, side: str, quantity: float) -> Optional[Dict[str, Any]]:
+        try:
+            order = self.place_market_order(symbol, side, quantity)
+        except RiskRejected:
+            raise
+        except ValueError as e:
+            # Partial passive fill left less than the symbol's minimum order size
+            self.logger.info(f"VWAP market child {quantity} not sent: {e}")
+            return None
+        return {'order': order, 'quantity': float(order.get('executedQty') or 0),
+                'price': float(order.get('avgPrice') or 0), 'passive': False}
+    
+    @staticmethod
+    def _record_vwap_fills(run: VwapRun, index: int, target: float, fills: List[Dict[str, Any]]):
+        done = sum(fill['quantity'] for fill in fills)
+        for fill in fills:
+            fill['slice'] = index
+        run.fills.extend(fills)
+        run.executed += done
+        run.carry = target - done
+    
+    def _plan_vwap(self, symbol: str, side: str, total_quantity: float, duration_minutes: int,
+                   num_orders: int, participation_cap: float, limit_wait_fraction: float) -> Dict[str, Any]:
+        plan = self._plan_twap(symbol, side, total_quantity, duration_minutes, num_orders)
+        if not 0 < participation_cap <= 1:
+            raise ValueError(f"Participation cap must be in (0, 1]. Got: {participation_cap}")
+        if not 0 <= limit_wait_fraction < 1:
+            raise ValueError(f"Limit wait fraction must be in [0, 1). Got: {limit_wait_fraction}")
+        plan['duration_minutes'] = duration_minutes
+        return plan
+    
+    def start_vwap(self, plan: Dict[str, Any], participation_cap: float = 0.1, time_jitter: float = 0.3,
+                   size_jitter: float = 0.1, limit_offset_ticks: Optional[int] = 0,
+                   limit_wait_fraction: float = 0.5, profile: Optional[VolumeProfile] = None,
+                   seed: Optional[int] = None) -> VwapRun:
+        """Load the profile, sync the book and lay out the slice schedule for a ``_plan_vwap`` plan."""
+        symbol, side = plan['symbol'], plan['side']
+        if profile is None:
+            profile = self.load_volume_profile(symbol)
+        if limit_offset_ticks is not None and self.get_order_book(symbol) is None:
+            try:
+                # Slices go to market until the book has synced
+                self.watch_order_book(symbol)
+            except Exception as e:
+                self.logger.warning(f"Order book unavailable for {symbol}; VWAP slices will go to market: {e}")
+        
+        start = time.time()
+        schedule = plan_vwap_slices(profile, start, plan['duration_minutes'] * 60, plan['num_orders'],
+                                    time_jitter, size_jitter, random.Random(seed))
+        run = VwapRun(symbol, side, plan['total_quantity'], profile, schedule, start,
+                      self._reference_price(symbol), participation_cap, limit_offset_ticks, limit_wait_fraction)
+        self.logger.info(
+            f"EXECUTING VWAP STRATEGY: {side} {run.total_quantity} {symbol} | Orders: {run.num_orders} | "
+            f"Profile: {profile.source} | Cap: {participation_cap:.0%}"
+        )
+        return run
+    
+    def run_vwap_slice(self, run: VwapRun) -> List[Dict[str, Any]]:
+        """Size and send the next slice of ``run`` now, whatever its send time; returns its fills.
+
+        A passive child is left resting as ``run.working`` and returns no fills yet.
+        """
+        i = run.index
+        _, window, fraction = run.schedule[i]
+        run.index += 1
+        now = time.time()
+        remaining = run.total_quantity - run.executed
+        target = remaining if i == run.num_orders - 1 else max(0.0, run.total_quantity * fraction + run.carry)
+        quantity = target
+        live = self._market_volume(run.symbol, run.last_check, now)
+        if live is not None:
+            expected = run.profile.expected_volume(live['since'], now)
+            if expected:
+                scale = min(max(live['base'] / expected, 1 / VWAP_LIVE_SCALE_LIMIT), VWAP_LIVE_SCALE_LIMIT)
+                quantity *= scale
+            quantity = min(quantity, run.participation_cap * live['base'])
+        quantity = min(quantity, remaining)
+        run.last_check = now
+        
+        try:
+            self._apply_symbol_filters({'symbol': run.symbol, 'side': run.side, 'type': 'MARKET',
+                                        'quantity': quantity})
+        except ValueError as e:
+            # Too small to send after capping; carry it into the next slice
+            self.logger.info(f"VWAP Order {i + 1}/{run.num_orders} skipped: {e}")
+            run.carry = target
+            return []
+        
+        self.logger.info(f"VWAP Order {i + 1}/{run.num_orders}: {quantity:.8g} (target {target:.8g})")
+        order = self._place_vwap_passive(run.symbol, run.side, quantity, run.limit_offset_ticks)
+        if order is not None:
+            # settle_vwap_child picks it up at the deadline; nothing waits on it meanwhile
+            run.working = {'slice': i, 'order': order, 'quantity': quantity, 'target': target,
+                           'deadline': now + window * run.limit_wait_fraction}
+            return []
+        fill = self._send_vwap_market(run.symbol, run.side, quantity)
+        fills = [fill] if fill is not None else []
+        self._record_vwap_fills(run, i, target, fills)
+        return fills
+    
+    def settle_vwap_child(self, run: VwapRun, send_remainder: bool = True) -> List[Dict[str, Any]]:
+        """Take the working passive child off the book and send whatever it did not fill at market."""
+        child, run.working = run.working, None
+        if child is None:
+            return []
+        order = self._finish_resting_order(run.symbol, child['order'])
+        fills = []
+        filled = float(order.get('executedQty') or 0)
+        if filled:
+            fills.append({'order': order, 'quantity': filled, 'passive': True,
+                          'price': float(order.get('avgPrice') or 0) or float(order['price'])})
+        remaining = child['quantity'] - filled
+        if remaining > 0 and send_remainder:
+            fill = self._send_vwap_market(run.symbol, run.side, remaining)
+            if fill is not None:
+                fills.append(fill)
+        self._record_vwap_fills(run, child['slice'], child['target'], fills)
+        return fills
+    
+    def run_vwap_step(self, run: VwapRun) -> List[Dict[str, Any]]:
+        """Do whatever ``run`` has due next: settle its working child, else start the next slice."""
+        if run.working is not None:
+            return self.settle_vwap_child(run)
+        return self.run_vwap_slice(run)
+    
+    def finish_vwap(self, run: VwapRun) -> Dict[str, Any]:
+        """Realized price of ``run`` against arrival and the market's VWAP over the execution."""
+        finished = time.time()
+        fills, executed = run.fills, run.executed
+        avg_price = sum(f['quantity'] * f['price'] for f in fills) / executed if executed else None
+        market = self._market_volume(run.symbol, run.start, finished)
+        market_vwap = market['quote'] / market['base'] if market and market['base'] else None
+        sign = 1.0 if run.side == 'BUY' else -1.0
+        
+        def slippage_bps(benchmark: Optional[float]) -> Optional[float]:
+            # Positive = paid more than the benchmark (BUY) / received less (SELL)
+            if avg_price is None or not benchmark:
+                return None
+            return round(sign * (avg_price - benchmark) / benchmark * 1e4, 3)
+        
+        summary = {
+            'strategy': 'VWAP',
+            'symbol': run.symbol,
+            'side': run.side,
+            'total_quantity': run.total_quantity,
+            'executed_quantity': executed,
+            'remaining_quantity': max(0.0, run.total_quantity - executed),
+            'total_orders': run.num_orders,
+            'successful_orders': len({fill['slice'] for fill in fills}),
+            'profile': run.profile.source,
+            'avg_price': avg_price,
+            'arrival_price': run.arrival_price,
+            'market_vwap': market_vwap,
+            'slippage_vs_arrival_bps': slippage_bps(run.arrival_price),
+            'slippage_vs_vwap_bps': slippage_bps(market_vwap),
+            'passive_fill_rate': round(sum(f['quantity'] for f in fills if f['passive']) / executed, 4)
+                                 if executed else None,
+            'participation_rate': round(executed / market['base'], 4) if market and market['base'] else None,
+            'duration_seconds': round(finished - run.start, 3),
+            'orders': [fill['order'] for fill in fills],
+        }
+        self.logger.info(
+            f"VWAP STRATEGY COMPLETED: {executed:.8g}/{run.total_quantity} @ {avg_price} | "
+            f"vs arrival {summary['slippage_vs_arrival_bps']} bps | vs VWAP {summary['slippage_vs_vwap_bps']} bps"
+        )
+        return summary
+    
+    def execute_vwap(self, symbol: str, side: str, total_quantity: float, duration_minutes: int,
+                     num_orders: int = 10, participation_cap: float = 0.1, time_jitter: float = 0.3,
+                     size_jitter: float = 0.1, limit_offset_ticks: Optional[int] = 0,
+                     limit_wait_fraction: float = 0.5, profile: Optional[VolumeProfile] = None,
+                     seed: Optional[int] = None) -> Dict[str, Any]:
+        """Work ``total_quantity`` over ``duration_minutes`` along the intraday volume curve.
+
+        Slice sizes follow ``profile`` (``load_volume_profile`` by default) and are
+        scaled by how busy the market has been since the last slice, then capped at
+        ``participation_cap`` of that traded volume; whatever a slice could not do
+        carries over to the next one. Each child rests as a post-only limit
+        ``limit_offset_ticks`` behind the touch for ``limit_wait_fraction`` of its
+        window before the rest goes at market (``None`` sends every slice at market).
+        Blocks until the last slice; ``TwapEngine.submit_vwap`` runs the same steps
+        in the background. Returns the fills plus realized price against arrival
+        and interval VWAP.
+        """
+        plan = self._plan_vwap(symbol, side, total_quantity, duration_minutes, num_orders,
+                               participation_cap, limit_wait_fraction)
+        try:
+            run = self.start_vwap(plan, participation_cap, time_jitter, size_jitter, limit_offset_ticks,
+                                  limit_wait_fraction, profile, seed)
+            while not run.done:
+                delay = run.next_due_time() - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                self.run_vwap_step(run)
+        except Exception as e:
+            self.logger.error(f"VWAP FAILED: {e}")
+            raise
+        return self.finish_vwap(run)
+    
     def get_account_balance(self) -> Dict[str, Any]:
+        if self.user_stream is not None and self.user_stream.ready:
+            return self.user_stream.get_balances()
         try:
             self.logger.info("Fetching account balance...")
             balance = self.client.futures_account_balance()
-            self.logger.info(f"API Response: {balance}")
+            self.logger.info(f"Fetched balances for {len(balance)} assets")
             return balance
         except Exception as e:
             self.logger.error(f"Failed to get balance: {e}")
@@ -343,10 +1165,17 @@ class BasicBot:
     def get_order_status(self, symbol: str, order_id: int) -> Dict[str, Any]:
         try:
             symbol = self._validate_symbol(symbol)
+            if self.user_stream is not None and self.user_stream.ready:
+                order = self.user_stream.get_order(order_id)
+                if order is not None and order.get('symbol') == symbol:
+                    return order
             self.logger.info(f"Fetching order status for Order ID: {order_id}")
             
             order = self.client.futures_get_order(symbol=symbol, orderId=order_id)
             self.logger.info(f"Order Status: {order.get('status')}")
+            if self.user_stream is not None:
+                self.user_stream.remember_order(order)
+            self.position_book.apply_order(order)
             
             return order
         except Exception as e:
@@ -360,6 +1189,9 @@ class BasicBot:
             
             result = self.client.futures_cancel_order(symbol=symbol, orderId=order_id)
             self.logger.info(f"Order cancelled: {order_id}")
+            self._journal_order(result, 'cancel')
+            # A partially filled order reports its final executedQty here
+            self.position_book.apply_order(result)
             
             return result
         except Exception as e:
@@ -0,0 +1,87 @@
+"""Cold-start benchmark for the Flask app.
+
+Each run starts a fresh interpreter, imports ``app:app`` and serves one
+``GET /api/health`` through the test client, recording import time and
+time-to-first-response. Use ``--max-p50-ms`` in CI to catch regressions and
+``--record`` to append results to a JSON-lines history file.
+
+    python benchmarks/cold_start.py --runs 20 --max-p50-ms 600
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+response = app.app.test_client().get('/api/health')
+t2 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_response_ms': (t2 - t0) * 1000}))
+"""
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_once():
+    env = dict(os.environ)
+    # Do not hand the probe credentials from the calling shell
+    env.pop('API_KEY', None)
+    env.pop('API_SECRET', None)
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-p50-ms', type=float, default=None,
+                        help='Exit non-zero if p50 time-to-first-response exceeds this')
+    parser.add_argument('--record', default=None, help='Append the summary to this JSON-lines file')
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    imports = [s['import_ms'] for s in samples]
+    firsts = [s['first_response_ms'] for s in samples]
+
+    summary = {
+        'timestamp': time.time(),
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'import_ms_p50': round(statistics.median(imports), 1),
+        'import_ms_p90': round(percentile(imports, 90), 1),
+        'first_response_ms_p50': round(statistics.median(firsts), 1),
+        'first_response_ms_p90': round(percentile(firsts, 90), 1),
+    }
+
+    print(f"import app:               p50 {summary['import_ms_p50']:.1f} ms | p90 {summary['import_ms_p90']:.1f} ms")
+    print(f"first /api/health reply:  p50 {summary['first_response_ms_p50']:.1f} ms | "
+          f"p90 {summary['first_response_ms_p90']:.1f} ms")
+
+    if args.record:
+        with open(args.record, 'a') as f:
+            f.write(json.dumps(summary) + '\n')
+
+    if args.max_p50_ms is not None and summary['first_response_ms_p50'] > args.max_p50_ms:
+        print(f"REGRESSION: p50 {summary['first_response_ms_p50']:.1f} ms exceeds {args.max_p50_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
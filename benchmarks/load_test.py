@@ -0,0 +1,189 @@
+"""HTTP load test for the Flask API against the in-process fake exchange.
+
+Starts ``app.py`` in a child process with ``BOT_FAKE_EXCHANGE=1`` (or targets
+``--url``), then runs ``--clients`` concurrent clients for ``--duration``
+seconds. Each client draws requests from a weighted mix of order placement,
+order status, balance and health calls. Reports throughput and p50/p99/max
+latency per endpoint and overall.
+
+    python benchmarks/load_test.py --clients 16 --duration 20 --latency-ms 5
+    python benchmarks/load_test.py --url http://localhost:5000 --clients 32
+
+The clients share this interpreter, so past a few dozen clients the load
+generator itself becomes the bottleneck; run several copies to go further.
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER = """
+import logging, sys
+from werkzeug.serving import run_simple
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+import app
+run_simple('127.0.0.1', int(sys.argv[1]), app.app, threaded=True)
+"""
+
+SYMBOLS = ('BTCUSDT', 'ETHUSDT', 'BNBUSDT')
+QUANTITIES = {'BTCUSDT': 0.001, 'ETHUSDT': 0.01, 'BNBUSDT': 0.1}
+LIMIT_PRICES = {'BTCUSDT': 40000.0, 'ETHUSDT': 2500.0, 'BNBUSDT': 400.0}
+
+# name: weight in the request mix
+MIX = {
+    'market-order': 30,
+    'limit-order': 30,
+    'order-status': 20,
+    'balance': 10,
+    'health': 10,
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, scratch: str, args) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, BOT_FAKE_EXCHANGE='1',
+               FAKE_LATENCY_MS=str(args.latency_ms), FAKE_JITTER_MS=str(args.jitter_ms),
+               FAKE_ERROR_RATE=str(args.error_rate),
+               # Random buys and sells would otherwise trip the order-rate and position limits
+               RISK_MAX_ORDERS_PER_SECOND='0', RISK_MAX_POSITION_NOTIONAL='0')
+    console = open(os.path.join(scratch, 'server.log'), 'w')
+    return subprocess.Popen([sys.executable, '-c', SERVER, str(port)], cwd=scratch, env=env,
+                            stdout=console, stderr=subprocess.STDOUT)
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.post(f'{url}/api/init', timeout=2).ok:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout:.0f}s")
+
+
+class Client(threading.Thread):
+
+    def __init__(self, url: str, deadline: float, seed: int):
+        super().__init__(daemon=True)
+        self.url = url
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.session = requests.Session()
+        self.samples: List[Tuple[str, float, bool]] = []
+        self.order_ids: List[Tuple[str, int]] = []
+
+    def request(self, name: str) -> bool:
+        symbol = self.rng.choice(SYMBOLS)
+        side = self.rng.choice(('BUY', 'SELL'))
+        if name == 'market-order':
+            response = self.session.post(f'{self.url}/api/market-order', json={
+                'symbol': symbol, 'side': side, 'quantity': QUANTITIES[symbol]})
+        elif name == 'limit-order':
+            response = self.session.post(f'{self.url}/api/limit-order', json={
+                'symbol': symbol, 'side': 'BUY', 'quantity': QUANTITIES[symbol], 'price': LIMIT_PRICES[symbol]})
+        elif name == 'order-status' and self.order_ids:
+            symbol, order_id = self.rng.choice(self.order_ids)
+            response = self.session.post(f'{self.url}/api/order-status', json={
+                'symbol': symbol, 'orderId': order_id})
+        elif name == 'balance':
+            response = self.session.get(f'{self.url}/api/balance')
+        else:
+            response = self.session.get(f'{self.url}/api/health')
+
+        if not response.ok:
+            return False
+        order = response.json().get('order') or {}
+        if order.get('orderId') is not None:
+            self.order_ids.append((order['symbol'], int(order['orderId'])))
+        return True
+
+    def run(self):
+        names, weights = zip(*MIX.items())
+        while time.monotonic() < self.deadline:
+            name = self.rng.choices(names, weights)[0]
+            if name == 'order-status' and not self.order_ids:
+                name = 'market-order'
+            start = time.perf_counter()
+            try:
+                ok = self.request(name)
+            except requests.RequestException:
+                ok = False
+            self.samples.append((name, time.perf_counter() - start, ok))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(samples: List[Tuple[str, float, bool]], elapsed: float, clients: int):
+    by_name: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+    for name, latency, ok in samples:
+        by_name[name].append((latency, ok))
+        by_name['TOTAL'].append((latency, ok))
+
+    print(f"{clients} clients, {elapsed:.1f}s")
+    print(f"{'endpoint':<14}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name in sorted(by_name, key=lambda n: (n == 'TOTAL', n)):
+        rows = by_name[name]
+        latencies = sorted(latency for latency, _ in rows)
+        errors = sum(1 for _, ok in rows if not ok)
+        print(f"{name:<14}{len(rows):>10}{errors:>8}{len(rows) / elapsed:>10.1f}"
+              f"{percentile(latencies, 0.5) * 1000:>10.2f}{percentile(latencies, 0.99) * 1000:>10.2f}"
+              f"{latencies[-1] * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Target an already running server instead of starting one')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15.0, help='Seconds of load after warm-up')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Fake exchange round trip')
+    parser.add_argument('--jitter-ms', type=float, default=2.0, help='Mean extra exponential delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of orders rejected at random')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        server = None
+        url = args.url
+        if url is None:
+            port = free_port()
+            url = f'http://127.0.0.1:{port}'
+            server = start_server(port, scratch, args)
+        try:
+            wait_ready(url)
+            start = time.monotonic()
+            clients = [Client(url, start + args.duration, args.seed + i) for i in range(args.clients)]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            elapsed = time.monotonic() - start
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+    report([sample for client in clients for sample in client.samples], elapsed, args.clients)
+
+
+if __name__ == '__main__':
+    main()
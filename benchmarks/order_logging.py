@@ -0,0 +1,95 @@
+"""Per-order logging overhead benchmark.
+
+Places orders against ``FakeFuturesClient`` with logging disabled, with
+synchronous handlers and with the queue-based pipeline,
+each in a fresh interpreter and a scratch directory. It reports wall time per
+order (mean, p99) and the order thread's own CPU time, whose difference from
+the no-logging baseline is the logging cost paid on the order path.
+
+With a simulated round trip (``--latency``, default 1 ms) the background
+writer gets the GIL while the order thread waits on the exchange, as it would
+on a real connection; ``--latency 0`` shows the raw CPU cost instead.
+
+    python benchmarks/order_logging.py --orders 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, logging, os, sys, time
+from basic_bot import BasicBot
+from fake_exchange import FakeFuturesClient
+from rate_limiter import RateLimiter
+from risk_engine import RiskLimits
+
+mode, orders, latency = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+# Measure logging alone, without the order journal's writes
+os.environ['BOT_JOURNAL'] = '0'
+if mode == 'none':
+    # A handler already attached means BasicBot configures none of its own
+    logging.getLogger('BasicBot').addHandler(logging.NullHandler())
+    logging.getLogger('BasicBot').disabled = True
+else:
+    os.environ['BOT_LOG_MODE'] = mode
+
+bot = BasicBot('fake', 'fake', testnet=True, client=FakeFuturesClient(latency=latency, prices={'BTCUSDT': 50000.0}))
+# Lift the order-rate budget and risk limits so the run measures logging, not throttling
+bot.client._limiter = RateLimiter(10 ** 9, 10 ** 9, 10 ** 9)
+bot.risk.limits = RiskLimits.unlimited()
+bot.symbol_filters.get('BTCUSDT')
+
+samples = []
+cpu_start = time.thread_time()
+for i in range(orders):
+    start = time.perf_counter()
+    if i % 2:
+        bot.place_market_order('BTCUSDT', 'BUY', 0.001)
+    else:
+        bot.place_limit_order('BTCUSDT', 'SELL', 0.001, 60000.0)
+    samples.append(time.perf_counter() - start)
+cpu = time.thread_time() - cpu_start
+
+samples.sort()
+print(json.dumps({
+    'mean_us': sum(samples) / len(samples) * 1e6,
+    'cpu_us': cpu / orders * 1e6,
+    'p99_us': samples[int(len(samples) * 0.99)] * 1e6,
+}))
+"""
+
+
+def run_mode(mode: str, orders: int, latency: float) -> dict:
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        with open(os.path.join(scratch, 'console.log'), 'w') as console:
+            output = subprocess.run(
+                [sys.executable, '-c', PROBE, mode, str(orders), str(latency)],
+                cwd=scratch, env=env, stderr=console, stdout=subprocess.PIPE, text=True, check=True
+            ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.001,
+                        help='Simulated exchange round trip in seconds; 0 measures pure CPU cost')
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args.orders, args.latency) for mode in ('none', 'sync', 'async')}
+    baseline = results['none']
+
+    print(f"{'mode':<8}{'mean us/order':>15}{'p99 us':>10}{'order-thread CPU us':>22}{'logging CPU us':>17}")
+    for mode, result in results.items():
+        print(f"{mode:<8}{result['mean_us']:>15.1f}{result['p99_us']:>10.1f}"
+              f"{result['cpu_us']:>22.1f}{result['cpu_us'] - baseline['cpu_us']:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
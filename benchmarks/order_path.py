@@ -0,0 +1,213 @@
+"""Microbenchmarks for the local stages of the order path.
+
+Times each stage that ``place_market_order`` / ``place_limit_order`` run on
+top of the network round trip: input validation, request building (symbol
+filter rounding), client order id assignment, pre-trade risk checks, the
+order journal, order-event
+logging, the rate-limited client wrapper around a zero-latency
+``FakeFuturesClient``, and ``jsonify`` of the response as ``app.py`` returns
+it. It also times both calls end to end. Each stage is calibrated to about
+``--round-seconds`` per round; the reported figure is the median per-call
+time over ``--rounds`` rounds, plus the fastest round. A round ends only
+once the background log writer has drained, so each figure is the stage's
+full CPU cost and one stage's log backlog never lands in the next stage's
+timing.
+
+``--save`` writes the results as a baseline; ``--compare`` exits non-zero when
+any stage's fastest round is more than ``--max-regression`` slower than the
+baseline's. The fastest round is compared because interference from other
+processes only ever adds time. Baselines only compare like with like: record
+one per machine or CI runner, and raise the threshold on shared runners.
+
+    python benchmarks/order_path.py --save benchmarks/order_path_baseline.json
+    python benchmarks/order_path.py --compare benchmarks/order_path_baseline.json --max-regression 0.25
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+LIMIT = {'symbol': 'BTCUSDT', 'side': 'SELL', 'type': 'LIMIT', 'timeInForce': 'GTC',
+         'quantity': 0.0012345, 'price': 60000.123}
+
+
+def build_stages(scratch: str) -> Tuple[Dict[str, Callable[[], object]], Callable[[], None]]:
+    # Imported here so bot.log and orders.db land in the scratch directory
+    from flask import Flask, jsonify
+    from basic_bot import BasicBot
+    from fake_exchange import FakeFuturesClient
+    from log_pipeline import configure_logger
+    from order_journal import OrderJournal
+    from rate_limiter import RateLimiter
+    from risk_engine import RiskLimits
+
+    # The bot's own pipeline (async unless BOT_LOG_MODE=sync) with the console muted; bot.log gets every record
+    logger = logging.getLogger('BasicBot')
+    listener = configure_logger(logger)
+    (listener.handlers if listener is not None else logger.handlers)[0].setLevel(logging.CRITICAL)
+
+    def drain_logs():
+        while listener is not None and not listener.queue.empty():
+            time.sleep(0.0005)
+
+    journal = OrderJournal(os.path.join(scratch, 'orders.db'))
+    bot = BasicBot('fake', 'fake', testnet=True, journal=journal,
+                   client=FakeFuturesClient(prices={'BTCUSDT': 50000.0}))
+    # Lift the order-rate budget so stages measure local work, not throttling
+    bot.client._limiter = RateLimiter(10 ** 9, 10 ** 9, 10 ** 9)
+    # Same for the risk engine's order rate and the position that repeated buys build up;
+    # the per-order notional and kill-switch checks still run
+    bot.risk.limits = RiskLimits(max_orders_per_second=0, max_position_notional=0, max_daily_loss=1e12)
+    bot.position_book.on_mark_price('BTCUSDT', 50000.0)
+    bot.symbol_filters.get('BTCUSDT')
+
+    params = bot._apply_symbol_filters(dict(LIMIT))
+    order = bot.place_limit_order('BTCUSDT', 'SELL', 0.001, 60000.0)
+    ids = itertools.count()
+    flask_app = Flask(__name__)
+
+    def validate():
+        bot._validate_symbol('btcusdt')
+        bot._validate_side('sell')
+        bot._validate_quantity('0.0012345')
+        bot._validate_price('60000.123')
+
+    def client_id():
+        bot._assign_client_order_id(dict(params))
+
+    def journal_writes():
+        client_order_id = f'bench-{next(ids)}'
+        journal.record_intent(client_order_id, params)
+        journal.record_order(client_order_id, order)
+
+    def client_call():
+        bot.client.futures_create_order(newClientOrderId=f'bench-{next(ids)}', **params)
+
+    def jsonify_response():
+        with flask_app.app_context():
+            jsonify({'success': True, 'order': order}).get_data()
+
+    stages = {
+        'validate': validate,
+        'build_request': lambda: bot._apply_symbol_filters(dict(LIMIT)),
+        'client_order_id': client_id,
+        'risk_check': lambda: bot.risk.check(params),
+        'journal': journal_writes,
+        'log_event': lambda: bot._log_order_event('placed', params, order),
+        'rate_limited_call': client_call,
+        'jsonify': jsonify_response,
+        'place_market_order': lambda: bot.place_market_order('BTCUSDT', 'BUY', 0.001),
+        'place_limit_order': lambda: bot.place_limit_order('BTCUSDT', 'SELL', 0.001, 60000.0),
+    }
+    return stages, drain_logs
+
+
+def measure(func: Callable[[], object], settle: Callable[[], None], rounds: int,
+            round_seconds: float) -> Dict[str, float]:
+    # Calibrate: grow the batch until one batch takes a measurable slice of the round
+    iterations = 1
+    while True:
+        settle()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        settle()
+        elapsed = time.perf_counter() - start
+        if elapsed >= round_seconds / 10 or iterations >= 1_000_000:
+            break
+        iterations *= 2
+    iterations = max(1, int(iterations * round_seconds / max(elapsed, 1e-9)))
+
+    per_call = []
+    for _ in range(rounds):
+        settle()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        settle()
+        per_call.append((time.perf_counter() - start) / iterations * 1e6)
+    return {
+        'median_us': round(statistics.median(per_call), 3),
+        'min_us': round(min(per_call), 3),
+        'iterations': iterations,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            max_regression: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        change = result['min_us'] / base['min_us'] - 1
+        result['vs_baseline'] = round(change, 3)
+        if change > max_regression:
+            regressions.append((name, base['min_us'], result['min_us'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--round-seconds', type=float, default=0.2)
+    parser.add_argument('--stage', action='append', help='Only run these stages (repeatable)')
+    parser.add_argument('--save', default=None, help='Write the results to this baseline file')
+    parser.add_argument('--compare', default=None, help='Baseline file to check for regressions')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help="Fail when a stage's fastest round is this fraction slower than the baseline's")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        try:
+            stages, settle = build_stages(scratch)
+            results = {
+                name: measure(func, settle, args.rounds, args.round_seconds)
+                for name, func in stages.items() if not args.stage or name in args.stage
+            }
+        finally:
+            os.chdir(cwd)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)['stages'], args.max_regression)
+
+    print(f"{'stage':<20}{'median us':>12}{'min us':>10}{'iterations':>12}{'vs baseline':>13}")
+    for name, result in results.items():
+        change = result.get('vs_baseline')
+        change_text = f"{change:+.1%}" if change is not None else '-'
+        print(f"{name:<20}{result['median_us']:>12.2f}{result['min_us']:>10.2f}"
+              f"{result['iterations']:>12}{change_text:>13}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'timestamp': time.time(),
+                'python': sys.version.split()[0],
+                'machine': platform.platform(),
+                'stages': {name: {'median_us': r['median_us'], 'min_us': r['min_us']}
+                           for name, r in results.items()},
+            }, f, indent=2)
+            f.write('\n')
+
+    if regressions:
+        for name, before, after, change in regressions:
+            print(f"REGRESSION: {name} {before:.2f} us -> {after:.2f} us ({change:+.1%})")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
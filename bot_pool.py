@@ -0,0 +1,154 @@
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable
+
+DEFAULT_ACCOUNT = 'default'
+# Account ids end up in env var names and journal file names
+ACCOUNT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+
+class AccountConfig:
+
+    __slots__ = ('account_id', 'api_key', 'api_secret', 'testnet')
+
+    def __init__(self, account_id: str, api_key: str, api_secret: str, testnet: bool = True):
+        if not ACCOUNT_ID_PATTERN.match(account_id or ''):
+            raise ValueError(f"Invalid account id: {account_id!r} (use up to 32 of A-Z a-z 0-9 _ -)")
+        self.account_id = account_id
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Never the secret, and only enough of the key to tell accounts apart
+        return {'account': self.account_id, 'testnet': self.testnet,
+                'apiKey': f"{self.api_key[:6]}..." if self.api_key else None}
+
+
+def accounts_from_env() -> Dict[str, AccountConfig]:
+    """API_KEY/API_SECRET is the default account; ``BOT_ACCOUNTS=sub1,sub2`` adds one account
+    per name, with keys in API_KEY_SUB1/API_SECRET_SUB1 and so on. Accounts without keys are skipped."""
+    logger = logging.getLogger('BasicBot.Pool')
+    accounts = {}
+    api_key, api_secret = os.environ.get('API_KEY'), os.environ.get('API_SECRET')
+    if api_key and api_secret:
+        accounts[DEFAULT_ACCOUNT] = AccountConfig(DEFAULT_ACCOUNT, api_key, api_secret)
+    for account_id in os.environ.get('BOT_ACCOUNTS', '').split(','):
+        account_id = account_id.strip()
+        if not account_id or account_id == DEFAULT_ACCOUNT:
+            continue
+        if not ACCOUNT_ID_PATTERN.match(account_id):
+            logger.warning(f"Account {account_id!r}: invalid name in BOT_ACCOUNTS; skipped")
+            continue
+        suffix = account_id.upper().replace('-', '_')
+        api_key, api_secret = os.environ.get(f'API_KEY_{suffix}'), os.environ.get(f'API_SECRET_{suffix}')
+        if not api_key or not api_secret:
+            logger.warning(f"Account {account_id}: API_KEY_{suffix}/API_SECRET_{suffix} not set; skipped")
+            continue
+        accounts[account_id] = AccountConfig(account_id, api_key, api_secret)
+    return accounts
+
+
+class BotPool:
+    """One bot per account, built on first use and reused for the life of the process.
+
+    Each bot keeps its own python-binance client, and with it one HTTP session
+    whose connections stay open between calls. It also has its own rate
+    limiter, streams and journal. Binance counts orders per account but request
+    weight per IP. Spreading orders over sub-accounts therefore adds order-rate
+    headroom, while each bot's weight estimate is corrected from the shared
+    ``X-MBX-USED-WEIGHT-1M`` header.
+
+    ``factory(config)`` builds a bot. Concurrent first requests for one account
+    wait on a single build, and different accounts build in parallel.
+    ``fan_out`` runs one call on every account at once.
+    """
+
+    def __init__(self, factory: Callable[[AccountConfig], Any],
+                 accounts: Optional[Dict[str, AccountConfig]] = None, max_workers: int = 8):
+        self.factory = factory
+        self.logger = logging.getLogger('BasicBot.Pool')
+        self.accounts: Dict[str, AccountConfig] = dict(accounts or {})
+        self.max_workers = max_workers
+
+        self._bots: Dict[str, Any] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add_account(self, config: AccountConfig):
+        with self._lock:
+            self.accounts[config.account_id] = config
+
+    @property
+    def account_ids(self) -> List[str]:
+        with self._lock:
+            return sorted(self.accounts)
+
+    def get(self, account_id: str = DEFAULT_ACCOUNT) -> Any:
+        """The bot for ``account_id``, built on first use; ValueError for an unknown account."""
+        bot = self._bots.get(account_id)
+        if bot is not None:
+            return bot
+        with self._lock:
+            config = self.accounts.get(account_id)
+            if config is None:
+                raise ValueError(f"Unknown account: {account_id}")
+            build_lock = self._build_locks.setdefault(account_id, threading.Lock())
+        with build_lock:
+            bot = self._bots.get(account_id)
+            if bot is None:
+                self.logger.info(f"Creating bot for account {account_id}")
+                bot = self.factory(config)
+                with self._lock:
+                    self._bots[account_id] = bot
+        return bot
+
+    def peek(self, account_id: str) -> Optional[Any]:
+        """The bot for ``account_id`` if it has been built, without building it."""
+        return self._bots.get(account_id)
+
+    def put(self, account_id: str, bot: Any):
+        """Install a bot built elsewhere, e.g. the default account's on re-initialization."""
+        with self._lock:
+            self._bots[account_id] = bot
+
+    def fan_out(self, func: Callable[[Any], Any],
+                account_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Run ``func(bot)`` for every account concurrently; one account failing never hides the others."""
+        account_ids = account_ids if account_ids is not None else self.account_ids
+
+        def run(account_id: str) -> Dict[str, Any]:
+            try:
+                return {'success': True, 'result': func(self.get(account_id))}
+            except Exception as e:
+                self.logger.error(f"Account {account_id}: {e}")
+                return {'success': False, 'message': str(e)}
+
+        if len(account_ids) <= 1:
+            return {account_id: run(account_id) for account_id in account_ids}
+        executor = self._get_executor()
+        futures = {account_id: executor.submit(run, account_id) for account_id in account_ids}
+        return {account_id: future.result() for account_id, future in futures.items()}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pool-fanout')
+            return self._executor
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            configs = sorted(self.accounts.values(), key=lambda c: c.account_id)
+            built = set(self._bots)
+        return [dict(config.to_dict(), initialized=config.account_id in built) for config in configs]
+
+    def stop(self):
+        with self._lock:
+            bots, self._bots = list(self._bots.values()), {}
+        for bot in bots:
+            if hasattr(bot, 'stop_streams'):
+                bot.stop_streams()
@@ -22,6 +22,8 @@ def print_menu():
     print("  [5] TWAP Strategy (Time-Weighted Average Price)")
     print("  [6] View Account Balance")
     print("  [7] Check Order Status")
+    print("  [8] View Positions & PnL")
+    print("  [9] VWAP Strategy (Volume-Weighted Average Price)")
     print("  [0] Exit")
     print("-" * 80)
 
@@ -44,6 +46,17 @@ def get_input(prompt, input_type=str, default=None):
             print(f"Invalid input. Please enter a valid {input_type.__name__}")
 
 
+def print_failure(label, error):
+    reasons = getattr(error, 'reasons', None)
+    if not reasons:
+        print(f"\n{label}: {error}")
+        return
+    # Risk rejections: one line per failed check
+    print(f"\n{label}: rejected by risk checks")
+    for reason in reasons:
+        print(f"  - {reason['check']}: {reason['message']}")
+
+
 def place_market_order(bot):
     print("\n" + "=" * 80)
     print("MARKET ORDER (Immediate Execution)")
@@ -63,7 +76,7 @@ def place_market_order(bot):
             print(f"Status: {order.get('status')}")
             print(f"Executed Qty: {order.get('executedQty')}")
         except Exception as e:
-            print(f"\nOrder failed: {e}")
+            print_failure("Order failed", e)
     else:
         print("\nOrder cancelled by user")
 
@@ -88,7 +101,7 @@ def place_limit_order(bot):
             print(f"Status: {order.get('status')}")
             print(f"Price: {order.get('price')}")
         except Exception as e:
-            print(f"\nOrder failed: {e}")
+            print_failure("Order failed", e)
     else:
         print("\nOrder cancelled by user")
 
@@ -114,7 +127,7 @@ def place_stop_limit_order(bot):
             print("\nORDER PLACED SUCCESSFULLY!")
             print(f"Order ID: {order.get('orderId')}")
         except Exception as e:
-            print(f"\nOrder failed: {e}")
+            print_failure("Order failed", e)
     else:
         print("\nOrder cancelled by user")
 
@@ -141,7 +154,7 @@ def place_oco_order(bot):
             print(f"Take-Profit Order ID: {result['take_profit_order'].get('orderId')}")
             print(f"Stop-Loss Order ID: {result['stop_loss_order'].get('orderId')}")
         except Exception as e:
-            print(f"\nOCO order failed: {e}")
+            print_failure("OCO order failed", e)
     else:
         print("\nOrder cancelled by user")
 
@@ -169,7 +182,42 @@ def execute_twap(bot):
             print(f"Total Orders: {result['total_orders']}")
             print(f"Successful: {result['successful_orders']}")
         except Exception as e:
-            print(f"\nTWAP failed: {e}")
+            print_failure("TWAP failed", e)
+    else:
+        print("\nStrategy cancelled by user")
+
+
+def execute_vwap(bot):
+    print("\n" + "=" * 80)
+    print("VWAP STRATEGY (Volume-Weighted Average Price)")
+    print("=" * 80)
+    
+    if not hasattr(bot, 'execute_vwap'):
+        print("\nVWAP is not available with BOT_ASYNC_CLIENT=1")
+        return
+    
+    symbol = get_input("Enter symbol (e.g., BTCUSDT)", str)
+    side = get_input("Enter side (BUY/SELL)", str)
+    total_quantity = get_input("Enter total quantity", float)
+    duration = get_input("Enter duration in minutes", int)
+    num_orders = get_input("Enter number of orders (default: 10)", int, default=10)
+    participation_cap = get_input("Enter max share of market volume (default: 0.1)", float, default=0.1)
+    
+    confirm = input(
+        f"\nConfirm VWAP {side} {total_quantity} {symbol} over {duration}min ({num_orders} orders)? (yes/no): "
+    )
+    
+    if confirm.lower() == 'yes':
+        try:
+            print("\nExecuting VWAP strategy...")
+            result = bot.execute_vwap(symbol, side, total_quantity, duration, num_orders,
+                                      participation_cap=participation_cap)
+            print("\nVWAP STRATEGY COMPLETED!")
+            print(f"Executed: {result['executed_quantity']}/{result['total_quantity']} @ {result['avg_price']}")
+            print(f"Slippage vs Arrival: {result['slippage_vs_arrival_bps']} bps")
+            print(f"Slippage vs Market VWAP: {result['slippage_vs_vwap_bps']} bps")
+        except Exception as e:
+            print_failure("VWAP failed", e)
     else:
         print("\nStrategy cancelled by user")
 
@@ -220,6 +268,41 @@ def check_order_status(bot):
         print(f"\nFailed to get order status: {e}")
 
 
+def view_positions(bot):
+    print("\n" + "=" * 80)
+    print("POSITIONS & PnL")
+    print("=" * 80)
+    
+    try:
+        # Loaded from the exchange on first view; later views are served from memory
+        book = bot.get_positions()
+        positions = [p for p in book['positions'] if p['quantity']]
+        
+        if not positions:
+            print("\nNo open positions")
+        else:
+            print("\n{:<12} {:<6} {:>14} {:>14} {:>14} {:>14}".format(
+                "Symbol", "Side", "Quantity", "Entry", "Mark", "Unrealized"))
+            print("-" * 80)
+            for position in positions:
+                mark = position['markPrice']
+                print("{:<12} {:<6} {:>14.6g} {:>14.6f} {:>14} {:>14.4f}".format(
+                    position['symbol'],
+                    position['side'],
+                    position['quantity'],
+                    position['entryPrice'],
+                    f"{mark:.6f}" if mark is not None else "-",
+                    position['unrealizedPnl']
+                ))
+        
+        totals = book['totals']
+        print("-" * 80)
+        print(f"Unrealized PnL: {totals['unrealizedPnl']:.4f}")
+        print(f"Realized PnL (this session): {totals['realizedPnl']:.4f}")
+    except Exception as e:
+        print(f"\nFailed to get positions: {e}")
+
+
 def main():
     load_dotenv()
     
@@ -234,7 +317,17 @@ def main():
     print("Initializing bot...")
     
     try:
-        bot = BasicBot(api_key, api_secret, testnet=True)
+        if os.getenv('BOT_ASYNC_CLIENT') == '1':
+            from async_bot import create_sync_bot
+            bot = create_sync_bot(api_key, api_secret, testnet=True)
+        else:
+            bot = BasicBot(api_key, api_secret, testnet=True)
+        bot.check_connection()
+        if hasattr(bot, 'start_position_stream'):
+            # Fills arrive on the user-data stream and marks on the mark-price stream,
+            # so the positions view never polls REST
+            bot.start_user_stream()
+            bot.start_position_stream()
         print("Bot initialized successfully!\n")
     except Exception as e:
         print(f"Failed to initialize bot: {e}")
@@ -242,7 +335,7 @@ def main():
     
     while True:
         print_menu()
-        choice = input("\nEnter your choice (0-7): ").strip()
+        choice = input("\nEnter your choice (0-9): ").strip()
         
         if choice == '1':
             place_market_order(bot)
@@ -258,13 +351,17 @@ def main():
             view_balance(bot)
         elif choice == '7':
             check_order_status(bot)
+        elif choice == '8':
+            view_positions(bot)
+        elif choice == '9':
+            execute_vwap(bot)
         elif choice == '0':
             print("\n" + "=" * 80)
             print(" " * 25 + "Goodbye! Happy Trading!")
             print("=" * 80 + "\n")
             break
         else:
-            print("\nInvalid choice. Please select 0-7.")
+            print("\nInvalid choice. Please select 0-9.")
         
         input("\nPress Enter to continue...")
 
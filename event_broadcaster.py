@@ -0,0 +1,115 @@
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Optional, Dict, Any, Iterator
+
+HEARTBEAT_SECONDS = 15.0
+
+
+class Subscription:
+
+    def __init__(self, subscriber_id: int, max_pending: int):
+        self.subscriber_id = subscriber_id
+        self.queue: 'queue.Queue[Optional[str]]' = queue.Queue(maxsize=max_pending)
+        self.dropped = False
+
+    def push(self, frame: Optional[str]) -> bool:
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            return False
+
+
+class EventBroadcaster:
+    """Fans events out to every connected dashboard as Server-Sent Events.
+
+    Producers (the user-data stream, the TWAP engine) publish once, and each
+    event is serialized once no matter how many tabs are open. Every subscriber
+    gets a bounded queue. A subscriber that falls ``max_pending`` frames behind
+    is disconnected, so a stalled tab cannot hold memory or slow the others.
+    The browser's EventSource reconnects and gets a fresh snapshot.
+    """
+
+    def __init__(self, max_pending: int = 256):
+        self.max_pending = max_pending
+        self.logger = logging.getLogger('BasicBot.Broadcaster')
+
+        self.published = 0
+        self._ids = itertools.count(1)
+        self._event_ids = itertools.count(1)
+        self._subscribers: Dict[int, Subscription] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @staticmethod
+    def format_event(event: str, data: Any, event_id: Optional[int] = None) -> str:
+        frame = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        return f"id: {event_id}\n{frame}" if event_id is not None else frame
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(next(self._ids), self.max_pending)
+        with self._lock:
+            self._subscribers[subscription.subscriber_id] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.pop(subscription.subscriber_id, None)
+
+    def publish(self, event: str, data: Any):
+        frame = self.format_event(event, data, next(self._event_ids))
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+            self.published += 1
+
+        for subscription in subscribers:
+            if not subscription.push(frame):
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        self.logger.warning(f"Dashboard subscriber {subscription.subscriber_id} fell behind; disconnecting")
+        # Wake the reader so it notices; make room first if the queue is full
+        try:
+            subscription.queue.get_nowait()
+        except queue.Empty:
+            pass
+        subscription.push(None)
+
+    def stream(self, subscription: Subscription, initial: Iterator[str] = (),
+               heartbeat: float = HEARTBEAT_SECONDS, max_seconds: Optional[float] = None) -> Iterator[str]:
+        """Yield SSE frames for one subscriber until it is dropped or ``max_seconds`` pass.
+
+        Comment frames are sent every ``heartbeat`` seconds so proxies keep the
+        connection open and closed clients are noticed on the next write.
+        """
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        try:
+            yield 'retry: 3000\n\n'
+            for frame in initial:
+                yield frame
+            while not subscription.dropped:
+                timeout = heartbeat
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    timeout = min(timeout, remaining)
+                try:
+                    frame = subscription.queue.get(timeout=timeout)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,438 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+from binance.exceptions import BinanceAPIException
+
+from positions import Position
+
+
+CONDITIONAL_TYPES = ('STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET', 'TRAILING_STOP_MARKET')
+
+# symbol: (tickSize, stepSize, minQty, min notional)
+FAKE_SYMBOLS = {
+    'BTCUSDT': ('0.10', '0.001', '0.001', '5'),
+    'ETHUSDT': ('0.01', '0.001', '0.001', '5'),
+    'BNBUSDT': ('0.010', '0.01', '0.01', '5'),
+    'SOLUSDT': ('0.0100', '1', '1', '5'),
+    'XRPUSDT': ('0.0001', '0.1', '0.1', '5'),
+}
+DEFAULT_PRICES = {'BTCUSDT': 50000.0, 'ETHUSDT': 3000.0, 'BNBUSDT': 500.0, 'SOLUSDT': 150.0, 'XRPUSDT': 0.5}
+
+
+class FakeFuturesClient:
+    """In-process stand-in for the USDT-M futures calls BasicBot makes.
+
+    Each call sleeps for ``latency`` seconds to simulate the network round trip,
+    plus an exponentially distributed extra delay with mean ``latency_jitter``
+    for a realistic tail. Errors can be injected per order type with
+    ``inject_error`` to exercise rejection and rollback paths without touching
+    the testnet; ``after_create`` places the order before raising, like a
+    response lost to a timeout. ``error_rate`` rejects that fraction of all
+    new orders with ``error_code`` at random.
+    """
+
+    # No websocket streams behind it; order books are served as polled snapshots
+    supports_streams = False
+
+    def __init__(self, latency: float = 0.0, prices: Optional[Dict[str, float]] = None,
+                 latency_jitter: float = 0.0, error_rate: float = 0.0, error_code: int = -2010,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.prices = dict(prices or {})
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.algo_orders: Dict[int, Dict[str, Any]] = {}
+        self.positions: Dict[str, Position] = {}
+        self.calls: List[str] = []
+        self.book_update_id = 0
+
+        self._ids = itertools.count(1)
+        self._errors: List[Dict[str, Any]] = []
+        self._client_ids: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'FakeFuturesClient':
+        """Build from FAKE_LATENCY_MS, FAKE_JITTER_MS, FAKE_ERROR_RATE and FAKE_ERROR_CODE."""
+        return cls(
+            latency=float(os.environ.get('FAKE_LATENCY_MS', '0')) / 1000,
+            latency_jitter=float(os.environ.get('FAKE_JITTER_MS', '0')) / 1000,
+            error_rate=float(os.environ.get('FAKE_ERROR_RATE', '0')),
+            error_code=int(os.environ.get('FAKE_ERROR_CODE', '-2010')),
+            prices=DEFAULT_PRICES,
+        )
+
+    def inject_error(self, order_type: Optional[str] = None, code: int = -2010,
+                     message: str = 'Order would immediately trigger.', count: int = 1,
+                     status_code: int = 400, after_create: bool = False):
+        with self._lock:
+            self._errors.append({'type': order_type, 'code': code, 'message': message, 'count': count,
+                                 'status_code': status_code, 'after_create': after_create})
+
+    def _call(self, name: str):
+        delay = self.latency
+        if self.latency_jitter:
+            with self._lock:
+                delay += self._random.expovariate(1 / self.latency_jitter)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.calls.append(name)
+
+    def _take_error(self, order_type: str, after_create: bool = False) -> Optional[BinanceAPIException]:
+        with self._lock:
+            for rule in self._errors:
+                if rule['type'] in (None, order_type) and rule['count'] > 0 and rule['after_create'] == after_create:
+                    rule['count'] -= 1
+                    return BinanceAPIException(
+                        None, rule['status_code'], json.dumps({'code': rule['code'], 'msg': rule['message']})
+                    )
+            if not after_create and self.error_rate and self._random.random() < self.error_rate:
+                return BinanceAPIException(
+                    None, 400, json.dumps({'code': self.error_code, 'msg': 'Injected random rejection.'})
+                )
+        return None
+
+    def ping(self) -> Dict[str, Any]:
+        self._call('ping')
+        return {}
+
+    def futures_exchange_info(self) -> Dict[str, Any]:
+        self._call('futures_exchange_info')
+        symbols = []
+        for symbol, (tick, step, min_qty, notional) in FAKE_SYMBOLS.items():
+            symbols.append({
+                'symbol': symbol,
+                'status': 'TRADING',
+                'contractType': 'PERPETUAL',
+                'quoteAsset': 'USDT',
+                'filters': [
+                    {'filterType': 'PRICE_FILTER', 'minPrice': tick, 'maxPrice': '1000000', 'tickSize': tick},
+                    {'filterType': 'LOT_SIZE', 'minQty': min_qty, 'maxQty': '1000', 'stepSize': step},
+                    {'filterType': 'MARKET_LOT_SIZE', 'minQty': min_qty, 'maxQty': '120', 'stepSize': step},
+                    {'filterType': 'MIN_NOTIONAL', 'notional': notional},
+                ],
+            })
+        return {'timezone': 'UTC', 'serverTime': int(time.time() * 1000), 'symbols': symbols}
+
+    def futures_order_book(self, **params) -> Dict[str, Any]:
+        self._call('futures_order_book')
+        symbol = params['symbol']
+        tick = float(FAKE_SYMBOLS[symbol][0])
+        mid = self.prices.get(symbol, 100.0)
+        levels = int(params.get('limit', 500))
+        with self._lock:
+            self.book_update_id += 1
+        return {
+            'lastUpdateId': self.book_update_id,
+            'E': int(time.time() * 1000),
+            'bids': [[f'{mid - tick * (i + 1):.8f}', '1.000'] for i in range(levels)],
+            'asks': [[f'{mid + tick * (i + 1):.8f}', '1.000'] for i in range(levels)],
+        }
+
+    def futures_mark_price(self, **params) -> Any:
+        self._call('futures_mark_price')
+        symbols = [params['symbol']] if params.get('symbol') else list(self.prices)
+        marks = [{'symbol': symbol, 'markPrice': f'{self.prices.get(symbol, 100.0):.8f}',
+                  'time': int(time.time() * 1000)} for symbol in symbols]
+        return marks[0] if params.get('symbol') else marks
+
+    def futures_create_order(self, **params) -> Dict[str, Any]:
+        self._call('futures_create_order')
+        return self._create_order(params)
+
+    def futures_place_batch_order(self, **params) -> List[Dict[str, Any]]:
+        self._call('futures_place_batch_order')
+        results = []
+        for order in params['batchOrders']:
+            try:
+                results.append(self._create_order(order))
+            except BinanceAPIException as e:
+                results.append({'code': e.code, 'msg': e.message})
+        return results
+
+    def _create_order(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        order_type = params.get('type', '').upper()
+
+        error = self._take_error(order_type)
+        if error is not None:
+            raise error
+
+        client_id = params.get('clientAlgoId') or params.get('newClientOrderId')
+        with self._lock:
+            duplicate = client_id is not None and self._by_client_id(client_id) is not None
+        if duplicate:
+            raise BinanceAPIException(None, 400, json.dumps({'code': -4116, 'msg': 'ClientOrderId is duplicated.'}))
+
+        order = self._place(order_type, params)
+        error = self._take_error(order_type, after_create=True)
+        if error is not None:
+            raise error
+        return order
+
+    def _place(self, order_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        now = int(time.time() * 1000)
+        order_id = next(self._ids)
+
+        if order_type in CONDITIONAL_TYPES:
+            order = {
+                'algoId': order_id,
+                'clientAlgoId': params.get('clientAlgoId', f'fake-{order_id}'),
+                'algoType': 'CONDITIONAL',
+                'orderType': order_type,
+                'symbol': params['symbol'],
+                'side': params['side'],
+                'quantity': str(params.get('quantity')),
+                'price': str(params.get('price', '0')),
+                'triggerPrice': str(params.get('stopPrice', '0')),
+                'timeInForce': params.get('timeInForce', 'GTC'),
+                'algoStatus': 'NEW',
+                'createTime': now,
+                'updateTime': now,
+            }
+            with self._lock:
+                self.algo_orders[order_id] = order
+                self._client_ids[order['clientAlgoId']] = order
+            return dict(order)
+
+        quantity = float(params['quantity'])
+        is_market = order_type == 'MARKET'
+        fill_price = self.prices.get(params['symbol'], 0.0)
+        order = {
+            'orderId': order_id,
+            'symbol': params['symbol'],
+            'status': 'FILLED' if is_market else 'NEW',
+            'clientOrderId': params.get('newClientOrderId', f'fake-{order_id}'),
+            'price': str(params.get('price', '0')),
+            'avgPrice': str(fill_price if is_market else 0),
+            'origQty': str(quantity),
+            'executedQty': str(quantity if is_market else 0),
+            'cumQuote': str(quantity * fill_price if is_market else 0),
+            'timeInForce': params.get('timeInForce', 'GTC'),
+            'type': order_type,
+            'reduceOnly': False,
+            'side': params['side'],
+            'positionSide': 'BOTH',
+            'stopPrice': '0',
+            'origType': order_type,
+            'updateTime': now,
+        }
+        with self._lock:
+            self.orders[order_id] = order
+            self._client_ids[order['clientOrderId']] = order
+            if is_market:
+                self._fill(order, quantity, fill_price)
+        return dict(order)
+
+    def _fill(self, order: Dict[str, Any], quantity: float, price: float):
+        # Caller holds self._lock
+        position = self.positions.get(order['symbol'])
+        if position is None:
+            position = self.positions[order['symbol']] = Position(order['symbol'])
+        position.apply_fill(quantity if order['side'] == 'BUY' else -quantity, price, order['updateTime'])
+
+    def set_price(self, symbol: str, price: float) -> List[Dict[str, Any]]:
+        """Move ``symbol`` to ``price``: crossed limit orders fill and crossed conditional orders trigger.
+
+        Returns the orders and algo orders that changed, in the shape their REST
+        endpoints return, so callers can replay them as stream events.
+        """
+        now = int(time.time() * 1000)
+        changed = []
+        triggered = []
+        with self._lock:
+            self.prices[symbol] = price
+            for order in self.orders.values():
+                if order['symbol'] != symbol or order['status'] not in ('NEW', 'PARTIALLY_FILLED'):
+                    continue
+                limit = float(order['price'])
+                if (price <= limit) if order['side'] == 'BUY' else (price >= limit):
+                    order.update(status='FILLED', executedQty=order['origQty'], avgPrice=str(limit),
+                                 cumQuote=str(float(order['origQty']) * limit), updateTime=now)
+                    self._fill(order, float(order['origQty']), limit)
+                    changed.append(dict(order))
+            for order in self.algo_orders.values():
+                if order['symbol'] != symbol or order['algoStatus'] != 'NEW':
+                    continue
+                trigger = float(order['triggerPrice'])
+                # Stops trigger when price moves against the side, take-profits when it moves in favour
+                rising = (order['side'] == 'BUY') == order['orderType'].startswith('STOP')
+                if (price >= trigger) if rising else (price <= trigger):
+                    order.update(algoStatus='TRIGGERED', updateTime=now)
+                    triggered.append(order)
+
+        for order in triggered:
+            market = order['orderType'].endswith('MARKET')
+            actual = self._place('MARKET' if market else 'LIMIT', {
+                'symbol': symbol, 'side': order['side'], 'quantity': order['quantity'],
+                'price': order['price'],
+            })
+            with self._lock:
+                order['actualOrderId'] = actual['orderId']
+                changed.append(dict(order))
+            changed.append(actual)
+        return changed
+
+    def futures_get_order(self, **params) -> Dict[str, Any]:
+        self._call('futures_get_order')
+        with self._lock:
+            order = self._find(params)
+            return dict(order)
+
+    def futures_get_open_orders(self, **params) -> List[Dict[str, Any]]:
+        self._call('futures_get_open_orders')
+        symbol = params.get('symbol')
+        with self._lock:
+            return [
+                dict(o) for o in self.orders.values()
+                if o['status'] in ('NEW', 'PARTIALLY_FILLED') and symbol in (None, o['symbol'])
+            ]
+
+    def futures_get_open_algo_orders(self, **params) -> List[Dict[str, Any]]:
+        self._call('futures_get_open_algo_orders')
+        symbol = params.get('symbol')
+        with self._lock:
+            return [
+                dict(o) for o in self.algo_orders.values()
+                if o['algoStatus'] == 'NEW' and symbol in (None, o['symbol'])
+            ]
+
+    def futures_get_all_orders(self, **params) -> List[Dict[str, Any]]:
+        self._call('futures_get_all_orders')
+        since = params.get('startTime', 0)
+        with self._lock:
+            return [dict(o) for o in self.orders.values()
+                    if o['symbol'] == params['symbol'] and o['updateTime'] >= since]
+
+    def futures_get_all_algo_orders(self, **params) -> List[Dict[str, Any]]:
+        self._call('futures_get_all_algo_orders')
+        since = params.get('startTime', 0)
+        with self._lock:
+            return [dict(o) for o in self.algo_orders.values()
+                    if o['symbol'] == params['symbol'] and o['updateTime'] >= since]
+
+    def futures_cancel_order(self, **params) -> Dict[str, Any]:
+        self._call('futures_cancel_order')
+        with self._lock:
+            order = self._find(params)
+            status_key = 'algoStatus' if 'algoId' in order else 'status'
+            if order[status_key] not in ('NEW', 'PARTIALLY_FILLED'):
+                raise BinanceAPIException(None, 400, json.dumps({'code': -2011, 'msg': 'Unknown order sent.'}))
+            order[status_key] = 'CANCELED'
+            return dict(order)
+
+    def futures_account_balance(self, **params) -> List[Dict[str, Any]]:
+        self._call('futures_account_balance')
+        return [{
+            'accountAlias': 'fake',
+            'asset': 'USDT',
+            'balance': '10000.00000000',
+            'crossWalletBalance': '10000.00000000',
+            'crossUnPnl': '0.00000000',
+            'availableBalance': '10000.00000000',
+            'maxWithdrawAmount': '10000.00000000',
+            'marginAvailable': True,
+            'updateTime': int(time.time() * 1000),
+        }]
+
+    def futures_position_information(self, **params) -> List[Dict[str, Any]]:
+        self._call('futures_position_information')
+        symbol = params.get('symbol')
+        with self._lock:
+            # Like positionRisk v3: only symbols with a position
+            return [{
+                'symbol': p.symbol,
+                'positionSide': 'BOTH',
+                'positionAmt': str(p.quantity),
+                'entryPrice': str(p.entry_price),
+                'markPrice': str(self.prices.get(p.symbol, p.entry_price)),
+                'unRealizedProfit': str((self.prices.get(p.symbol, p.entry_price) - p.entry_price) * p.quantity),
+                'updateTime': p.updated_at,
+            } for p in self.positions.values() if p.quantity and symbol in (None, p.symbol)]
+
+    def _by_client_id(self, client_id: str) -> Optional[Dict[str, Any]]:
+        # Caller holds self._lock
+        return self._client_ids.get(client_id)
+
+    def _find(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if 'algoId' in params:
+            order = self.algo_orders.get(int(params['algoId']))
+        elif 'clientAlgoId' in params or 'origClientOrderId' in params:
+            order = self._by_client_id(params.get('clientAlgoId') or params.get('origClientOrderId'))
+        else:
+            order = self.orders.get(int(params.get('orderId', 0)))
+        if order is None:
+            raise BinanceAPIException(None, 400, json.dumps({'code': -2013, 'msg': 'Order does not exist.'}))
+        return order
+
+
+
+class AsyncFakeFuturesClient:
+    """AsyncClient-shaped view of a FakeFuturesClient, for AsyncBasicBot.
+
+    Each call runs the fake's method on a worker thread, so its simulated
+    latency does not block the event loop. Orders, errors and prices live on
+    ``fake`` and can be inspected or injected there.
+    """
+
+    supports_streams = False
+
+    def __init__(self, fake: Optional[FakeFuturesClient] = None):
+        self.fake = fake if fake is not None else FakeFuturesClient(prices=DEFAULT_PRICES)
+
+    def __getattr__(self, name):
+        attr = getattr(self.fake, name)
+        if not callable(attr) or not (name.startswith('futures_') or name == 'ping'):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def close_connection(self):
+        pass
+
+if __name__ == "__main__":
+    import logging
+    from basic_bot import BasicBot
+    from order_journal import OrderJournal
+
+    latency = 0.05
+    client = FakeFuturesClient(latency=latency)
+    # In-memory journal: fake orders must never be reconciled against the real exchange later
+    bot = BasicBot('fake', 'fake', testnet=True, client=client, journal=OrderJournal(':memory:'))
+    bot.logger.setLevel(logging.WARNING)
+    # Load the symbol filters up front so the first timing does not include exchangeInfo
+    bot.symbol_filters.get('BTCUSDT')
+
+    start = time.perf_counter()
+    bot.place_limit_order('BTCUSDT', 'SELL', 0.001, 55000.0)
+    bot.place_stop_limit_order('BTCUSDT', 'SELL', 0.001, 45000.0, 45000.0)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bot.place_oco_order('BTCUSDT', 'BUY', 0.001, 55000.0, 45000.0)
+    concurrent = time.perf_counter() - start
+
+    print(f"Simulated latency per request: {latency * 1000:.0f} ms")
+    print(f"Sequential OCO legs: {sequential * 1000:.1f} ms")
+    print(f"Concurrent OCO legs: {concurrent * 1000:.1f} ms")
+
+    client.inject_error('STOP')
+    try:
+        bot.place_oco_order('BTCUSDT', 'BUY', 0.001, 56000.0, 44000.0)
+    except BinanceAPIException as e:
+        live = client.futures_get_open_orders(symbol='BTCUSDT')
+        print(f"Stop leg rejected ({e.code}); take-profit rolled back: "
+              f"{all(o['price'] != '56000.0' for o in live)}")
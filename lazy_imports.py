@@ -0,0 +1,35 @@
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in that imports the real module on first attribute access and delegates to it.
+
+    It is never put in ``sys.modules``: a LazyLoader module registered there gets
+    executed from inside the import system when a submodule is imported first
+    (``from binance.exceptions import ...``), which runs that submodule twice and
+    leaves two distinct exception classes.
+    """
+
+    def __getattr__(self, attr):
+        module = sys.modules.get(self.__name__) or importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str):
+    """Return module ``name`` without executing it until an attribute is first read.
+
+    python-binance pulls in aiohttp, websockets and dateparser at import time, which
+    dominates serverless cold starts; deferring it lets ``/api/health`` and the
+    index page answer before the exchange client is ever needed.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    if importlib.util.find_spec(name) is None:
+        # Let the normal import machinery raise its usual ModuleNotFoundError
+        return importlib.import_module(name)
+
+    return _LazyModule(name)
@@ -0,0 +1,115 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional, Dict, Any, List
+
+LOG_FILE = 'bot.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Order response fields worth keeping in an order event record
+ORDER_EVENT_KEYS = (
+    'orderId', 'algoId', 'clientOrderId', 'status', 'algoStatus',
+    'executedQty', 'avgPrice', 'price', 'triggerPrice', 'updateTime',
+)
+
+CONSOLE_FORMAT = '%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s | %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per line; order events carry their fields under ``order``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        order = getattr(record, 'order', None)
+        if order is not None:
+            entry['order'] = order
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(',', ':'), default=str)
+
+
+class _PassThroughQueueHandler(logging.handlers.QueueHandler):
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats and copies every record on the caller's thread;
+        # the listener lives in this process, so hand the record over untouched
+        return record
+
+
+def order_event(event: str, params: Dict[str, Any], order: Optional[Dict[str, Any]] = None,
+                error: Optional[Exception] = None) -> Dict[str, Any]:
+    """Build the structured payload for one order event (request params plus key response fields)."""
+    payload = {'event': event}
+    payload.update(params)
+    if order:
+        for key in ORDER_EVENT_KEYS:
+            value = order.get(key)
+            if value is not None:
+                payload[key] = value
+    if error is not None:
+        payload['code'] = getattr(error, 'code', None)
+        payload['error'] = getattr(error, 'message', None) or str(error)
+    return payload
+
+
+def _open_file_handler(logger: logging.Logger) -> Optional[logging.Handler]:
+    max_bytes = int(os.environ.get('LOG_MAX_BYTES', LOG_MAX_BYTES))
+    backups = int(os.environ.get('LOG_BACKUP_COUNT', LOG_BACKUP_COUNT))
+    try:
+        return logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=max_bytes, backupCount=backups)
+    except Exception as e:
+        # Serverless (e.g., Vercel) root FS is read-only; /tmp is writable
+        try:
+            tmp_path = os.environ.get('LOG_FILE', '/tmp/bot.log')
+            handler = logging.handlers.RotatingFileHandler(tmp_path, maxBytes=max_bytes, backupCount=backups)
+            logger.warning(f"File logging redirected to {tmp_path}: {e}")
+            return handler
+        except Exception as e2:
+            # If even /tmp fails, continue with console-only logging
+            logger.warning(f"File logging disabled due to: {e} | {e2}")
+            return None
+
+
+def configure_logger(logger: logging.Logger, mode: Optional[str] = None) -> Optional[logging.handlers.QueueListener]:
+    """Attach console and rotating JSON-file handlers to ``logger``.
+
+    In ``async`` mode (the default; set ``BOT_LOG_MODE=sync`` for the old
+    behaviour) the logger only gets a QueueHandler. Formatting and all console
+    and disk I/O happen on a QueueListener thread, so an order thread pays for
+    one queue put per record. The listener is flushed at interpreter exit.
+    """
+    mode = (mode or os.environ.get('BOT_LOG_MODE', 'async')).lower()
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, datefmt=DATE_FORMAT))
+    handlers: List[logging.Handler] = [console_handler]
+
+    file_handler = _open_file_handler(logger)
+    if file_handler is not None:
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    for handler in handlers:
+        handler.setLevel(logging.INFO)
+
+    if mode != 'async':
+        for handler in handlers:
+            logger.addHandler(handler)
+        return None
+
+    log_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    logger.addHandler(_PassThroughQueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
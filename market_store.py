@@ -0,0 +1,315 @@
+"""Local columnar store of futures 1m klines and aggTrades, memory-mapped for reads.
+
+Each symbol/dataset is a directory of raw fixed-width column files
+(``market_data/BTCUSDT/klines_1m/close.f8`` ...) that only ever grow at the
+end. Readers map them with ``np.memmap`` in read-only mode, so the Flask app,
+the CLI, backtests and sweep workers all share one copy through the page cache,
+and a reader only ever sees whole rows: the row count is the shortest column.
+
+    python market_store.py sync --symbols BTCUSDT,ETHUSDT --since 2024-01-01
+    python market_store.py info
+"""
+import argparse
+import contextlib
+import datetime
+import logging
+import os
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from backtest import Bars
+from lazy_imports import lazy_import
+from rate_limiter import RateLimiter, RateLimitedClient
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer use only
+    fcntl = None
+
+
+binance = lazy_import('binance')
+
+MARKET_DATA_DIR = 'market_data'
+KLINE_INTERVAL_MS = 60_000
+KLINE_LIMIT = 1500
+AGG_TRADE_LIMIT = 1000
+# aggTrades startTime/endTime windows may not exceed one hour
+AGG_TRADE_WINDOW_MS = 60 * 60 * 1000
+DEFAULT_SYNC_DAYS = 1
+
+# dataset -> ordered (column, dtype); the first column is the sort key
+SCHEMAS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    'klines_1m': (
+        ('open_time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+        ('close', '<f8'), ('volume', '<f8'),
+    ),
+    'agg_trades': (
+        ('agg_id', '<i8'), ('time', '<i8'), ('price', '<f8'), ('quantity', '<f8'),
+        ('is_buyer_maker', '|u1'),
+    ),
+}
+
+
+class MarketStore:
+    """Append-only per-symbol column files under ``root`` (``MARKET_DATA_DIR`` env)."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.environ.get('MARKET_DATA_DIR', MARKET_DATA_DIR)
+        self.logger = logging.getLogger('BasicBot.MarketStore')
+        # (symbol, dataset) -> (rows, {column: memmap})
+        self._maps: Dict[Tuple[str, str], Tuple[int, Dict[str, np.ndarray]]] = {}
+
+    def _dir(self, symbol: str, dataset: str) -> str:
+        if dataset not in SCHEMAS:
+            raise ValueError(f"Unknown dataset {dataset}; expected one of {', '.join(SCHEMAS)}")
+        return os.path.join(self.root, symbol.upper(), dataset)
+
+    def _path(self, symbol: str, dataset: str, column: str, dtype: str) -> str:
+        return os.path.join(self._dir(symbol, dataset), f'{column}.{dtype[1:]}')
+
+    def _row_count(self, symbol: str, dataset: str) -> int:
+        rows = None
+        for column, dtype in SCHEMAS[dataset]:
+            try:
+                size = os.path.getsize(self._path(symbol, dataset, column, dtype))
+            except OSError:
+                return 0
+            count = size // np.dtype(dtype).itemsize
+            rows = count if rows is None else min(rows, count)
+        return rows or 0
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def columns(self, symbol: str, dataset: str) -> Dict[str, np.ndarray]:
+        """Read-only memmaps of every column, remapped only when the files have grown."""
+        symbol = symbol.upper()
+        rows = self._row_count(symbol, dataset)
+        key = (symbol, dataset)
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == rows:
+            return cached[1]
+
+        mapped = {}
+        for column, dtype in SCHEMAS[dataset]:
+            if rows == 0:
+                # mmap cannot map an empty file
+                mapped[column] = np.empty(0, dtype=dtype)
+            else:
+                mapped[column] = np.memmap(self._path(symbol, dataset, column, dtype), dtype=dtype,
+                                           mode='r', shape=(rows,))
+        self._maps[key] = (rows, mapped)
+        return mapped
+
+    def read(self, symbol: str, dataset: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the rows whose time lies in ``[start, end)`` (epoch ms)."""
+        columns = self.columns(symbol, dataset)
+        times = columns['open_time' if dataset == 'klines_1m' else 'time']
+        lo = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side='left'))
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+    def klines(self, symbol: str, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        return self.read(symbol, 'klines_1m', start, end)
+
+    def agg_trades(self, symbol: str, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        return self.read(symbol, 'agg_trades', start, end)
+
+    def bars(self, symbol: str, start: Optional[int] = None, end: Optional[int] = None) -> Bars:
+        """Backtest bars backed directly by the memmaps (no copy)."""
+        k = self.klines(symbol, start, end)
+        return Bars(k['open_time'], k['open'], k['high'], k['low'], k['close'], k['volume'])
+
+    def info(self, symbol: str) -> Dict[str, Any]:
+        result = {'symbol': symbol.upper()}
+        for dataset in SCHEMAS:
+            columns = self.columns(symbol, dataset)
+            times = columns['open_time' if dataset == 'klines_1m' else 'time']
+            result[dataset] = {
+                'rows': len(times),
+                'first': int(times[0]) if len(times) else None,
+                'last': int(times[-1]) if len(times) else None,
+            }
+        return result
+
+    @contextlib.contextmanager
+    def _write_lock(self, symbol: str, dataset: str):
+        directory = self._dir(symbol, dataset)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, '.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._repair(symbol, dataset)
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _repair(self, symbol: str, dataset: str):
+        # A writer killed mid-append can leave columns of different lengths; cut back to whole rows
+        rows = self._row_count(symbol, dataset)
+        for column, dtype in SCHEMAS[dataset]:
+            path = self._path(symbol, dataset, column, dtype)
+            size = rows * np.dtype(dtype).itemsize
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+            elif os.path.getsize(path) != size:
+                self.logger.warning(f"Truncating {path} to {rows} rows after an incomplete append")
+                os.truncate(path, size)
+
+    def _append_locked(self, symbol: str, dataset: str, data: Dict[str, np.ndarray]) -> int:
+        key_column = SCHEMAS[dataset][0][0]
+        keys = np.asarray(data[key_column])
+        existing = self.columns(symbol, dataset)[key_column]
+        if len(existing):
+            # Only strictly newer rows, so the key column stays sorted and unique
+            keep = keys > existing[-1]
+            data = {name: np.asarray(values)[keep] for name, values in data.items()}
+            keys = keys[keep]
+        if not len(keys):
+            return 0
+        for column, dtype in SCHEMAS[dataset]:
+            with open(self._path(symbol, dataset, column, dtype), 'ab') as f:
+                f.write(np.ascontiguousarray(data[column], dtype=dtype).tobytes())
+        return len(keys)
+
+    def append(self, symbol: str, dataset: str, data: Dict[str, np.ndarray]) -> int:
+        """Append rows newer than the last stored key; returns how many were written."""
+        with self._write_lock(symbol, dataset):
+            return self._append_locked(symbol, dataset, data)
+
+    def sync(self, client, symbol: str, since: Optional[int] = None, klines: bool = True,
+             agg_trades: bool = True) -> Dict[str, int]:
+        """Fetch and append closed 1m klines and aggTrades newer than what is stored.
+
+        ``since`` (epoch ms) only matters for a dataset that is still empty;
+        afterwards each run resumes from the last stored open time / aggTrade id.
+        """
+        symbol = symbol.upper()
+        if since is None:
+            since = int(time.time() * 1000) - DEFAULT_SYNC_DAYS * 86_400_000
+        appended = {}
+        if klines:
+            with self._write_lock(symbol, 'klines_1m'):
+                appended['klines_1m'] = self._sync_klines(client, symbol, since)
+        if agg_trades:
+            with self._write_lock(symbol, 'agg_trades'):
+                appended['agg_trades'] = self._sync_agg_trades(client, symbol, since)
+        return appended
+
+    def _sync_klines(self, client, symbol: str, since: int) -> int:
+        stored = self.columns(symbol, 'klines_1m')['open_time']
+        start = int(stored[-1]) + KLINE_INTERVAL_MS if len(stored) else since
+        total = 0
+        while True:
+            rows = client.futures_klines(symbol=symbol, interval='1m', startTime=start, limit=KLINE_LIMIT)
+            now = int(time.time() * 1000)
+            # Drop the bar still forming; it is fetched again once closed
+            rows = [row for row in rows if int(row[6]) < now]
+            if not rows:
+                break
+            table = np.array([row[:6] for row in rows], dtype=np.float64)
+            total += self._append_locked(symbol, 'klines_1m', {
+                'open_time': table[:, 0].astype(np.int64), 'open': table[:, 1], 'high': table[:, 2],
+                'low': table[:, 3], 'close': table[:, 4], 'volume': table[:, 5],
+            })
+            start = int(rows[-1][0]) + KLINE_INTERVAL_MS
+            if len(rows) < KLINE_LIMIT:
+                break
+        return total
+
+    def _sync_agg_trades(self, client, symbol: str, since: int) -> int:
+        stored = self.columns(symbol, 'agg_trades')['agg_id']
+        from_id = int(stored[-1]) + 1 if len(stored) else None
+        window_start = since
+        total = 0
+        while True:
+            by_id = from_id is not None
+            if by_id:
+                trades = client.futures_aggregate_trades(symbol=symbol, fromId=from_id, limit=AGG_TRADE_LIMIT)
+            else:
+                # Nothing stored yet: walk hour windows from ``since`` to the first trade
+                if window_start > int(time.time() * 1000):
+                    break
+                trades = client.futures_aggregate_trades(symbol=symbol, startTime=window_start,
+                                                         endTime=window_start + AGG_TRADE_WINDOW_MS - 1,
+                                                         limit=AGG_TRADE_LIMIT)
+                window_start += AGG_TRADE_WINDOW_MS
+            if not trades:
+                if by_id:
+                    break
+                continue
+            total += self._append_locked(symbol, 'agg_trades', {
+                'agg_id': np.array([t['a'] for t in trades], dtype=np.int64),
+                'time': np.array([t['T'] for t in trades], dtype=np.int64),
+                'price': np.array([t['p'] for t in trades], dtype=np.float64),
+                'quantity': np.array([t['q'] for t in trades], dtype=np.float64),
+                'is_buyer_maker': np.array([t['m'] for t in trades], dtype=np.uint8),
+            })
+            from_id = int(trades[-1]['a']) + 1
+            if by_id and len(trades) < AGG_TRADE_LIMIT:
+                break
+        return total
+
+
+def _parse_since(value: str) -> int:
+    if value.isdigit():
+        return int(value)
+    moment = datetime.datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def _format_ms(value: Optional[int]) -> str:
+    if value is None:
+        return '-'
+    return datetime.datetime.fromtimestamp(value / 1000, tz=datetime.timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--root', default=None, help=f'Store directory (default: $MARKET_DATA_DIR or {MARKET_DATA_DIR})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sync_parser = commands.add_parser('sync', help='Append klines and aggTrades newer than what is stored')
+    sync_parser.add_argument('--symbols', default='BTCUSDT', help='Comma-separated symbols')
+    sync_parser.add_argument('--since', default=None,
+                             help=f'ISO date or epoch ms to start an empty dataset from (default: {DEFAULT_SYNC_DAYS} day ago)')
+    sync_parser.add_argument('--no-klines', action='store_true')
+    sync_parser.add_argument('--no-trades', action='store_true')
+    sync_parser.add_argument('--testnet', action='store_true', help='Sync from the futures testnet')
+
+    commands.add_parser('info', help='Show stored rows and time range per symbol')
+    args = parser.parse_args()
+
+    store = MarketStore(args.root)
+    if args.command == 'info':
+        for symbol in store.symbols():
+            info = store.info(symbol)
+            for dataset in SCHEMAS:
+                entry = info[dataset]
+                print(f"{symbol:<12}{dataset:<12}{entry['rows']:>12} rows  "
+                      f"{_format_ms(entry['first'])} -> {_format_ms(entry['last'])}")
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)-8s | %(message)s')
+    # Market data endpoints are public; no API key needed
+    client = RateLimitedClient(binance.Client(None, None, testnet=args.testnet, ping=False), RateLimiter())
+    since = _parse_since(args.since) if args.since else None
+    for symbol in (s.strip().upper() for s in args.symbols.split(',') if s.strip()):
+        started = time.perf_counter()
+        appended = store.sync(client, symbol, since=since, klines=not args.no_klines,
+                              agg_trades=not args.no_trades)
+        counts = ', '.join(f"{count} {dataset}" for dataset, count in appended.items())
+        print(f"{symbol}: appended {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""In-process counters, gauges and histograms rendered in Prometheus text format."""
+import bisect
+import itertools
+import threading
+import time
+import weakref
+from typing import Dict, Any, List, Tuple, Sequence
+
+# Seconds; fine at the low end where local work (validation, logging) lives
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+
+class Counter(_Metric):
+
+    kind = 'counter'
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0.0]
+        cell[0] += amount
+
+
+class Histogram(_Metric):
+
+    kind = 'histogram'
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        cell = shard.get(key)
+        if cell is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            cell = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self, labels: Tuple[str, ...] = ()) -> '_Timer':
+        return _Timer(self, labels)
+
+
+class _Timer:
+
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, self.labels)
+        return False
+
+
+class Gauge(_Metric):
+    """Last value wins; set from wherever the value is known (not sharded)."""
+
+    kind = 'gauge'
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, labelnames: Sequence[str]):
+        super().__init__(registry, name, help_text, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()):
+        self.values[labels] = float(value)
+
+
+class _ShardOwner:
+    """Lives only in its thread's local storage, so it is collected when the thread exits."""
+
+    __slots__ = ('__weakref__',)
+
+
+def _add_cell(series: Dict[Any, List[float]], key: Any, cell: List[float]):
+    current = series.get(key)
+    if current is None:
+        series[key] = list(cell)
+    else:
+        for i, value in enumerate(cell):
+            current[i] += value
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        # One shard per thread so recording takes no lock; live shards by id, exited threads folded into _base
+        self._shards: Dict[int, Dict[Tuple[str, Tuple[str, ...]], List[float]]] = {}
+        self._base: Dict[Tuple[str, Tuple[str, ...]], List[float]] = {}
+        self._shard_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _shard(self) -> Dict[Tuple[str, Tuple[str, ...]], List[float]]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = {}
+            owner = _ShardOwner()
+            with self._lock:
+                shard_id = next(self._shard_ids)
+                self._shards[shard_id] = values
+            weakref.finalize(owner, self._retire_shard, shard_id).atexit = False
+            self._local.owner = owner
+            self._local.values = values
+            return values
+
+    def _retire_shard(self, shard_id: int):
+        with self._lock:
+            values = self._shards.pop(shard_id, None)
+            for key, cell in (values or {}).items():
+                _add_cell(self._base, key, cell)
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if existing.kind != metric.kind:
+                    raise ValueError(f"Metric {metric.name} already registered as a {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help_text, labelnames))
+
+    def collect(self) -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+        """Sum every shard: metric name -> label values -> cell."""
+        totals: Dict[str, Dict[Tuple[str, ...], List[float]]] = {}
+        # Held throughout so a shard cannot be counted both live and folded into the base
+        with self._lock:
+            for shard in [self._base, *self._shards.values()]:
+                # list() copies the items without running Python code, so the owner thread cannot resize it mid-copy
+                for (name, labels), cell in list(shard.items()):
+                    _add_cell(totals.setdefault(name, {}), labels, cell)
+        return totals
+
+    def render(self) -> str:
+        totals = self.collect()
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            if isinstance(metric, Gauge):
+                for labels, value in sorted(metric.values.items()):
+                    lines.append(f'{metric.name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}')
+                continue
+            for labels, cell in sorted(totals.get(metric.name, {}).items()):
+                if isinstance(metric, Counter):
+                    lines.append(f'{metric.name}{_format_labels(metric.labelnames, labels)} {_format_value(cell[0])}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), cell[:-1]):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f'{metric.name}_bucket{_format_labels(metric.labelnames, labels, le)} {cumulative}')
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(f'{metric.name}_sum{label_text} {_format_value(cell[-1])}')
+                lines.append(f'{metric.name}_count{label_text} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self, name: str) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        """Count, sum and mean per label set of one histogram or counter, for logs and benchmarks."""
+        result = {}
+        for labels, cell in self.collect().get(name, {}).items():
+            if len(cell) == 1:
+                result[labels] = {'value': cell[0]}
+            else:
+                count = sum(cell[:-1])
+                result[labels] = {'count': count, 'sum': cell[-1], 'mean': cell[-1] / count if count else None}
+        return result
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'binance_request_duration_seconds', 'Exchange API call latency, excluding rate-limit waits', ('method',))
+REQUEST_ERRORS = REGISTRY.counter(
+    'binance_request_errors_total', 'Failed exchange API calls by Binance error code', ('method', 'code'))
+REQUEST_WEIGHT = REGISTRY.counter(
+    'binance_request_weight_total', 'Request weight charged against the 1m budget', ('method',))
+ORDERS_SENT = REGISTRY.counter(
+    'binance_orders_sent_total', 'Orders charged against the order-count limits', ('method',))
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    'binance_rate_limit_wait_seconds', 'Time spent queued in the local rate limiter', ('method',))
+USED_WEIGHT = REGISTRY.gauge(
+    'binance_used_weight_1m', 'Request weight used in the current minute, as reported by Binance')
+RATE_LIMIT_HEADROOM = REGISTRY.gauge(
+    'binance_rate_limit_headroom', 'Remaining local rate-limit budget', ('bucket',))
+ORDER_STAGE_SECONDS = REGISTRY.histogram(
+    'bot_order_stage_seconds', 'Time per stage of an order submission', ('stage',))
+RISK_REJECTIONS = REGISTRY.counter(
+    'bot_risk_rejections_total', 'Orders stopped by a pre-trade risk check, by check', ('check',))
+RISK_PRICE_FALLBACKS = REGISTRY.counter(
+    'bot_risk_price_fallbacks_total', 'Market orders risk-checked without a fresh mark, by price used', ('source',))
+
+
+def error_code(error: Exception) -> str:
+    code = getattr(error, 'code', None)
+    if code is not None:
+        return str(code)
+    return type(error).__name__
@@ -0,0 +1,304 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from lazy_imports import lazy_import
+
+
+binance = lazy_import('binance')
+
+ACTIVE = 'ACTIVE'
+CANCELLING = 'CANCELLING'
+COMPLETED = 'COMPLETED'
+# The sibling was already closed when we tried to cancel it: both legs executed or were cancelled
+BOTH_CLOSED = 'BOTH_CLOSED'
+FAILED = 'FAILED'
+
+LEGS = ('take_profit_order', 'stop_loss_order')
+# Any other status (a partial fill included) means the leg has started to execute or is gone
+UNTOUCHED_STATUS = 'NEW'
+# -2011 unknown order on cancel, -2013 order does not exist
+CLOSED_ORDER_CODES = (-2011, -2013)
+CANCEL_ATTEMPTS = 3
+CANCEL_RETRY_BACKOFF = 0.2
+
+POLL_SECONDS = 1.0
+# While the user-data stream is up it drives everything; the poll is only a safety net
+STREAM_RECHECK_SECONDS = 30.0
+# Per-symbol open-order queries cost 1 weight each, an all-symbols query costs 40
+ALL_SYMBOLS_QUERY_THRESHOLD = 40
+
+
+def leg_keys(order: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Index keys for an order or algo order: its exchange id and its client id."""
+    keys = []
+    if order.get('algoId') is not None:
+        keys.append(('algo', int(order['algoId'])))
+    if order.get('orderId') is not None:
+        keys.append(('order', int(order['orderId'])))
+    client_order_id = order.get('clientAlgoId') or order.get('clientOrderId')
+    if client_order_id:
+        keys.append(('client', client_order_id))
+    return keys
+
+
+class OcoPair:
+
+    def __init__(self, group_id: str, symbol: str, take_profit: Dict[str, Any], stop_loss: Dict[str, Any],
+                 registered_at: Optional[float] = None):
+        self.group_id = group_id
+        self.symbol = symbol
+        self.legs = {'take_profit_order': dict(take_profit), 'stop_loss_order': dict(stop_loss)}
+        self.status = ACTIVE
+        self.closed_leg: Optional[str] = None
+        self.close_status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.registered_at = time.monotonic() if registered_at is None else registered_at
+        self.created_at = time.time()
+        self.triggered_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Seconds from seeing the closed leg to the sibling's cancel ack
+        self.reaction_seconds: Optional[float] = None
+
+    @staticmethod
+    def sibling(leg: str) -> str:
+        return LEGS[1] if leg == LEGS[0] else LEGS[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'group_id': self.group_id,
+            'symbol': self.symbol,
+            'status': self.status,
+            'closed_leg': self.closed_leg,
+            'close_status': self.close_status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'reaction_ms': round(self.reaction_seconds * 1000, 3) if self.reaction_seconds is not None else None,
+            'take_profit_order': dict(self.legs['take_profit_order']),
+            'stop_loss_order': dict(self.legs['stop_loss_order']),
+        }
+
+
+class OcoManager:
+    """Cancels the other leg of an OCO pair as soon as one leg closes.
+
+    Binance futures has no native OCO, so ``place_oco_order`` sends two
+    independent orders and registers them here. Both legs are indexed by
+    exchange id and client id, so a user-data stream event (ORDER_TRADE_UPDATE
+    for the limit leg, ALGO_UPDATE for the stop leg) resolves to its pair with
+    one dict lookup. A fill, partial fill, trigger or cancel of either leg
+    cancels the sibling, like a spot OCO. Cancels run on a small pool so one
+    slow request never delays the next pair.
+
+    Without a live stream, one open-orders query per symbol (or a single
+    all-symbols query once that is cheaper) is polled every ``poll_interval``
+    seconds; a leg missing from it, or partially filled, has been hit.
+    """
+
+    def __init__(self, bot, poll_interval: float = POLL_SECONDS, max_workers: int = 4):
+        self.bot = bot
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger('BasicBot.OCO')
+
+        self._pairs: Dict[str, OcoPair] = {}
+        self._index: Dict[Tuple[str, Any], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='oco-cancel')
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Call ``callback('oco', pair_dict)`` whenever a pair is triggered or finishes."""
+        self._listeners.append(callback)
+
+    def _notify(self, pair: OcoPair):
+        data = pair.to_dict()
+        for callback in self._listeners:
+            try:
+                callback('oco', data)
+            except Exception as e:
+                self.logger.error(f"OCO listener failed: {e}")
+
+    def track(self, group_id: str, symbol: str, take_profit: Dict[str, Any], stop_loss: Dict[str, Any],
+              registered_at: Optional[float] = None) -> OcoPair:
+        pair = OcoPair(group_id, symbol, take_profit, stop_loss, registered_at)
+        with self._lock:
+            self._pairs[group_id] = pair
+            for leg, order in pair.legs.items():
+                for key in leg_keys(order):
+                    self._index[key] = (group_id, leg)
+            if self._poller is None:
+                self._stop.clear()
+                self._poller = threading.Thread(target=self._poll_loop, name='oco-poll', daemon=True)
+                self._poller.start()
+        self.logger.info(f"Tracking OCO {group_id} on {symbol}")
+        return pair
+
+    def get(self, group_id: str) -> Optional[OcoPair]:
+        with self._lock:
+            return self._pairs.get(group_id)
+
+    def list_pairs(self) -> List[OcoPair]:
+        with self._lock:
+            return list(self._pairs.values())
+
+    @property
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for pair in self._pairs.values() if pair.status == ACTIVE)
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            self._poller = None
+
+    def on_stream_event(self, event: str, data: Dict[str, Any]):
+        """User-data stream listener; runs on the socket thread, so it only looks up and hands off."""
+        if event == 'order':
+            status = data.get('status')
+        elif event == 'algo':
+            status = data.get('algoStatus')
+        else:
+            return
+        if status == UNTOUCHED_STATUS:
+            return
+        for key in leg_keys(data):
+            entry = self._index.get(key)
+            if entry is not None:
+                self._trigger(entry[0], entry[1], status)
+                return
+
+    def _trigger(self, group_id: str, leg: str, status: Optional[str]):
+        seen_at = time.monotonic()
+        with self._lock:
+            pair = self._pairs.get(group_id)
+            if pair is None or pair.status != ACTIVE:
+                return
+            pair.status = CANCELLING
+            pair.closed_leg = leg
+            pair.close_status = status
+            pair.triggered_at = time.time()
+        self.logger.info(f"OCO {group_id}: {leg} closed ({status}); cancelling {pair.sibling(leg)}")
+        self._executor.submit(self._cancel_sibling, pair, seen_at)
+
+    def _cancel_sibling(self, pair: OcoPair, seen_at: float):
+        leg = pair.sibling(pair.closed_leg)
+        order = pair.legs[leg]
+        if order.get('algoId') is not None:
+            params = {'algoId': order['algoId']}
+        else:
+            params = {'orderId': order.get('orderId')}
+
+        status = FAILED
+        for attempt in range(CANCEL_ATTEMPTS):
+            try:
+                result = self.bot.client.futures_cancel_order(symbol=pair.symbol, **params)
+                self.bot._journal_order(result, 'cancel')
+                self.bot.position_book.apply_order(result)
+                status = COMPLETED
+                self.logger.info(f"OCO {pair.group_id}: cancelled {leg} {params}")
+                break
+            except binance.BinanceAPIException as e:
+                if e.code in CLOSED_ORDER_CODES:
+                    status = BOTH_CLOSED
+                    self.logger.critical(f"OCO {pair.group_id}: {leg} {params} closed before it could be cancelled")
+                    break
+                pair.error = str(e)
+            except Exception as e:
+                pair.error = str(e)
+            if attempt + 1 < CANCEL_ATTEMPTS:
+                time.sleep(CANCEL_RETRY_BACKOFF * (2 ** attempt))
+        if status == FAILED:
+            self.logger.critical(f"OCO {pair.group_id}: failed to cancel {leg} {params}: {pair.error}")
+
+        with self._lock:
+            pair.status = status
+            pair.reaction_seconds = time.monotonic() - seen_at
+            pair.finished_at = time.time()
+            if status != FAILED:
+                for order in pair.legs.values():
+                    for key in leg_keys(order):
+                        self._index.pop(key, None)
+        self._notify(pair)
+
+    def _poll_loop(self):
+        while True:
+            stream = getattr(self.bot, 'user_stream', None)
+            interval = STREAM_RECHECK_SECONDS if stream is not None and stream.ready else self.poll_interval
+            if self._stop.wait(interval):
+                return
+            with self._lock:
+                if not any(pair.status == ACTIVE for pair in self._pairs.values()):
+                    self._poller = None
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                self.logger.error(f"OCO poll failed: {e}")
+
+    def poll(self) -> int:
+        """Check every active pair against the exchange's open orders; returns how many were triggered."""
+        started = time.monotonic()
+        with self._lock:
+            # A pair registered after this point may be missing from a response generated before it existed
+            pairs = [pair for pair in self._pairs.values() if pair.status == ACTIVE and pair.registered_at < started]
+        if not pairs:
+            return 0
+
+        symbols = {pair.symbol for pair in pairs}
+        need_algo = any(order.get('algoId') is not None for pair in pairs for order in pair.legs.values())
+        open_status = {}
+        for method, wanted in (('futures_get_open_orders', True), ('futures_get_open_algo_orders', need_algo)):
+            if not wanted:
+                continue
+            call = getattr(self.bot.client, method)
+            if len(symbols) >= ALL_SYMBOLS_QUERY_THRESHOLD:
+                responses = [call()]
+            else:
+                responses = [call(symbol=symbol) for symbol in symbols]
+            for orders in responses:
+                for order in orders:
+                    open_status[leg_keys(order)[0]] = order.get('status') or order.get('algoStatus')
+
+        triggered = 0
+        for pair in pairs:
+            for leg, order in pair.legs.items():
+                # Exchange ids only: the order a triggered stop turns into can reuse the stop's client id
+                status = open_status.get(leg_keys(order)[0], 'CLOSED')
+                if status != UNTOUCHED_STATUS:
+                    self._trigger(pair.group_id, leg, status)
+                    triggered += 1
+                    break
+        return triggered
+
+    def resume(self) -> List[OcoPair]:
+        """Re-track OCO pairs from the order journal after a restart and settle legs that closed meanwhile."""
+        journal = getattr(self.bot, 'journal', None)
+        if journal is None:
+            return []
+        group_ids = {row['group_id'] for row in journal.open_orders()
+                     if row['group_id'] and row['group_id'].startswith('oco-')}
+        resumed = []
+        for group_id in sorted(group_ids):
+            rows = journal.group(group_id)
+            if len(rows) != 2 or any(row['order_id'] is None for row in rows):
+                self.logger.warning(f"OCO {group_id}: journal has an incomplete pair; not resumed")
+                continue
+            take_profit, stop_loss = sorted(rows, key=lambda row: row['algo'])
+            resumed.append(self.track(group_id, take_profit['symbol'],
+                                      self._order_from_row(take_profit), self._order_from_row(stop_loss),
+                                      registered_at=0.0))
+        if resumed:
+            self.poll()
+            self.logger.info(f"Resumed {len(resumed)} OCO pairs from the journal")
+        return resumed
+
+    @staticmethod
+    def _order_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        if row['algo']:
+            return {'algoId': row['order_id'], 'clientAlgoId': row['client_order_id'], 'symbol': row['symbol']}
+        return {'orderId': row['order_id'], 'clientOrderId': row['client_order_id'], 'symbol': row['symbol']}
@@ -0,0 +1,335 @@
+import bisect
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+from lazy_imports import lazy_import
+
+
+binance = lazy_import('binance')
+
+SNAPSHOT_LIMIT = 1000
+# Levels kept per side; diffs for prices behind the worst kept level are ignored
+MAX_BOOK_DEPTH = SNAPSHOT_LIMIT
+# Diff-depth stream speed; '@100ms' is the fastest USD-M futures offers
+DEPTH_STREAM_SPEED = '@100ms'
+# Events buffered while a snapshot is in flight before we give up and resync again
+MAX_BUFFERED_EVENTS = 5000
+# Without a depth stream, books are REST snapshots refetched in the background once this old
+SNAPSHOT_POLL_SECONDS = 1.0
+
+
+class _BookSide:
+    """Price levels for one side, kept in best-first order and capped at ``max_depth``.
+
+    ``keys`` is a sorted list (prices negated on the bid side so index 0 is always
+    the best level) and ``levels`` maps price to quantity. The cap keeps a level
+    insert a bounded memmove; like the REST snapshot, the book is only complete
+    down to that depth.
+    """
+
+    __slots__ = ('is_bid', 'max_depth', 'keys', 'levels')
+
+    def __init__(self, is_bid: bool, max_depth: int = MAX_BOOK_DEPTH):
+        self.is_bid = is_bid
+        self.max_depth = max_depth
+        self.keys: List[float] = []
+        self.levels: Dict[float, float] = {}
+
+    def clear(self):
+        self.keys = []
+        self.levels = {}
+
+    def update(self, price: float, quantity: float):
+        key = -price if self.is_bid else price
+        if quantity == 0:
+            if self.levels.pop(price, None) is not None:
+                index = bisect.bisect_left(self.keys, key)
+                if index < len(self.keys) and self.keys[index] == key:
+                    del self.keys[index]
+            return
+        if price not in self.levels:
+            index = bisect.bisect_left(self.keys, key)
+            if index >= self.max_depth:
+                return
+            self.keys.insert(index, key)
+            if len(self.keys) > self.max_depth:
+                dropped = self.keys.pop()
+                del self.levels[-dropped if self.is_bid else dropped]
+        self.levels[price] = quantity
+
+    def best(self) -> Optional[float]:
+        if not self.keys:
+            return None
+        return -self.keys[0] if self.is_bid else self.keys[0]
+
+    def quantity_at(self, price: float) -> float:
+        return self.levels.get(price, 0.0)
+
+    def cumulative_quantity(self, through_price: float) -> float:
+        """Total quantity from the best level up to and including ``through_price``."""
+        key = -through_price if self.is_bid else through_price
+        end = bisect.bisect_right(self.keys, key)
+        levels = self.levels
+        sign = -1 if self.is_bid else 1
+        return sum(levels[sign * k] for k in self.keys[:end])
+
+    def top(self, count: int) -> List[Tuple[float, float]]:
+        sign = -1 if self.is_bid else 1
+        return [(sign * k, self.levels[sign * k]) for k in self.keys[:count]]
+
+
+class LocalOrderBook:
+    """One symbol's book, rebuilt from a REST snapshot and kept current by diff-depth events."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        self.last_update_id: Optional[int] = None
+        self.event_time: Optional[int] = None
+        self.synced = False
+        # (best bid, best ask) replaced whole after every applied update, so readers need no lock
+        self._top: Tuple[Optional[float], Optional[float]] = (None, None)
+        self._lock = threading.Lock()
+
+    def _publish_top(self):
+        # Caller holds self._lock
+        self._top = (self.bids.best(), self.asks.best())
+
+    def apply_snapshot(self, snapshot: Dict[str, Any], synced: bool = False):
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for price, quantity in snapshot.get('bids', []):
+                self.bids.update(float(price), float(quantity))
+            for price, quantity in snapshot.get('asks', []):
+                self.asks.update(float(price), float(quantity))
+            self.last_update_id = int(snapshot['lastUpdateId'])
+            self.event_time = snapshot.get('E')
+            self.synced = synced
+            self._publish_top()
+
+    def apply_event(self, event: Dict[str, Any]) -> bool:
+        """Apply one depthUpdate; return False when a sequence gap means a resync is needed.
+
+        Follows the USD-M futures procedure: events ending before the snapshot are
+        dropped, the first applied event must straddle the snapshot's lastUpdateId,
+        and every later event's ``pu`` must equal the previous event's ``u``.
+        """
+        first_id, final_id, previous_id = event['U'], event['u'], event.get('pu')
+        with self._lock:
+            if self.last_update_id is None:
+                return False
+            if final_id < self.last_update_id:
+                return True
+            if self.synced:
+                if previous_id != self.last_update_id:
+                    self.synced = False
+                    return False
+            elif first_id > self.last_update_id:
+                return False
+
+            for price, quantity in event.get('b', []):
+                self.bids.update(float(price), float(quantity))
+            for price, quantity in event.get('a', []):
+                self.asks.update(float(price), float(quantity))
+            self.last_update_id = final_id
+            self.event_time = event.get('E')
+            self.synced = True
+            self._publish_top()
+            return True
+
+    def top(self) -> Tuple[Optional[float], Optional[float]]:
+        """Best bid and ask as of the same applied update."""
+        return self._top
+
+    def best_bid(self) -> Optional[float]:
+        return self._top[0]
+
+    def best_ask(self) -> Optional[float]:
+        return self._top[1]
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self._top
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self._top
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def depth_at(self, side: str, price: float) -> float:
+        book_side = self.bids if side.upper() == 'BUY' else self.asks
+        with self._lock:
+            return book_side.quantity_at(float(price))
+
+    def depth_through(self, side: str, price: float) -> float:
+        """Resting quantity on ``side`` ('BUY' = bids) from the best level through ``price``."""
+        book_side = self.bids if side.upper() == 'BUY' else self.asks
+        with self._lock:
+            return book_side.cumulative_quantity(float(price))
+
+    def snapshot(self, levels: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+            return {
+                'symbol': self.symbol,
+                'synced': self.synced,
+                'lastUpdateId': self.last_update_id,
+                'eventTime': self.event_time,
+                'bestBid': bid,
+                'bestAsk': ask,
+                'mid': (bid + ask) / 2 if bid is not None and ask is not None else None,
+                'spread': ask - bid if bid is not None and ask is not None else None,
+                'bids': self.bids.top(levels),
+                'asks': self.asks.top(levels),
+            }
+
+
+class OrderBookManager:
+    """Keeps LocalOrderBooks for watched symbols in sync from the diff-depth stream.
+
+    Each symbol subscribes first and buffers events while the REST snapshot is
+    fetched on a worker thread, then replays the buffer on top of it. A sequence
+    gap or socket error marks the book unsynced and triggers a fresh snapshot,
+    so readers never see a book with missing updates: ``get`` returns None
+    until it is consistent again. With ``streaming=False`` (the fake exchange)
+    no socket is opened and books are polled snapshots instead.
+    """
+
+    def __init__(self, client, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 testnet: bool = True, streaming: bool = True):
+        self.client = client
+        self.streaming = streaming
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self.logger = logging.getLogger('BasicBot.OrderBook')
+
+        self.books: Dict[str, LocalOrderBook] = {}
+        self.resyncs = 0
+
+        self._buffers: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+        self._polled_at: Dict[str, float] = {}
+        self._manager = None
+        self._lock = threading.Lock()
+
+    def watch(self, symbol: str) -> LocalOrderBook:
+        symbol = symbol.upper()
+        with self._lock:
+            book = self.books.get(symbol)
+            if book is not None:
+                return book
+            book = self.books[symbol] = LocalOrderBook(symbol)
+            if not self.streaming:
+                self._polled_at[symbol] = 0.0
+                manager = None
+            else:
+                self._buffers[symbol] = []
+                manager = self._ensure_manager()
+
+        if manager is None:
+            self._poll_snapshot(symbol)
+            return book
+        manager.start_futures_depth_socket(
+            callback=lambda msg: self._handle_message(symbol, msg), symbol=symbol, depth=DEPTH_STREAM_SPEED
+        )
+        self._start_resync(symbol)
+        return book
+
+    def get(self, symbol: str) -> Optional[LocalOrderBook]:
+        symbol = symbol.upper()
+        book = self.books.get(symbol)
+        if book is not None and not self.streaming and time.time() - self._polled_at[symbol] > SNAPSHOT_POLL_SECONDS:
+            # Readers may be on the order path: serve the last snapshot and refetch in the background
+            self._polled_at[symbol] = time.time()
+            threading.Thread(target=self._poll_snapshot, args=(symbol,), name=f'book-poll-{symbol}',
+                             daemon=True).start()
+        return book if book is not None and book.synced else None
+
+    def stop(self):
+        with self._lock:
+            manager, self._manager = self._manager, None
+        if manager is not None:
+            manager.stop()
+
+    def _ensure_manager(self):
+        if self._manager is None:
+            self._manager = binance.ThreadedWebsocketManager(
+                api_key=self.api_key, api_secret=self.api_secret, testnet=self.testnet
+            )
+            self._manager.start()
+        return self._manager
+
+    def _poll_snapshot(self, symbol: str):
+        try:
+            snapshot = self.client.futures_order_book(symbol=symbol, limit=SNAPSHOT_LIMIT)
+        except Exception as e:
+            self.logger.error(f"{symbol} order book snapshot failed: {e}")
+            return
+        self.books[symbol].apply_snapshot(snapshot, synced=True)
+        self._polled_at[symbol] = time.time()
+
+    def _handle_message(self, symbol: str, msg: Dict[str, Any]):
+        # Futures sockets arrive wrapped as {"stream": ..., "data": {...}}
+        event = msg.get('data', msg)
+        if event.get('e') == 'error':
+            self.logger.error(f"{symbol} depth stream error: {event.get('type')}: {event.get('m')}")
+            self._mark_gap(symbol)
+            return
+        if event.get('e') != 'depthUpdate':
+            return
+
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            if buffer is not None:
+                # Snapshot in flight; replay these once it lands
+                if len(buffer) < MAX_BUFFERED_EVENTS:
+                    buffer.append(event)
+                return
+
+        if not self.books[symbol].apply_event(event):
+            self.logger.warning(f"{symbol} order book sequence gap at u={event.get('u')}; resyncing")
+            self._mark_gap(symbol)
+
+    def _mark_gap(self, symbol: str):
+        with self._lock:
+            if self._buffers.get(symbol) is not None:
+                return
+            self._buffers[symbol] = []
+            self.books[symbol].synced = False
+        self._start_resync(symbol)
+
+    def _start_resync(self, symbol: str):
+        threading.Thread(target=self._resync, args=(symbol,), name=f'book-resync-{symbol}', daemon=True).start()
+
+    def _resync(self, symbol: str):
+        book = self.books[symbol]
+        try:
+            snapshot = self.client.futures_order_book(symbol=symbol, limit=SNAPSHOT_LIMIT)
+        except Exception as e:
+            self.logger.error(f"{symbol} order book snapshot failed: {e}")
+            retry = threading.Timer(5.0, self._resync, args=(symbol,))
+            retry.daemon = True
+            retry.start()
+            return
+
+        book.apply_snapshot(snapshot)
+        with self._lock:
+            # Replay under the lock so live events cannot overtake the buffered ones
+            buffered, self._buffers[symbol] = self._buffers[symbol] or [], None
+            self.resyncs += 1
+            bridged = all(book.apply_event(event) for event in buffered)
+            if not bridged:
+                self._buffers[symbol] = []
+
+        if not bridged:
+            self.logger.warning(f"{symbol} buffered depth events do not bridge the snapshot; resyncing")
+            self._start_resync(symbol)
+            return
+        self.logger.info(f"{symbol} order book synced at lastUpdateId={book.last_update_id}")
@@ -0,0 +1,230 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable
+
+JOURNAL_FILE = 'orders.db'
+# WAL checkpoints (the only fsyncs under synchronous=NORMAL) run on a background thread
+CHECKPOINT_INTERVAL_SECONDS = 5.0
+
+# Journal-only states: intent written but no ack yet, or the last attempt's outcome never arrived
+PENDING = 'PENDING'
+UNKNOWN = 'UNKNOWN'
+NOT_PLACED = 'NOT_PLACED'
+OPEN_STATUSES = (PENDING, UNKNOWN, 'NEW', 'PARTIALLY_FILLED')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS orders (
+    client_order_id TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    order_id INTEGER,
+    algo INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    executed_qty TEXT,
+    avg_price TEXT,
+    group_id TEXT,
+    params TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    update_time INTEGER
+);
+CREATE INDEX IF NOT EXISTS orders_by_status ON orders(status);
+CREATE INDEX IF NOT EXISTS orders_by_group ON orders(group_id);
+CREATE TABLE IF NOT EXISTS twap_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def _order_fields(order: Dict[str, Any]) -> Dict[str, Any]:
+    # Conditional orders come back from the algo endpoint with algoId/algoStatus
+    return {
+        'order_id': order.get('orderId', order.get('algoId')),
+        'status': order.get('status') or order.get('algoStatus'),
+        'executed_qty': order.get('executedQty'),
+        'avg_price': order.get('avgPrice'),
+        'update_time': order.get('updateTime'),
+    }
+
+
+class OrderJournal:
+    """Append-only SQLite (WAL) record of order intents, acks, rejections and fills.
+
+    Every change appends a row to ``events`` and updates the per-order row in
+    ``orders`` in the same transaction, so the log is the source of truth and
+    recovery only has to read the open rows. Intents are committed before the
+    request is sent. ``synchronous=NORMAL`` keeps each commit off fsync; the
+    WAL survives a process crash, though not a power loss. Automatic
+    checkpoints are turned off for the writing connection and done by a
+    background thread instead, so an order never waits on one.
+    """
+
+    def __init__(self, path: str = JOURNAL_FILE):
+        self.path = path
+        self.logger = logging.getLogger('BasicBot.Journal')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA wal_autocheckpoint=0')
+        self._conn.executescript(SCHEMA)
+
+        self._closed = threading.Event()
+        self._checkpointer = threading.Thread(target=self._checkpoint_loop, name='journal-checkpoint', daemon=True)
+        self._checkpointer.start()
+
+    def _checkpoint_loop(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            while not self._closed.wait(CHECKPOINT_INTERVAL_SECONDS):
+                try:
+                    conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Journal checkpoint failed: {e}")
+        finally:
+            conn.close()
+
+    @classmethod
+    def open_default(cls, logger: Optional[logging.Logger] = None,
+                     account: Optional[str] = None) -> Optional['OrderJournal']:
+        """Open ``BOT_JOURNAL_PATH`` (default orders.db), falling back to /tmp; None when disabled.
+
+        ``account`` gives a sub-account its own file next to it, e.g. orders-sub1.db.
+        """
+        logger = logger or logging.getLogger('BasicBot.Journal')
+        if os.environ.get('BOT_JOURNAL', '1') == '0':
+            return None
+        path = os.environ.get('BOT_JOURNAL_PATH', JOURNAL_FILE)
+        if account:
+            root, ext = os.path.splitext(path)
+            path = f"{root}-{account}{ext}"
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            # Serverless (e.g., Vercel) root FS is read-only; /tmp is writable
+            tmp_path = os.path.join('/tmp', os.path.basename(path))
+            try:
+                journal = cls(tmp_path)
+                logger.warning(f"Order journal redirected to {tmp_path}: {e}")
+                return journal
+            except sqlite3.Error as e2:
+                logger.warning(f"Order journal disabled due to: {e} | {e2}")
+                return None
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, kind: str, ref: str, data: Any, statement: Optional[str] = None,
+               args: Iterable[Any] = ()):
+        now = time.time()
+        if not isinstance(data, str):
+            data = json.dumps(data, separators=(',', ':'), default=str)
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.execute('INSERT INTO events (ts, kind, ref, data) VALUES (?, ?, ?, ?)',
+                                   (now, kind, ref, data))
+                if statement:
+                    self._conn.execute(statement, tuple(args))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def record_intent(self, client_order_id: str, params: Dict[str, Any], algo: bool = False):
+        now = time.time()
+        encoded = json.dumps(params, separators=(',', ':'), default=str)
+        self._write(
+            'intent', client_order_id, encoded,
+            'INSERT INTO orders (client_order_id, symbol, algo, status, params, created, updated) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(client_order_id) DO NOTHING',
+            (client_order_id, params['symbol'], int(algo), PENDING, encoded, now, now),
+        )
+
+    def record_order(self, client_order_id: str, order: Dict[str, Any], kind: str = 'ack'):
+        """Apply an ack, status update or fill; older updates than the stored one are ignored."""
+        fields = _order_fields(order)
+        self._write(
+            kind, client_order_id, order,
+            'UPDATE orders SET order_id = COALESCE(?, order_id), status = COALESCE(?, status), '
+            'executed_qty = COALESCE(?, executed_qty), avg_price = COALESCE(?, avg_price), '
+            'update_time = COALESCE(?, update_time), updated = ? '
+            'WHERE client_order_id = ? AND (update_time IS NULL OR ? IS NULL OR update_time <= ?)',
+            (fields['order_id'], fields['status'], fields['executed_qty'], fields['avg_price'],
+             fields['update_time'], time.time(), client_order_id, fields['update_time'], fields['update_time']),
+        )
+
+    def record_status(self, client_order_id: str, status: str, error: Optional[Exception] = None):
+        data = {'status': status}
+        if error is not None:
+            data['code'] = getattr(error, 'code', None)
+            data['error'] = getattr(error, 'message', None) or str(error)
+        self._write(
+            status.lower(), client_order_id, data,
+            'UPDATE orders SET status = ?, updated = ? WHERE client_order_id = ?',
+            (status, time.time(), client_order_id),
+        )
+
+    def link(self, group_id: str, kind: str, client_order_ids: List[str]):
+        """Tie orders together (e.g. the two legs of an OCO) under ``group_id``."""
+        placeholders = ','.join('?' * len(client_order_ids))
+        self._write(
+            'link', group_id, {'kind': kind, 'orders': client_order_ids},
+            f'UPDATE orders SET group_id = ? WHERE client_order_id IN ({placeholders})',
+            (group_id, *client_order_ids),
+        )
+
+    def _rows(self, query: str, args: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(query, tuple(args)).fetchall()
+        result = []
+        for row in rows:
+            entry = dict(row)
+            if 'params' in entry and entry['params']:
+                entry['params'] = json.loads(entry['params'])
+            result.append(entry)
+        return result
+
+    def get_order(self, client_order_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._rows('SELECT * FROM orders WHERE client_order_id = ?', (client_order_id,))
+        return rows[0] if rows else None
+
+    def open_orders(self) -> List[Dict[str, Any]]:
+        placeholders = ','.join('?' * len(OPEN_STATUSES))
+        return self._rows(f'SELECT * FROM orders WHERE status IN ({placeholders}) ORDER BY created',
+                          OPEN_STATUSES)
+
+    def group(self, group_id: str) -> List[Dict[str, Any]]:
+        return self._rows('SELECT * FROM orders WHERE group_id = ? ORDER BY created', (group_id,))
+
+    def record_twap(self, state: Dict[str, Any]):
+        self._write(
+            'twap', state['job_id'], {k: state[k] for k in ('status', 'next_index', 'executed_quantity')},
+            'INSERT INTO twap_jobs (job_id, status, state, updated) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(job_id) DO UPDATE SET status = excluded.status, state = excluded.state, '
+            'updated = excluded.updated',
+            (state['job_id'], state['status'], json.dumps(state, default=str), time.time()),
+        )
+
+    def twap_jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        if status is None:
+            rows = self._rows('SELECT state FROM twap_jobs')
+        else:
+            rows = self._rows('SELECT state FROM twap_jobs WHERE status = ?', (status,))
+        return [json.loads(row['state']) for row in rows]
@@ -0,0 +1,333 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from lazy_imports import lazy_import
+
+
+binance = lazy_import('binance')
+
+# Residue left by float arithmetic on a closed position
+QUANTITY_EPSILON = 1e-12
+# Quantities are rounded well below any symbol's step size so sums stay readable
+QUANTITY_DECIMALS = 10
+# Restart delay after the mark-price socket reports an error
+MARK_STREAM_RETRY_SECONDS = 5.0
+
+
+class Position:
+    """Net one-way position in one symbol: signed quantity, average entry and realized PnL."""
+
+    __slots__ = ('symbol', 'quantity', 'entry_price', 'realized_pnl', 'mark_price', 'mark_time',
+                 'fills', 'synced_at', 'updated_at')
+
+    def __init__(self, symbol: str, quantity: float = 0.0, entry_price: float = 0.0):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.entry_price = entry_price
+        self.realized_pnl = 0.0
+        self.mark_price: Optional[float] = None
+        self.mark_time: Optional[float] = None
+        self.fills = 0
+        # Exchange time (ms) of the last REST snapshot; fills at or before it are already included
+        self.synced_at = 0
+        self.updated_at = 0
+
+    def apply_fill(self, quantity: float, price: float, update_time: int = 0) -> float:
+        """Fold one fill (positive quantity buys, negative sells); returns the PnL it realized."""
+        self.fills += 1
+        if update_time:
+            self.updated_at = update_time
+        current = self.quantity
+        if current == 0 or (current > 0) == (quantity > 0):
+            total = current + quantity
+            self.entry_price = (self.entry_price * abs(current) + price * abs(quantity)) / abs(total)
+            self.quantity = round(total, QUANTITY_DECIMALS)
+            return 0.0
+
+        closed = min(abs(quantity), abs(current))
+        realized = closed * (price - self.entry_price) * (1 if current > 0 else -1)
+        self.realized_pnl += realized
+        remaining = current + quantity
+        if abs(remaining) < QUANTITY_EPSILON:
+            self.quantity, self.entry_price = 0.0, 0.0
+        else:
+            if (remaining > 0) != (current > 0):
+                # Flipped through flat: the leftover opens a new position at the fill price
+                self.entry_price = price
+            self.quantity = round(remaining, QUANTITY_DECIMALS)
+        return realized
+
+    @property
+    def unrealized_pnl(self) -> float:
+        if not self.quantity or self.mark_price is None:
+            return 0.0
+        return (self.mark_price - self.entry_price) * self.quantity
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'side': 'LONG' if self.quantity > 0 else 'SHORT' if self.quantity < 0 else 'FLAT',
+            'quantity': self.quantity,
+            'entryPrice': self.entry_price,
+            'markPrice': self.mark_price,
+            'notional': self.quantity * self.mark_price if self.mark_price is not None else None,
+            'unrealizedPnl': self.unrealized_pnl,
+            'realizedPnl': self.realized_pnl,
+            'fills': self.fills,
+            'markAgeSeconds': round(time.time() - self.mark_time, 3) if self.mark_time else None,
+            'updateTime': self.updated_at or None,
+        }
+
+
+class PositionBook:
+    """Positions and PnL kept in memory from fills and the mark-price stream.
+
+    Every order update the bot sees (REST acks, status reads, cancel responses,
+    ORDER_TRADE_UPDATE events) goes through ``apply_order``. Only the growth in
+    an order's cumulative ``executedQty`` since it was last seen is folded, so
+    the same fill reported by REST and by the stream counts once, and each fold
+    is a few dict operations. Mark prices come from the all-market
+    ``!markPrice@arr@1s`` stream and only replace a float per symbol; PnL is
+    computed when read. A single ``futures_position_information`` call seeds
+    the book (and can be repeated to resync); reads never go to REST.
+
+    Realized PnL covers fills folded since the book started and is before fees.
+    Hedge-mode positions are netted per symbol.
+    """
+
+    def __init__(self, client, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 testnet: bool = True, max_orders: int = 10000):
+        self.client = client
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self.max_orders = max_orders
+        self.logger = logging.getLogger('BasicBot.Positions')
+
+        self.positions: Dict[str, Position] = {}
+        # symbol -> (mark price, local receive time)
+        self.marks: Dict[str, Tuple[float, float]] = {}
+        self.seeded = False
+        self.mark_updates = 0
+        # Running sums over all positions, adjusted on every fill and mark so risk checks read two floats
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+
+        # orderId -> (executedQty, executedQty * avgPrice) already folded
+        self._folded: 'OrderedDict[int, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._listeners: List[Callable[[str, Any], None]] = []
+        self._manager = None
+        self._running = False
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Call ``callback('position', position_dict)`` after each fill is folded in."""
+        self._listeners.append(callback)
+
+    def _notify(self, data: Dict[str, Any]):
+        for callback in self._listeners:
+            try:
+                callback('position', data)
+            except Exception as e:
+                self.logger.error(f"Position listener failed: {e}")
+
+    def apply_order(self, order: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fold whatever part of ``order`` has filled since it was last seen; returns the updated position."""
+        order_id = order.get('orderId')
+        symbol = order.get('symbol')
+        side = order.get('side')
+        if order_id is None or not symbol or side not in ('BUY', 'SELL'):
+            return None
+        try:
+            executed = float(order.get('executedQty') or 0)
+            average = float(order.get('avgPrice') or 0)
+        except (TypeError, ValueError):
+            return None
+        if executed <= 0 or average <= 0:
+            return None
+        update_time = int(order.get('updateTime') or 0)
+        order_id = int(order_id)
+
+        with self._lock:
+            folded_qty, folded_notional = self._folded.get(order_id, (0.0, 0.0))
+            quantity = executed - folded_qty
+            if quantity <= QUANTITY_EPSILON:
+                return None
+            notional = executed * average
+            self._folded[order_id] = (executed, notional)
+            self._folded.move_to_end(order_id)
+            while len(self._folded) > self.max_orders:
+                self._folded.popitem(last=False)
+
+            last_qty = order.get('lastFilledQty')
+            if last_qty is not None and abs(float(last_qty) - quantity) <= QUANTITY_EPSILON:
+                price = float(order['lastFilledPrice'])
+            else:
+                # Several fills since the last update (or a REST response): their average price
+                price = (notional - folded_notional) / quantity
+
+            position = self.positions.get(symbol)
+            if position is None:
+                position = self.positions[symbol] = Position(symbol)
+            if update_time and update_time <= position.synced_at:
+                return None
+            before = position.unrealized_pnl
+            self.realized_pnl += position.apply_fill(quantity if side == 'BUY' else -quantity, price, update_time)
+            if position.mark_price is None:
+                position.mark_price, position.mark_time = self.marks.get(symbol, (price, None))
+            self.unrealized_pnl += position.unrealized_pnl - before
+            data = position.to_dict()
+        self._notify(data)
+        return data
+
+    def on_stream_event(self, event: str, data: Dict[str, Any]):
+        """User-data stream listener."""
+        if event == 'order':
+            self.apply_order(data)
+
+    def on_mark_price(self, symbol: str, price: float):
+        """Mark ``symbol`` at ``price``; the stream calls this for every symbol once a second."""
+        with self._lock:
+            self._set_mark(symbol, price, time.time())
+
+    def _set_mark(self, symbol: str, price: float, now: float):
+        # Caller holds self._lock
+        self.marks[symbol] = (price, now)
+        position = self.positions.get(symbol)
+        if position is not None:
+            before = position.unrealized_pnl
+            position.mark_price = price
+            position.mark_time = now
+            self.unrealized_pnl += position.unrealized_pnl - before
+
+    def seed(self) -> List[Dict[str, Any]]:
+        """Replace quantities and entries with the exchange's positions (one REST call)."""
+        with self._seed_lock:
+            requested_at = int(time.time() * 1000)
+            rows = self.client.futures_position_information()
+            listed: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                listed.setdefault(row['symbol'], []).append(row)
+
+            with self._lock:
+                for symbol in set(listed) | set(self.positions):
+                    position = self.positions.get(symbol)
+                    if position is None:
+                        position = self.positions[symbol] = Position(symbol)
+                    # Hedge mode lists LONG and SHORT separately; they are netted here
+                    legs = [(float(row.get('positionAmt') or 0), float(row.get('entryPrice') or 0))
+                            for row in listed.get(symbol, ())]
+                    quantity = sum(amount for amount, _ in legs)
+                    if abs(quantity) < QUANTITY_EPSILON:
+                        position.quantity, position.entry_price = 0.0, 0.0
+                    else:
+                        same_side = [(abs(a), e) for a, e in legs if (a > 0) == (quantity > 0) and a]
+                        size = sum(a for a, _ in same_side)
+                        position.quantity = quantity
+                        position.entry_price = sum(a * e for a, e in same_side) / size
+                    # Not listed means flat as of the request
+                    synced_at = max((int(row.get('updateTime') or 0) for row in listed.get(symbol, ())),
+                                    default=requested_at)
+                    position.synced_at = max(position.synced_at, synced_at)
+                    position.updated_at = max(position.updated_at, synced_at)
+                    if symbol in self.marks:
+                        position.mark_price, position.mark_time = self.marks[symbol]
+                    else:
+                        mark = float(listed[symbol][0].get('markPrice') or 0) if symbol in listed else 0.0
+                        if mark:
+                            position.mark_price, position.mark_time = mark, time.time()
+                self.seeded = True
+                # Recomputed exactly here, so float drift in the running sum never outlives a resync
+                self.unrealized_pnl = sum(p.unrealized_pnl for p in self.positions.values())
+                count = sum(1 for p in self.positions.values() if p.quantity)
+        self.logger.info(f"Position book seeded: {count} open positions")
+        return self.snapshot()['positions']
+
+    def start(self):
+        """Seed once if needed and open the mark-price socket on a background thread."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._connect, name='mark-price-connect', daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            manager, self._manager = self._manager, None
+        if manager is not None:
+            manager.stop()
+
+    def _connect(self):
+        if not self._running:
+            return
+        try:
+            if not self.seeded:
+                self.seed()
+            manager = binance.ThreadedWebsocketManager(
+                api_key=self.api_key, api_secret=self.api_secret, testnet=self.testnet
+            )
+            manager.start()
+            manager.start_all_mark_price_socket(callback=self._handle_message, fast=True)
+            with self._lock:
+                self._manager = manager
+            self.logger.info("Mark price stream connected")
+        except Exception as e:
+            self.logger.error(f"Failed to start mark price stream: {e}")
+            self._schedule_restart()
+
+    def _schedule_restart(self):
+        with self._lock:
+            manager, self._manager = self._manager, None
+            running = self._running
+        if manager is not None:
+            try:
+                manager.stop()
+            except Exception:
+                pass
+        if running:
+            retry = threading.Timer(MARK_STREAM_RETRY_SECONDS, self._connect)
+            retry.daemon = True
+            retry.start()
+
+    def _handle_message(self, msg: Any):
+        # Futures sockets arrive wrapped as {"stream": ..., "data": [...]}
+        updates = msg.get('data', msg) if isinstance(msg, dict) else msg
+        if isinstance(updates, dict):
+            if updates.get('e') == 'error':
+                self.logger.error(f"Mark price stream error: {updates.get('type')}: {updates.get('m')}")
+                self._schedule_restart()
+                return
+            updates = [updates]
+        now = time.time()
+        with self._lock:
+            self.mark_updates += 1
+            for update in updates:
+                if 's' in update and 'p' in update:
+                    self._set_mark(update['s'], float(update['p']), now)
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            position = self.positions.get(symbol.upper())
+            return position.to_dict() if position is not None else None
+
+    def snapshot(self, include_flat: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            positions = [p.to_dict() for p in self.positions.values()
+                         if include_flat or p.quantity or p.realized_pnl]
+            seeded, streaming = self.seeded, self._manager is not None
+        return {
+            'positions': sorted(positions, key=lambda p: p['symbol']),
+            'totals': {
+                'unrealizedPnl': sum(p['unrealizedPnl'] for p in positions),
+                'realizedPnl': sum(p['realizedPnl'] for p in positions),
+                'grossNotional': sum(abs(p['notional'] or 0) for p in positions),
+                'openPositions': sum(1 for p in positions if p['quantity']),
+            },
+            'seeded': seeded,
+            'markStream': streaming,
+        }
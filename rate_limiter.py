@@ -0,0 +1,347 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+from lazy_imports import lazy_import
+from metrics import (REQUEST_SECONDS, REQUEST_ERRORS, REQUEST_WEIGHT, ORDERS_SENT, RATE_LIMIT_WAIT_SECONDS,
+                     USED_WEIGHT, error_code)
+
+
+binance = lazy_import('binance')
+
+
+# Default USDT-M futures limits; replaced by exchangeInfo rateLimits once loaded
+DEFAULT_WEIGHT_PER_MINUTE = 2400
+DEFAULT_ORDERS_PER_10S = 300
+DEFAULT_ORDERS_PER_MINUTE = 1200
+
+# Reads may not push the weight budget below this fraction, leaving room for order traffic
+READ_RESERVE_FRACTION = 0.2
+
+# method name: (request weight, order count)
+REQUEST_COSTS: Dict[str, Tuple[int, int]] = {
+    'ping': (1, 0),
+    'futures_ping': (1, 0),
+    'futures_time': (1, 0),
+    'futures_exchange_info': (1, 0),
+    'futures_create_order': (0, 1),
+    'futures_place_batch_order': (5, 5),
+    'futures_get_order': (1, 0),
+    'futures_cancel_order': (1, 0),
+    'futures_cancel_orders': (1, 0),
+    'futures_cancel_all_open_orders': (1, 0),
+    'futures_get_all_orders': (5, 0),
+    'futures_account_balance': (5, 0),
+    'futures_account': (5, 0),
+    'futures_position_information': (5, 0),
+    'futures_aggregate_trades': (20, 0),
+    'futures_mark_price': (1, 0),
+    'futures_orderbook_ticker': (2, 0),
+    'futures_symbol_ticker': (2, 0),
+    'futures_stream_get_listen_key': (1, 0),
+    'futures_stream_keepalive': (1, 0),
+    'futures_stream_close': (1, 0),
+}
+
+
+def request_cost(method: str, params: Dict[str, Any]) -> Tuple[int, int]:
+    if method in ('futures_get_open_orders', 'futures_get_open_algo_orders'):
+        return (1 if params.get('symbol') else 40), 0
+    if method == 'futures_order_book':
+        limit = int(params.get('limit', 500))
+        return (2 if limit <= 50 else 5 if limit <= 100 else 10 if limit <= 500 else 20), 0
+    if method == 'futures_klines':
+        limit = int(params.get('limit', 500))
+        return (1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10), 0
+    if method == 'futures_place_batch_order':
+        return 5, len(params.get('batchOrders') or []) or 5
+    return REQUEST_COSTS.get(method, (1, 0))
+
+
+class _Bucket:
+
+    __slots__ = ('limit', 'window', 'tokens', 'updated')
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.limit / self.window)
+        self.updated = now
+
+    def wait_time(self, cost: float, reserve: float = 0.0) -> float:
+        deficit = cost + reserve - self.tokens
+        return max(0.0, deficit * self.window / self.limit)
+
+    def sync_used(self, used: int):
+        # The server's count is authoritative; never believe we have more room than it says
+        self.tokens = min(self.tokens, float(self.limit - used))
+
+
+class RateLimiter:
+    """Token-bucket scheduler for request weight and order count.
+
+    Order placement takes priority: reads wait while any order is queued and may
+    not spend the last ``READ_RESERVE_FRACTION`` of the weight budget. Buckets are
+    corrected from the X-MBX-USED-WEIGHT / X-MBX-ORDER-COUNT response headers,
+    and a 429/418 blocks everything until its Retry-After has passed.
+    """
+
+    def __init__(self, weight_per_minute: int = DEFAULT_WEIGHT_PER_MINUTE,
+                 orders_per_10s: int = DEFAULT_ORDERS_PER_10S,
+                 orders_per_minute: int = DEFAULT_ORDERS_PER_MINUTE):
+        self.logger = logging.getLogger('BasicBot.RateLimiter')
+        self.weight = _Bucket(weight_per_minute, 60.0)
+        self.orders_10s = _Bucket(orders_per_10s, 10.0)
+        self.orders_1m = _Bucket(orders_per_minute, 60.0)
+
+        self.banned_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.rejections = 0
+
+        self._order_waiters = 0
+        self._cond = threading.Condition()
+
+    def configure(self, rate_limits: List[Dict[str, Any]]):
+        windows = {'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400}
+        with self._cond:
+            for rule in rate_limits or []:
+                window = windows.get(rule.get('interval'), 60) * int(rule.get('intervalNum', 1))
+                limit = int(rule['limit'])
+                if rule.get('rateLimitType') == 'REQUEST_WEIGHT' and window == 60:
+                    self.weight = _Bucket(limit, 60.0)
+                elif rule.get('rateLimitType') == 'ORDERS' and window == 10:
+                    self.orders_10s = _Bucket(limit, 10.0)
+                elif rule.get('rateLimitType') == 'ORDERS' and window == 60:
+                    self.orders_1m = _Bucket(limit, 60.0)
+
+    def _try_take(self, weight: int, orders: int) -> float:
+        # Caller holds self._cond; takes the tokens and returns 0, or returns how long to wait
+        is_order = orders > 0
+        now = time.monotonic()
+        for bucket in (self.weight, self.orders_10s, self.orders_1m):
+            bucket.refill(now)
+
+        reserve = 0.0 if is_order else self.weight.limit * READ_RESERVE_FRACTION
+        wait = max(
+            self.banned_until - now,
+            self.weight.wait_time(weight, reserve),
+            self.orders_10s.wait_time(orders) if is_order else 0.0,
+            self.orders_1m.wait_time(orders) if is_order else 0.0,
+        )
+        if not is_order and self._order_waiters:
+            wait = max(wait, 0.01)
+
+        if wait <= 0:
+            self.weight.tokens -= weight
+            if is_order:
+                self.orders_10s.tokens -= orders
+                self.orders_1m.tokens -= orders
+        return wait
+
+    def _record(self, waited: float):
+        # Caller holds self._cond
+        self.requests += 1
+        if waited > 0.001:
+            self.throttled += 1
+            self.wait_seconds += waited
+
+    def acquire(self, weight: int, orders: int = 0) -> float:
+        """Block until the request fits in the budget; return the seconds spent waiting."""
+        is_order = orders > 0
+        weight = min(weight, self.weight.limit)
+        start = time.monotonic()
+
+        with self._cond:
+            if is_order:
+                self._order_waiters += 1
+            try:
+                while True:
+                    wait = self._try_take(weight, orders)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+            finally:
+                if is_order:
+                    self._order_waiters -= 1
+                    self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self._record(waited)
+            return waited
+
+    async def acquire_async(self, weight: int, orders: int = 0) -> float:
+        """``acquire`` for asyncio callers: sleeps on the event loop instead of blocking a thread."""
+        is_order = orders > 0
+        weight = min(weight, self.weight.limit)
+        start = time.monotonic()
+
+        if is_order:
+            with self._cond:
+                self._order_waiters += 1
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(weight, orders)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+        finally:
+            if is_order:
+                with self._cond:
+                    self._order_waiters -= 1
+                    self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._record(waited)
+        return waited
+
+    def update_from_headers(self, headers: Optional[Dict[str, str]]):
+        if not headers:
+            return
+        with self._cond:
+            for key, value in headers.items():
+                key = key.lower()
+                if key == 'x-mbx-used-weight-1m':
+                    self.weight.sync_used(int(value))
+                    USED_WEIGHT.set(int(value))
+                elif key == 'x-mbx-order-count-10s':
+                    self.orders_10s.sync_used(int(value))
+                elif key == 'x-mbx-order-count-1m':
+                    self.orders_1m.sync_used(int(value))
+
+    def on_rejected(self, status_code: int, retry_after: Optional[str]):
+        seconds = float(retry_after) if retry_after else (120.0 if status_code == 418 else 60.0)
+        with self._cond:
+            self.rejections += 1
+            self.banned_until = max(self.banned_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+        self.logger.error(f"Rate limited by Binance (HTTP {status_code}); pausing all requests for {seconds:.0f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            for bucket in (self.weight, self.orders_10s, self.orders_1m):
+                bucket.refill(now)
+            return {
+                'weight_limit_1m': self.weight.limit,
+                'weight_headroom_1m': int(self.weight.tokens),
+                'orders_limit_10s': self.orders_10s.limit,
+                'orders_headroom_10s': int(self.orders_10s.tokens),
+                'orders_limit_1m': self.orders_1m.limit,
+                'orders_headroom_1m': int(self.orders_1m.tokens),
+                'banned_for_seconds': round(max(0.0, self.banned_until - now), 3),
+                'requests': self.requests,
+                'throttled_requests': self.throttled,
+                'throttle_wait_seconds': round(self.wait_seconds, 3),
+                'rate_limit_rejections': self.rejections,
+            }
+
+
+class RateLimitedClient:
+    """Wraps a python-binance Client so every API method call passes through a RateLimiter.
+
+    Each call also records its latency, limiter wait, weight and any error code in ``metrics``.
+    """
+
+    def __init__(self, client, limiter: RateLimiter):
+        self._client = client
+        self._limiter = limiter
+        # monotonic time of the last call that got a response; doubles as a connection health cache
+        self.last_success: Optional[float] = None
+
+    @property
+    def raw_client(self):
+        return self._client
+
+    @staticmethod
+    def _is_api_call(name: str, attr: Any) -> bool:
+        return callable(attr) and (name.startswith('futures_') or name == 'ping')
+
+    def _count(self, labels: Tuple[str], weight: int, orders: int, waited: float):
+        RATE_LIMIT_WAIT_SECONDS.observe(waited, labels)
+        if weight:
+            REQUEST_WEIGHT.inc(labels, weight)
+        if orders:
+            ORDERS_SENT.inc(labels, orders)
+
+    def _on_error(self, name: str, error: Exception):
+        if isinstance(error, binance.BinanceAPIException):
+            self.last_success = time.monotonic()
+            REQUEST_ERRORS.inc((name, str(error.code)))
+            if error.status_code in (418, 429):
+                headers = getattr(error.response, 'headers', None) or {}
+                self._limiter.on_rejected(error.status_code, headers.get('Retry-After'))
+        else:
+            REQUEST_ERRORS.inc((name, error_code(error)))
+
+    def _finish(self, labels: Tuple[str], started: float):
+        REQUEST_SECONDS.observe(time.perf_counter() - started, labels)
+        response = getattr(self._client, 'response', None)
+        self._limiter.update_from_headers(getattr(response, 'headers', None))
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not self._is_api_call(name, attr):
+            return attr
+
+        labels = (name,)
+
+        def call(*args, **kwargs):
+            weight, orders = request_cost(name, kwargs)
+            self._count(labels, weight, orders, self._limiter.acquire(weight, orders))
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+                self.last_success = time.monotonic()
+                return result
+            except Exception as e:
+                self._on_error(name, e)
+                raise
+            finally:
+                self._finish(labels, started)
+
+        call.__name__ = name
+        return call
+
+
+class AsyncRateLimitedClient(RateLimitedClient):
+    """RateLimitedClient for python-binance's AsyncClient: same budget, metrics and header sync.
+
+    Waits are awaited, so a throttled call never blocks the event loop. The
+    AsyncClient keeps only its latest response, so with calls in flight the
+    headers read may belong to a neighbouring request. The used-weight and
+    order-count headers are account- and IP-wide totals, so they are still valid.
+    """
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not self._is_api_call(name, attr):
+            return attr
+
+        labels = (name,)
+
+        async def call(*args, **kwargs):
+            weight, orders = request_cost(name, kwargs)
+            self._count(labels, weight, orders, await self._limiter.acquire_async(weight, orders))
+            started = time.perf_counter()
+            try:
+                result = await attr(*args, **kwargs)
+                self.last_success = time.monotonic()
+                return result
+            except Exception as e:
+                self._on_error(name, e)
+                raise
+            finally:
+                self._finish(labels, started)
+
+        call.__name__ = name
+        return call
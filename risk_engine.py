@@ -0,0 +1,301 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Callable
+
+from metrics import RISK_REJECTIONS
+
+
+# Check names, as reported in each rejection reason
+MAX_ORDER_NOTIONAL = 'max_order_notional'
+MAX_POSITION_NOTIONAL = 'max_position_notional'
+MAX_ORDERS_PER_SECOND = 'max_orders_per_second'
+DAILY_LOSS_LIMIT = 'daily_loss_limit'
+KILL_SWITCH = 'kill_switch'
+NO_REFERENCE_PRICE = 'no_reference_price'
+
+# USDT; 0 disables a limit
+DEFAULT_MAX_ORDER_NOTIONAL = 50_000.0
+DEFAULT_MAX_POSITION_NOTIONAL = 250_000.0
+DEFAULT_MAX_ORDERS_PER_SECOND = 20
+DEFAULT_MAX_DAILY_LOSS = 0.0
+
+SECONDS_PER_DAY = 86400
+
+
+def rejection(check: str, message: str, limit: Optional[float] = None,
+              value: Optional[float] = None) -> Dict[str, Any]:
+    """One structured rejection reason, as returned by a check."""
+    return {'check': check, 'message': message, 'limit': limit, 'value': value}
+
+
+class RiskRejected(ValueError):
+    """Raised before an order leaves the process; ``reasons`` lists every check it failed."""
+
+    code = 'RISK_REJECTED'
+
+    def __init__(self, reasons: List[Dict[str, Any]]):
+        self.reasons = reasons
+        self.message = '; '.join(reason['message'] for reason in reasons)
+        super().__init__(f"Rejected by risk checks: {self.message}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'code': self.code, 'reasons': self.reasons}
+
+
+class RiskLimits:
+
+    def __init__(self, max_order_notional: float = DEFAULT_MAX_ORDER_NOTIONAL,
+                 max_position_notional: float = DEFAULT_MAX_POSITION_NOTIONAL,
+                 max_orders_per_second: int = DEFAULT_MAX_ORDERS_PER_SECOND,
+                 max_daily_loss: float = DEFAULT_MAX_DAILY_LOSS,
+                 position_limits: Optional[Dict[str, float]] = None,
+                 require_reference_price: bool = False):
+        self.max_order_notional = max_order_notional
+        self.max_position_notional = max_position_notional
+        self.max_orders_per_second = max_orders_per_second
+        self.max_daily_loss = max_daily_loss
+        # Reject orders that cannot be priced instead of letting them skip the notional checks
+        self.require_reference_price = require_reference_price
+        # Per-symbol overrides of max_position_notional
+        self.position_limits = {symbol.upper(): limit for symbol, limit in (position_limits or {}).items()}
+
+    @classmethod
+    def from_env(cls) -> 'RiskLimits':
+        """Read RISK_MAX_ORDER_NOTIONAL, RISK_MAX_POSITION_NOTIONAL, RISK_MAX_ORDERS_PER_SECOND,
+        RISK_MAX_DAILY_LOSS, RISK_POSITION_LIMITS (``BTCUSDT:100000,ETHUSDT:50000``) and
+        RISK_REQUIRE_REFERENCE_PRICE (``1`` to reject orders with no price)."""
+        position_limits = {}
+        for entry in os.environ.get('RISK_POSITION_LIMITS', '').split(','):
+            if entry.strip():
+                symbol, limit = entry.split(':')
+                position_limits[symbol.strip()] = float(limit)
+        return cls(
+            max_order_notional=float(os.environ.get('RISK_MAX_ORDER_NOTIONAL', DEFAULT_MAX_ORDER_NOTIONAL)),
+            max_position_notional=float(os.environ.get('RISK_MAX_POSITION_NOTIONAL', DEFAULT_MAX_POSITION_NOTIONAL)),
+            max_orders_per_second=int(os.environ.get('RISK_MAX_ORDERS_PER_SECOND', DEFAULT_MAX_ORDERS_PER_SECOND)),
+            max_daily_loss=float(os.environ.get('RISK_MAX_DAILY_LOSS', DEFAULT_MAX_DAILY_LOSS)),
+            position_limits=position_limits,
+            require_reference_price=os.environ.get('RISK_REQUIRE_REFERENCE_PRICE', '0') == '1',
+        )
+
+    @classmethod
+    def unlimited(cls) -> 'RiskLimits':
+        return cls(0.0, 0.0, 0, 0.0)
+
+    def position_limit(self, symbol: str) -> float:
+        return self.position_limits.get(symbol, self.max_position_notional)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'maxOrderNotional': self.max_order_notional,
+            'maxPositionNotional': self.max_position_notional,
+            'maxOrdersPerSecond': self.max_orders_per_second,
+            'maxDailyLoss': self.max_daily_loss,
+            'positionLimits': dict(self.position_limits),
+            'requireReferencePrice': self.require_reference_price,
+        }
+
+
+class OrderRisk:
+    """What the checks see for one order: size, reference price and the position it would leave."""
+
+    __slots__ = ('symbol', 'side', 'type', 'quantity', 'price', 'notional', 'position', 'projected')
+
+    def __init__(self, params: Dict[str, Any], price: Optional[float], position: float):
+        self.symbol = params['symbol']
+        self.side = params['side']
+        self.type = params.get('type')
+        self.quantity = float(params['quantity'])
+        self.price = price
+        self.notional = self.quantity * price if price else None
+        self.position = position
+        self.projected = position + (self.quantity if self.side == 'BUY' else -self.quantity)
+
+    @property
+    def reduces(self) -> bool:
+        """True when the order only shrinks the current position (it cannot flip it)."""
+        return abs(self.projected) < abs(self.position) and self.projected * self.position >= 0
+
+
+class RiskEngine:
+    """Pre-trade checks that run on every order before it is sent.
+
+    Everything a check needs is already in memory: the reference price is the
+    limit price or the latest mark, the position and PnL are the running
+    figures of the ``PositionBook``, and the order rate is a sliding one-second
+    window. A check is a few comparisons, so it adds microseconds. An order
+    that cannot be priced skips the notional checks (with a warning) unless
+    ``require_reference_price`` is set. Extra checks can be registered with ``add_check``; each receives
+    an ``OrderRisk`` and returns a ``rejection(...)`` dict or None.
+
+    The daily loss limit is a kill switch: once realized plus unrealized PnL
+    since UTC midnight (or since start-up) falls below ``-max_daily_loss``, only
+    orders that reduce a position are accepted until the next UTC day or
+    ``reset``. ``trip`` engages it by hand.
+    """
+
+    def __init__(self, limits: Optional[RiskLimits] = None, position_book=None,
+                 price_source: Optional[Callable[[str], Optional[float]]] = None):
+        self.limits = limits or RiskLimits()
+        self.position_book = position_book
+        self.price_source = price_source
+        self.logger = logging.getLogger('BasicBot.Risk')
+
+        self.checks: List[Callable[[OrderRisk], Optional[Dict[str, Any]]]] = [
+            self._check_kill_switch,
+            self._check_order_notional,
+            self._check_position_notional,
+        ]
+        self.rejections = 0
+        # Set while the kill switch is on: the check that engaged it and why
+        self.killed_by: Optional[str] = None
+        self.killed_reason: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._sent: deque = deque()
+        self._day: Optional[int] = None
+        self._day_start_pnl = 0.0
+
+    def add_check(self, check: Callable[[OrderRisk], Optional[Dict[str, Any]]]):
+        self.checks.append(check)
+
+    def check(self, params: Dict[str, Any]):
+        """Raise RiskRejected unless ``params`` passes every check; counts the order toward the rate limit."""
+        self.check_batch([params])
+
+    def check_batch(self, params_list: List[Dict[str, Any]]):
+        """Check orders that will be sent together, each against the position the earlier ones leave."""
+        reasons = []
+        pending: Dict[str, float] = {}
+        # Priced before taking the lock: the price source may fall back to a REST call
+        prices = [self._reference_price(params) for params in params_list]
+        with self._lock:
+            for index, params in enumerate(params_list):
+                order = OrderRisk(params, prices[index],
+                                  self._position(params['symbol']) + pending.get(params['symbol'], 0.0))
+                pending[order.symbol] = order.projected - self._position(order.symbol)
+                for check in self.checks:
+                    reason = check(order)
+                    if reason is not None:
+                        if len(params_list) > 1:
+                            reason = dict(reason, index=index, message=f"Order {index}: {reason['message']}")
+                        reasons.append(reason)
+            if not reasons:
+                reason = self._take_rate_slots(len(params_list))
+                if reason is not None:
+                    reasons.append(reason)
+            if reasons:
+                self.rejections += 1
+        if reasons:
+            for reason in reasons:
+                RISK_REJECTIONS.inc((reason['check'],))
+            raise RiskRejected(reasons)
+
+    def _position(self, symbol: str) -> float:
+        position = self.position_book.positions.get(symbol) if self.position_book is not None else None
+        return position.quantity if position is not None else 0.0
+
+    def _reference_price(self, params: Dict[str, Any]) -> Optional[float]:
+        # Price a limit order at its limit; market orders at the latest mark
+        price = params.get('price')
+        if price:
+            return float(price)
+        return self.price_source(params['symbol']) if self.price_source is not None else None
+
+    def _take_rate_slots(self, count: int) -> Optional[Dict[str, Any]]:
+        # Caller holds self._lock
+        limit = self.limits.max_orders_per_second
+        if not limit:
+            return None
+        now = time.monotonic()
+        while self._sent and now - self._sent[0] >= 1.0:
+            self._sent.popleft()
+        if len(self._sent) + count > limit:
+            return rejection(MAX_ORDERS_PER_SECOND,
+                             f"{len(self._sent) + count} orders in the last second exceeds {limit}/s",
+                             limit, len(self._sent) + count)
+        self._sent.extend([now] * count)
+        return None
+
+    def _check_order_notional(self, order: OrderRisk) -> Optional[Dict[str, Any]]:
+        limit = self.limits.max_order_notional
+        if not limit:
+            return None
+        if order.notional is None:
+            if self.limits.require_reference_price:
+                return rejection(NO_REFERENCE_PRICE, f"No mark price for {order.symbol} to size the order against")
+            self.logger.warning(f"No mark price for {order.symbol}; notional checks skipped")
+            return None
+        if order.notional > limit:
+            return rejection(MAX_ORDER_NOTIONAL,
+                             f"Order notional {order.notional:.2f} exceeds {limit:.2f}", limit, order.notional)
+        return None
+
+    def _check_position_notional(self, order: OrderRisk) -> Optional[Dict[str, Any]]:
+        limit = self.limits.position_limit(order.symbol)
+        if not limit or order.price is None or order.reduces:
+            return None
+        projected = abs(order.projected) * order.price
+        if projected > limit:
+            return rejection(MAX_POSITION_NOTIONAL,
+                             f"{order.symbol} position would reach {projected:.2f} notional, above {limit:.2f}",
+                             limit, projected)
+        return None
+
+    def daily_pnl(self) -> Optional[float]:
+        """Realized plus unrealized PnL since UTC midnight, or since start-up if later."""
+        if self.position_book is None:
+            return None
+        total = self.position_book.realized_pnl + self.position_book.unrealized_pnl
+        day = int(time.time() // SECONDS_PER_DAY)
+        if day != self._day:
+            if self._day is not None and self.killed_by == DAILY_LOSS_LIMIT:
+                self.logger.warning("New trading day; kill switch reset")
+                self.killed_by = self.killed_reason = None
+            self._day = day
+            self._day_start_pnl = total
+        return total - self._day_start_pnl
+
+    def _check_kill_switch(self, order: OrderRisk) -> Optional[Dict[str, Any]]:
+        limit = self.limits.max_daily_loss
+        if limit and self.killed_by is None:
+            pnl = self.daily_pnl()
+            if pnl is not None and pnl <= -limit:
+                self.killed_by = DAILY_LOSS_LIMIT
+                self.killed_reason = f"Daily loss {-pnl:.2f} reached the {limit:.2f} limit"
+                self.logger.critical(f"KILL SWITCH: {self.killed_reason}; only position-reducing orders allowed")
+        if self.killed_by is None or order.reduces:
+            return None
+        return rejection(self.killed_by, f"Kill switch on ({self.killed_reason}); only position-reducing orders",
+                         limit or None, self.daily_pnl())
+
+    def trip(self, reason: str = 'Engaged manually'):
+        with self._lock:
+            self.killed_by, self.killed_reason = KILL_SWITCH, reason
+        self.logger.critical(f"KILL SWITCH: {reason}")
+
+    def reset(self):
+        """Release the kill switch; the daily loss is measured afresh from now."""
+        with self._lock:
+            self.killed_by = self.killed_reason = None
+            self._day = None
+            self.daily_pnl()
+        self.logger.warning("Kill switch reset")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            recent = sum(1 for sent in self._sent if now - sent < 1.0)
+            pnl = self.daily_pnl()
+            return {
+                'limits': self.limits.to_dict(),
+                'killSwitch': self.killed_by is not None,
+                'killedBy': self.killed_by,
+                'killReason': self.killed_reason,
+                'dailyPnl': pnl,
+                'ordersLastSecond': recent,
+                'rejections': self.rejections,
+            }
@@ -1,4 +1,8 @@
 let currentSide = 'BUY';
+let liveStream = null;
+let liveBalances = false;
+const balanceBook = {};
+const twapProgress = {};
 
 const popularSymbols = [
     { symbol: 'BTCUSDT', name: 'Bitcoin', type: 'Crypto' },
@@ -129,7 +133,43 @@ function addActivity(message, type = 'info') {
     }
 }
 
+function renderBalances() {
+    const balanceContainer = document.getElementById('balanceContainer');
+    const balances = Object.values(balanceBook).filter(b => parseFloat(b.balance) > 0);
+    
+    if (balances.length === 0) {
+        balanceContainer.innerHTML = '<p class="text-secondary text-center">No balance found</p>';
+        return;
+    }
+    
+    let html = '';
+    balances.forEach(balance => {
+        html += `
+            <div class="balance-item">
+                <div class="d-flex justify-content-between">
+                    <span class="balance-asset">${balance.asset}</span>
+                    <span class="balance-amount">${parseFloat(balance.balance).toFixed(4)}</span>
+                </div>
+                <small class="text-secondary">Available: ${parseFloat(balance.availableBalance).toFixed(4)}</small>
+            </div>
+        `;
+    });
+    balanceContainer.innerHTML = html;
+}
+
+function applyBalances(balances) {
+    balances.forEach(balance => {
+        balanceBook[balance.asset] = Object.assign(balanceBook[balance.asset] || {}, balance);
+    });
+    renderBalances();
+}
+
 async function loadBalance() {
+    // Balance changes are pushed while the live stream is open and the server has a user-data stream
+    if (liveBalances && liveStream.readyState === EventSource.OPEN) {
+        return;
+    }
+    
     const balanceContainer = document.getElementById('balanceContainer');
     balanceContainer.innerHTML = '<div class="text-center"><div class="spinner-border text-primary" role="status"></div></div>';
     
@@ -138,26 +178,7 @@ async function loadBalance() {
         const data = await response.json();
         
         if (data.success) {
-            const balances = data.balance.filter(b => parseFloat(b.balance) > 0);
-            
-            if (balances.length === 0) {
-                balanceContainer.innerHTML = '<p class="text-secondary text-center">No balance found</p>';
-                return;
-            }
-            
-            let html = '';
-            balances.forEach(balance => {
-                html += `
-                    <div class="balance-item">
-                        <div class="d-flex justify-content-between">
-                            <span class="balance-asset">${balance.asset}</span>
-                            <span class="balance-amount">${parseFloat(balance.balance).toFixed(4)}</span>
-                        </div>
-                        <small class="text-secondary">Available: ${parseFloat(balance.availableBalance).toFixed(4)}</small>
-                    </div>
-                `;
-            });
-            balanceContainer.innerHTML = html;
+            applyBalances(data.balance);
             addActivity('Balance refreshed', 'success');
         } else {
             balanceContainer.innerHTML = '<p class="text-danger">Failed to load balance</p>';
@@ -169,6 +190,57 @@ async function loadBalance() {
     }
 }
 
+function handleOrderUpdate(order) {
+    const orderId = order.orderId || order.algoId;
+    const status = order.status || order.algoStatus;
+    const type = order.type || order.orderType;
+    const activityType = status === 'FILLED' ? 'success' : (status === 'REJECTED' || status === 'EXPIRED') ? 'error' : 'info';
+    addActivity(`Order ${orderId}: ${order.side} ${type} ${order.symbol} ${status}`, activityType);
+}
+
+function handleTwapUpdate(job) {
+    const lastCount = twapProgress[job.job_id] || 0;
+    if (job.successful_orders > lastCount) {
+        addActivity(`TWAP ${job.symbol}: ${job.successful_orders}/${job.total_orders} orders filled`, 'info');
+    }
+    twapProgress[job.job_id] = job.successful_orders;
+    
+    if (job.status === 'COMPLETED') {
+        showAlert(`✅ TWAP strategy completed! ${job.successful_orders}/${job.total_orders} orders executed`, 'success');
+        addActivity(`TWAP ${job.side} ${job.total_quantity} ${job.symbol} completed`, 'success');
+        loadBalance();
+    } else if (job.status === 'FAILED') {
+        showAlert(`❌ TWAP failed: ${job.error}`, 'danger');
+        addActivity(`Failed: TWAP strategy`, 'error');
+    } else if (job.status === 'CANCELLED') {
+        addActivity(`TWAP ${job.symbol} cancelled after ${job.successful_orders} orders`, 'info');
+    }
+    
+    if (job.status !== 'RUNNING' && job.status !== 'PENDING') {
+        delete twapProgress[job.job_id];
+        return true;
+    }
+    return false;
+}
+
+function connectLiveStream() {
+    if (!window.EventSource) {
+        return;
+    }
+    
+    liveStream = new EventSource('/api/stream');
+    liveStream.addEventListener('balance', e => {
+        liveBalances = true;
+        applyBalances(JSON.parse(e.data));
+    });
+    liveStream.onerror = () => {
+        // EventSource retries by itself; the reconnect snapshot re-enables live balances
+        liveBalances = false;
+    };
+    liveStream.addEventListener('order', e => handleOrderUpdate(JSON.parse(e.data)));
+    liveStream.addEventListener('twap', e => handleTwapUpdate(JSON.parse(e.data)));
+}
+
 async function handleMarketOrder(e) {
     e.preventDefault();
     const form = e.target;
@@ -376,10 +448,10 @@ async function handleTWAP(e) {
         const result = await response.json();
         
         if (result.success) {
-            showAlert(`✅ TWAP strategy completed! ${result.result.successful_orders}/${result.result.total_orders} orders executed`, 'success');
-            addActivity(`TWAP ${side} ${data.totalQuantity} ${data.symbol} over ${data.duration}min`, 'success');
+            showAlert(`✅ TWAP started! Job ID: ${result.job.job_id}`, 'success');
+            addActivity(`TWAP ${side} ${data.totalQuantity} ${data.symbol} over ${data.duration}min started`, 'info');
             form.reset();
-            loadBalance();
+            pollTwapJob(result.job.job_id);
         } else {
             showAlert(`❌ TWAP failed: ${result.message}`, 'danger');
             addActivity(`Failed: TWAP strategy`, 'error');
@@ -393,6 +465,30 @@ async function handleTWAP(e) {
     }
 }
 
+function pollTwapJob(jobId) {
+    // The live stream pushes TWAP progress; poll only when it is not connected
+    if (liveStream && liveStream.readyState === EventSource.OPEN) {
+        return;
+    }
+    
+    setTimeout(async () => {
+        try {
+            const response = await fetch(`/api/twap/${jobId}`);
+            const result = await response.json();
+            
+            if (!result.success) {
+                return;
+            }
+            
+            if (!handleTwapUpdate(result.job)) {
+                pollTwapJob(jobId);
+            }
+        } catch (error) {
+            pollTwapJob(jobId);
+        }
+    }, 2000);
+}
+
 async function handleOrderStatus(e) {
     e.preventDefault();
     const form = e.target;
@@ -452,5 +548,6 @@ document.addEventListener('DOMContentLoaded', function() {
     document.getElementById('twapForm').addEventListener('submit', handleTWAP);
     document.getElementById('orderStatusForm').addEventListener('submit', handleOrderStatus);
     
+    connectLiveStream();
     addActivity('Bot ready for trading', 'info');
 });
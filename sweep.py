@@ -0,0 +1,189 @@
+"""Parameter sweeps of TWAP backtests across symbols on a process pool.
+
+Bars come from a ``MarketStore`` (``--store``), or data files / synthetic bars
+are loaded once and appended to a scratch store. Workers memory-map the
+store's column files, so the bars are shared through the page cache instead
+of being pickled into each process. Each grid point runs
+``backtest.backtest_twap`` and its summary is appended to a JSON-lines
+results file as soon as it finishes.
+
+    python sweep.py --store market_data --symbols BTCUSDT,ETHUSDT \\
+        --duration 30,60,120 --orders 5,10,20 --limit-offset market,0,1,2 \\
+        --exchange-info exchange_info.json --out sweep_results.jsonl
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List
+
+from backtest import Bars, BacktestBot, backtest_twap, load_bars, synthetic_bars
+from market_store import MarketStore
+
+# Per-process state set up by the pool initializer
+_worker_bot: Optional[BacktestBot] = None
+_worker_store: Optional[MarketStore] = None
+_worker_bars: Dict[str, Bars] = {}
+
+
+def export_bars(bars: Bars, store: MarketStore, symbol: str) -> int:
+    """Append bars to ``store`` so workers can memory-map them."""
+    return store.append(symbol, 'klines_1m', {
+        'open_time': bars.open_time, 'open': bars.open, 'high': bars.high,
+        'low': bars.low, 'close': bars.close, 'volume': bars.volume,
+    })
+
+
+def _init_worker(store_root: str, exchange_info: Optional[Dict[str, Any]]):
+    global _worker_bot, _worker_store
+    _worker_bot = BacktestBot(exchange_info)
+    _worker_store = MarketStore(store_root)
+
+
+def _run_point(symbol: str, point: Dict[str, Any]) -> Dict[str, Any]:
+    bars = _worker_bars.get(symbol)
+    if bars is None:
+        bars = _worker_bars[symbol] = _worker_store.bars(symbol)
+    try:
+        result = backtest_twap(
+            _worker_bot, bars, symbol, point['side'], point['total_quantity'],
+            point['duration_minutes'], point['num_orders'],
+            start_every_minutes=point['start_every_minutes'],
+            limit_offset_ticks=point['limit_offset_ticks'],
+            tick_size=point.get('tick_size'),
+            slippage_bps=point['slippage_bps'],
+        )
+        return {'ok': True, **result.summary()}
+    except Exception as e:
+        return {'ok': False, 'symbol': symbol, **point, 'error': str(e)}
+
+
+def build_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_sweep(store: MarketStore, symbols: List[str], points: List[Dict[str, Any]], out_path: str,
+              workers: Optional[int] = None, exchange_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run every grid point for every symbol; stream one JSON line per result to ``out_path``."""
+    started = time.perf_counter()
+    done = failed = 0
+    best: Dict[str, Dict[str, Any]] = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store.root, exchange_info)) as pool, \
+            open(out_path, 'w') as out:
+        futures = [pool.submit(_run_point, symbol, point) for symbol in symbols for point in points]
+        for future in as_completed(futures):
+            result = future.result()
+            out.write(json.dumps(result, separators=(',', ':')) + '\n')
+            done += 1
+            if not result['ok']:
+                failed += 1
+                continue
+            score = result['slippage_vs_vwap_bps'].get('mean')
+            current = best.get(result['symbol'])
+            if score is not None and (current is None or score < current['slippage_vs_vwap_bps']['mean']):
+                best[result['symbol']] = result
+
+    return {'runs': done, 'failed': failed, 'elapsed_seconds': round(time.perf_counter() - started, 3),
+            'best': best}
+
+
+def _parse_list(value: str, cast) -> List[Any]:
+    return [cast(item) for item in value.split(',') if item]
+
+
+def _parse_offset(value: str) -> Optional[int]:
+    return None if value.lower() in ('market', 'none') else int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--store', help='MarketStore directory to read 1m klines from (see market_store.py)')
+    parser.add_argument('--data-dir', help='Directory with one <SYMBOL>*.csv/.parquet file per symbol')
+    parser.add_argument('--symbols', default='BTCUSDT', help='Comma-separated symbols')
+    parser.add_argument('--synthetic-days', type=float, default=None,
+                        help='Use random-walk 1m bars per symbol instead of data files')
+    parser.add_argument('--grid', help='JSON file mapping parameter names to lists of values')
+    parser.add_argument('--side', default='BUY')
+    parser.add_argument('--quantity', default='1')
+    parser.add_argument('--duration', default='60', help='Minutes, comma-separated')
+    parser.add_argument('--orders', default='10', help='Slice counts, comma-separated')
+    parser.add_argument('--every', default='60', help='Run start spacing in minutes, comma-separated')
+    parser.add_argument('--limit-offset', default='market',
+                        help="Ticks behind the market, comma-separated; 'market' for market slices")
+    parser.add_argument('--slippage-bps', default='1.0')
+    parser.add_argument('--tick-size', type=float, default=None, help='Tick size when --exchange-info is not given')
+    parser.add_argument('--exchange-info', help='futures exchangeInfo JSON for symbol filters')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--out', default='sweep_results.jsonl')
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+    else:
+        grid = {
+            'side': _parse_list(args.side, str.upper),
+            'total_quantity': _parse_list(args.quantity, float),
+            'duration_minutes': _parse_list(args.duration, float),
+            'num_orders': _parse_list(args.orders, int),
+            'start_every_minutes': _parse_list(args.every, float),
+            'limit_offset_ticks': _parse_list(args.limit_offset, _parse_offset),
+            'slippage_bps': _parse_list(args.slippage_bps, float),
+        }
+    points = build_grid(grid)
+    if args.tick_size is not None:
+        for point in points:
+            point['tick_size'] = args.tick_size
+
+    exchange_info = None
+    if args.exchange_info:
+        with open(args.exchange_info) as f:
+            exchange_info = json.load(f)
+
+    if args.store:
+        store = MarketStore(args.store)
+        available = [symbol for symbol in symbols if len(store.klines(symbol)['open_time'])]
+        for symbol in sorted(set(symbols) - set(available)):
+            print(f"No klines for {symbol} in {args.store}; skipping", file=sys.stderr)
+        print(f"Sweeping {len(points)} parameter sets x {len(available)} symbols -> {args.out}")
+        summary = run_sweep(store, available, points, args.out, workers=args.workers, exchange_info=exchange_info)
+    else:
+        with tempfile.TemporaryDirectory(prefix='sweep-') as scratch:
+            store = MarketStore(scratch)
+            available = []
+            for index, symbol in enumerate(symbols):
+                if args.synthetic_days:
+                    bars = synthetic_bars(int(args.synthetic_days * 1440), seed=index)
+                else:
+                    if not args.data_dir:
+                        parser.error('--store, --data-dir or --synthetic-days is required')
+                    matches = sorted(glob.glob(os.path.join(args.data_dir, f'{symbol}*')))
+                    if not matches:
+                        print(f"No data file for {symbol} in {args.data_dir}; skipping", file=sys.stderr)
+                        continue
+                    bars = load_bars(matches[0])
+                export_bars(bars, store, symbol)
+                available.append(symbol)
+
+            print(f"Sweeping {len(points)} parameter sets x {len(available)} symbols -> {args.out}")
+            summary = run_sweep(store, available, points, args.out, workers=args.workers,
+                                exchange_info=exchange_info)
+
+    print(f"{summary['runs']} backtests ({summary['failed']} failed) in {summary['elapsed_seconds']:.2f}s")
+    for symbol, result in sorted(summary['best'].items()):
+        offset = result['limit_offset_ticks']
+        print(f"  {symbol}: best vs VWAP {result['slippage_vs_vwap_bps']['mean']:+.2f} bps | "
+              f"{result['num_orders']} orders over {result['duration_minutes']:g} min | "
+              f"{'market' if offset is None else f'limit {offset} ticks'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from typing import Optional, Dict, Any, Callable
+
+
+class SymbolFilters:
+    """Trading rules for one symbol, pre-parsed into Decimals for O(1) checks."""
+
+    __slots__ = (
+        'symbol', 'status', 'tick_size', 'min_price', 'max_price',
+        'step_size', 'min_qty', 'max_qty', 'market_step_size',
+        'market_min_qty', 'market_max_qty', 'min_notional',
+    )
+
+    def __init__(self, info: Dict[str, Any]):
+        self.symbol = info['symbol']
+        self.status = info.get('status', 'TRADING')
+
+        filters = {f['filterType']: f for f in info.get('filters', [])}
+        price = filters.get('PRICE_FILTER', {})
+        lot = filters.get('LOT_SIZE', {})
+        market_lot = filters.get('MARKET_LOT_SIZE', lot)
+        notional = filters.get('MIN_NOTIONAL', {})
+
+        self.tick_size = Decimal(price.get('tickSize', '0'))
+        self.min_price = Decimal(price.get('minPrice', '0'))
+        self.max_price = Decimal(price.get('maxPrice', '0'))
+        self.step_size = Decimal(lot.get('stepSize', '0'))
+        self.min_qty = Decimal(lot.get('minQty', '0'))
+        self.max_qty = Decimal(lot.get('maxQty', '0'))
+        self.market_step_size = Decimal(market_lot.get('stepSize', lot.get('stepSize', '0')))
+        self.market_min_qty = Decimal(market_lot.get('minQty', lot.get('minQty', '0')))
+        self.market_max_qty = Decimal(market_lot.get('maxQty', lot.get('maxQty', '0')))
+        self.min_notional = Decimal(notional.get('notional', notional.get('minNotional', '0')))
+
+    @staticmethod
+    def _round(value: Any, increment: Decimal, rounding: str) -> Decimal:
+        value = Decimal(str(value))
+        if not increment:
+            return value
+        return ((value / increment).to_integral_value(rounding=rounding) * increment).quantize(increment)
+
+    def round_price(self, price: Any) -> Decimal:
+        return self._round(price, self.tick_size, ROUND_HALF_UP)
+
+    def round_quantity(self, quantity: Any, market: bool = False) -> Decimal:
+        # Always round quantity down so an order never exceeds what was asked for
+        return self._round(quantity, self.market_step_size if market else self.step_size, ROUND_DOWN)
+
+    def check_price(self, price: Decimal, label: str = 'Price'):
+        if self.min_price and price < self.min_price:
+            raise ValueError(f"{label} {price} is below the minimum {self.min_price} for {self.symbol}")
+        if self.max_price and price > self.max_price:
+            raise ValueError(f"{label} {price} is above the maximum {self.max_price} for {self.symbol}")
+
+    def check_quantity(self, quantity: Decimal, market: bool = False):
+        min_qty = self.market_min_qty if market else self.min_qty
+        max_qty = self.market_max_qty if market else self.max_qty
+        if quantity <= 0 or quantity < min_qty:
+            raise ValueError(f"Quantity {quantity} is below the minimum {min_qty} for {self.symbol}")
+        if max_qty and quantity > max_qty:
+            raise ValueError(f"Quantity {quantity} is above the maximum {max_qty} for {self.symbol}")
+
+    def apply(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of order params rounded to this symbol's tick and step sizes.
+
+        Raises ValueError when the rounded order would still be rejected by the exchange.
+        """
+        params = dict(params)
+        market = params.get('type') == 'MARKET'
+
+        quantity = self.round_quantity(params['quantity'], market=market)
+        self.check_quantity(quantity, market=market)
+        params['quantity'] = str(quantity)
+
+        for key, label in (('price', 'Price'), ('stopPrice', 'Stop price')):
+            if params.get(key) is not None:
+                price = self.round_price(params[key])
+                self.check_price(price, label)
+                params[key] = str(price)
+
+        if params.get('price') is not None and self.min_notional:
+            notional = quantity * Decimal(params['price'])
+            if notional < self.min_notional:
+                raise ValueError(
+                    f"Order notional {notional} is below the minimum {self.min_notional} for {self.symbol}"
+                )
+
+        return params
+
+
+class SymbolFilterCache:
+    """exchangeInfo filters indexed by symbol, reloaded when older than ``ttl`` seconds.
+
+    The first lookup triggers the load, so creating the cache does no network I/O.
+    If a refresh fails the previous snapshot keeps being served.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], Dict[str, Any]]] = None, ttl: float = 3600.0):
+        self.loader = loader
+        self.ttl = ttl
+        self.logger = logging.getLogger('BasicBot.SymbolFilters')
+
+        self._filters: Dict[str, SymbolFilters] = {}
+        self._loaded_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.time() - self._loaded_at > self.ttl
+
+    def needs_refresh(self) -> bool:
+        return self.is_stale() and time.time() >= self._retry_at
+
+    def mark_failed(self, error: Exception):
+        # Back off instead of retrying on every order; callers fall back to basic validation
+        self._retry_at = time.time() + min(self.ttl, 60.0)
+        self.logger.warning(f"Failed to refresh exchange info, using previous filters: {error}")
+
+    def load(self, exchange_info: Dict[str, Any]):
+        filters = {s['symbol']: SymbolFilters(s) for s in exchange_info.get('symbols', [])}
+        self._filters = filters
+        self._loaded_at = time.time()
+        self.logger.info(f"Loaded trading filters for {len(filters)} symbols")
+
+    def refresh(self):
+        if self.loader is None:
+            return
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not self.needs_refresh():
+                return
+            try:
+                self.load(self.loader())
+            except Exception as e:
+                self.mark_failed(e)
+
+    def get(self, symbol: str) -> Optional[SymbolFilters]:
+        if self.needs_refresh():
+            self.refresh()
+        return self._filters.get(symbol)
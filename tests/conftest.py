@@ -0,0 +1,27 @@
+import pytest
+
+from basic_bot import BasicBot
+from fake_exchange import FakeFuturesClient, DEFAULT_PRICES
+from order_journal import OrderJournal
+from risk_engine import RiskLimits
+
+
+@pytest.fixture
+def fake():
+    return FakeFuturesClient(prices=DEFAULT_PRICES)
+
+
+@pytest.fixture
+def journal():
+    journal = OrderJournal(':memory:')
+    yield journal
+    journal.close()
+
+
+@pytest.fixture
+def bot(fake, journal):
+    """BasicBot on the fake exchange with risk limits off; tests that need limits set their own."""
+    bot = BasicBot('test', 'test', testnet=True, client=fake, journal=journal)
+    bot.risk.limits = RiskLimits.unlimited()
+    yield bot
+    bot.stop_streams()
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+import async_bot
+from async_bot import AsyncBasicBot
+from fake_exchange import AsyncFakeFuturesClient
+from risk_engine import RiskLimits
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(async_bot, 'ORDER_RETRY_BACKOFF', 0.0)
+
+
+def run_with_bot(fake, scenario):
+    async def main():
+        bot = await AsyncBasicBot.create('test', 'test', client=AsyncFakeFuturesClient(fake))
+        bot.risk.limits = RiskLimits.unlimited()
+        try:
+            return await scenario(bot)
+        finally:
+            await bot.close()
+    return asyncio.run(main())
+
+
+def record_sends(fake):
+    sent = []
+    create = fake.futures_create_order
+
+    def spy(**params):
+        sent.append(dict(params))
+        return create(**params)
+
+    fake.futures_create_order = spy
+    return sent
+
+
+def test_timeout_then_lookup_finds_order_does_not_resend(fake):
+    # The order lands but the response is lost
+    fake.inject_error('MARKET', code=-1007, message='Timeout waiting for response', after_create=True)
+    sent = record_sends(fake)
+
+    order = run_with_bot(fake, lambda bot: bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-1'))
+
+    assert order['clientOrderId'] == 'cid-1'
+    assert len(sent) == 1
+    assert len(fake.orders) == 1
+    assert fake.calls.count('futures_get_order') == 1
+
+
+def test_timeout_then_lookup_finds_nothing_resends_same_id(fake):
+    # The request never reached the matching engine
+    fake.inject_error('MARKET', code=-1007, message='Timeout waiting for response')
+    sent = record_sends(fake)
+
+    order = run_with_bot(fake, lambda bot: bot.place_market_order('BTCUSDT', 'BUY', 0.001))
+
+    assert len(sent) == 2
+    assert sent[0]['newClientOrderId'] == sent[1]['newClientOrderId'] == order['clientOrderId']
+    assert len(fake.orders) == 1
+
+
+def test_non_transient_error_is_not_retried(fake):
+    fake.inject_error('MARKET', code=-2019, message='Margin is insufficient.')
+    sent = record_sends(fake)
+
+    with pytest.raises(async_bot.BinanceAPIException):
+        run_with_bot(fake, lambda bot: bot.place_market_order('BTCUSDT', 'BUY', 0.001))
+    assert len(sent) == 1
+
+
+def test_missing_mark_does_not_hold_up_the_order(fake):
+    gate = threading.Event()
+    mark_price = fake.futures_mark_price
+    fake.futures_mark_price = lambda **params: (gate.wait(5), mark_price(**params))[1]
+
+    async def scenario(bot):
+        order = await asyncio.wait_for(bot.place_market_order('BTCUSDT', 'BUY', 0.001), timeout=2)
+        pending = 'BTCUSDT' in bot._mark_refreshes
+        gate.set()
+        return order, pending
+
+    order, pending = run_with_bot(fake, scenario)
+    assert order['status'] == 'FILLED'
+    assert pending
@@ -0,0 +1,37 @@
+import threading
+
+from metrics import MetricsRegistry
+
+
+def run_in_threads(count, target):
+    for _ in range(count):
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+
+
+def test_exited_threads_fold_into_the_base_shard():
+    registry = MetricsRegistry()
+    orders = registry.counter('orders_total', 'Orders', ('side',))
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+
+    def work():
+        orders.inc(('BUY',))
+        latency.observe(0.5)
+
+    run_in_threads(50, work)
+
+    assert len(registry._shards) <= 1
+    assert registry.snapshot('orders_total') == {('BUY',): {'value': 50.0}}
+    assert registry.snapshot('latency_seconds')[()]['count'] == 50
+
+
+def test_live_and_exited_threads_sum_together():
+    registry = MetricsRegistry()
+    orders = registry.counter('orders_total', 'Orders')
+    orders.inc(amount=2)
+
+    run_in_threads(3, orders.inc)
+
+    assert registry.snapshot('orders_total') == {(): {'value': 5.0}}
+    assert 'orders_total 5' in registry.render()
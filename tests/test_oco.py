@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import oco_manager
+from oco_manager import COMPLETED, BOTH_CLOSED, ACTIVE
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(oco_manager, 'CANCEL_RETRY_BACKOFF', 0.0)
+
+
+def wait_finished(pair, timeout=5.0):
+    deadline = time.time() + timeout
+    while pair.status in (ACTIVE, 'CANCELLING') and time.time() < deadline:
+        time.sleep(0.005)
+    return pair
+
+
+def place(bot):
+    result = bot.place_oco_order('BTCUSDT', 'BUY', 0.001, 55000, 45000)
+    return result, bot.oco_manager.get(result['group_id'])
+
+
+def test_take_profit_fill_cancels_the_stop(bot, fake):
+    result, pair = place(bot)
+    [filled] = fake.set_price('BTCUSDT', 55000)
+
+    bot.oco_manager.on_stream_event('order', filled)
+
+    assert wait_finished(pair).status == COMPLETED
+    assert pair.closed_leg == 'take_profit_order'
+    assert fake.algo_orders[result['stop_loss_order']['algoId']]['algoStatus'] == 'CANCELED'
+
+
+def test_stop_trigger_cancels_the_take_profit(bot, fake):
+    result, pair = place(bot)
+    triggered = next(order for order in fake.set_price('BTCUSDT', 45000) if 'algoId' in order)
+
+    bot.oco_manager.on_stream_event('algo', triggered)
+
+    assert wait_finished(pair).status == COMPLETED
+    assert pair.closed_leg == 'stop_loss_order'
+    assert fake.orders[result['take_profit_order']['orderId']]['status'] == 'CANCELED'
+
+
+def test_poll_catches_a_fill_without_the_stream(bot, fake):
+    result, pair = place(bot)
+    pair.registered_at -= 1
+    fake.set_price('BTCUSDT', 55000)
+
+    assert bot.oco_manager.poll() == 1
+    assert wait_finished(pair).status == COMPLETED
+    assert fake.algo_orders[result['stop_loss_order']['algoId']]['algoStatus'] == 'CANCELED'
+
+
+def test_sibling_already_closed_is_reported(bot, fake):
+    result, pair = place(bot)
+    [filled] = fake.set_price('BTCUSDT', 55000)
+    fake.futures_cancel_order(symbol='BTCUSDT', algoId=result['stop_loss_order']['algoId'])
+
+    bot.oco_manager.on_stream_event('order', filled)
+
+    assert wait_finished(pair).status == BOTH_CLOSED
+
+
+def test_untouched_leg_events_are_ignored(bot, fake):
+    result, pair = place(bot)
+    bot.oco_manager.on_stream_event('order', dict(result['take_profit_order'], status='NEW'))
+    assert pair.status == ACTIVE
+
+
+@pytest.mark.parametrize('failing, survivor', [('STOP', 'take_profit_order'), ('LIMIT', 'stop_loss_order')])
+def test_failed_leg_rolls_back_the_placed_one(bot, fake, failing, survivor):
+    fake.inject_error(failing, code=-2021, message='Order would immediately trigger.')
+
+    with pytest.raises(Exception):
+        bot.place_oco_order('BTCUSDT', 'BUY', 0.001, 55000, 45000)
+
+    live = [o for o in fake.orders.values() if o['status'] == 'NEW']
+    live += [o for o in fake.algo_orders.values() if o['algoStatus'] == 'NEW']
+    assert live == []
+    cancelled = list(fake.algo_orders.values()) if survivor == 'stop_loss_order' else list(fake.orders.values())
+    assert [o.get('status') or o.get('algoStatus') for o in cancelled] == ['CANCELED']
+    assert bot.oco_manager.list_pairs() == []
+
+
+def test_leg_failing_local_filters_places_nothing(bot, fake):
+    with pytest.raises(ValueError):
+        bot.place_oco_order('BTCUSDT', 'BUY', 0.001, 55000, 0.00001)
+    assert not fake.orders and not fake.algo_orders
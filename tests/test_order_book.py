@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+from order_book import LocalOrderBook, OrderBookManager
+
+
+def depth(first, final, previous, bids=(), asks=()):
+    return {'e': 'depthUpdate', 'E': 0, 'U': first, 'u': final, 'pu': previous,
+            'b': [list(level) for level in bids], 'a': [list(level) for level in asks]}
+
+
+@pytest.fixture
+def book():
+    book = LocalOrderBook('BTCUSDT')
+    book.apply_snapshot({'lastUpdateId': 100, 'bids': [['99', '1']], 'asks': [['101', '1']]})
+    return book
+
+
+def test_events_before_the_snapshot_are_dropped(book):
+    assert book.apply_event(depth(90, 99, 89, bids=[('98', '5')]))
+    assert book.depth_at('BUY', 98) == 0
+    assert not book.synced
+
+
+def test_first_event_must_straddle_the_snapshot(book):
+    # U > lastUpdateId: updates between the snapshot and this event were missed
+    assert not book.apply_event(depth(102, 105, 101))
+    assert book.apply_event(depth(95, 103, 94, bids=[('99.5', '2')]))
+    assert book.synced
+    assert book.last_update_id == 103
+    assert book.best_bid() == 99.5
+
+
+def test_pu_mismatch_is_a_gap(book):
+    assert book.apply_event(depth(95, 103, 94))
+    assert book.apply_event(depth(104, 110, 103, asks=[('101', '0')]))
+    assert book.best_ask() is None
+    # pu must equal the previous event's u
+    assert not book.apply_event(depth(115, 120, 112))
+    assert not book.synced
+
+
+class StubSocketManager:
+    def __init__(self):
+        self.callbacks = {}
+
+    def start_futures_depth_socket(self, callback, symbol, depth):
+        self.callbacks[symbol] = callback
+
+    def stop(self):
+        pass
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+def test_gap_triggers_a_resync_and_buffered_events_replay(fake):
+    gate = threading.Event()
+    snapshot = fake.futures_order_book
+
+    def slow_snapshot(**params):
+        gate.wait()
+        return snapshot(**params)
+
+    fake.futures_order_book = slow_snapshot
+    manager = OrderBookManager(fake)
+    manager._manager = sockets = StubSocketManager()
+    manager.watch('BTCUSDT')
+    send = lambda event: sockets.callbacks['BTCUSDT']({'stream': 'btcusdt@depth', 'data': event})
+
+    # Arrives while the snapshot (lastUpdateId=1) is in flight: buffered, then replayed on top of it
+    send(depth(1, 3, 0, bids=[('49999', '7')]))
+    assert manager.get('BTCUSDT') is None
+    gate.set()
+    wait_for(lambda: manager.get('BTCUSDT') is not None)
+    book = manager.get('BTCUSDT')
+    assert book.last_update_id == 3
+    assert book.depth_at('BUY', 49999) == 7
+
+    send(depth(4, 5, 3))
+    assert book.synced
+    # pu=6 != 5: a missed event, so the book is pulled and refetched (lastUpdateId=2)
+    send(depth(7, 8, 6))
+    assert manager.get('BTCUSDT') is None
+    wait_for(lambda: manager.resyncs == 2)
+    send(depth(2, 9, 1))
+    assert manager.get('BTCUSDT') is book
+    assert book.last_update_id == 9
+
+
+def test_events_that_do_not_bridge_the_snapshot_resync_again(fake):
+    manager = OrderBookManager(fake)
+    manager._manager = StubSocketManager()
+    gate = threading.Event()
+    snapshot = fake.futures_order_book
+    fake.futures_order_book = lambda **params: (gate.wait(), snapshot(**params))[1]
+    manager.watch('BTCUSDT')
+    send = lambda event: manager._manager.callbacks['BTCUSDT'](event)
+
+    # Snapshot 1 lands after events 5..6 only: 2..4 are missing
+    send(depth(5, 6, 4))
+    gate.set()
+    wait_for(lambda: manager.resyncs >= 2)
+    assert manager.get('BTCUSDT') is None
+
+
+def test_depth_is_bounded_to_the_best_levels():
+    book = LocalOrderBook('BTCUSDT')
+    book.bids.max_depth = book.asks.max_depth = 3
+    book.apply_snapshot({'lastUpdateId': 1, 'bids': [[str(p), '1'] for p in (95, 96, 97, 98)],
+                         'asks': [[str(p), '1'] for p in (101, 102, 103, 104)]})
+    assert [p for p, _ in book.bids.top(10)] == [98, 97, 96]
+    assert [p for p, _ in book.asks.top(10)] == [101, 102, 103]
+
+    # Behind the worst kept level: ignored; better: pushes the worst one out
+    book.apply_event(depth(1, 2, 0, bids=[('90', '1'), ('99', '2')], asks=[('100', '1')]))
+    assert [p for p, _ in book.bids.top(10)] == [99, 98, 97]
+    assert [p for p, _ in book.asks.top(10)] == [100, 101, 102]
+    assert sorted(book.bids.levels) == [97, 98, 99]
+    assert book.top() == (99, 100)
+    assert book.mid() == 99.5
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+import basic_bot
+from basic_bot import BasicBot
+from order_journal import OrderJournal
+from risk_engine import RiskLimits
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(basic_bot, 'ORDER_RETRY_BACKOFF', 0.0)
+
+
+def test_lost_response_is_found_not_resent(bot, fake):
+    fake.inject_error('MARKET', code=-1001, message='Internal error', after_create=True)
+
+    order = bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-1')
+
+    assert order['clientOrderId'] == 'cid-1'
+    assert fake.calls.count('futures_create_order') == 1
+    assert len(fake.orders) == 1
+
+
+def test_request_that_never_landed_is_resent_once(bot, fake):
+    fake.inject_error('MARKET', code=-1007, message='Timeout waiting for response')
+
+    order = bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-2')
+
+    assert order['clientOrderId'] == 'cid-2'
+    assert fake.calls.count('futures_create_order') == 2
+    assert len(fake.orders) == 1
+
+
+def test_same_client_id_returns_the_original(bot, fake):
+    first = bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-3')
+    again = bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-3')
+
+    assert again['orderId'] == first['orderId']
+    assert fake.calls.count('futures_create_order') == 1
+
+
+def test_concurrent_submissions_of_one_id_place_one_order(bot, fake):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-4'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({order['orderId'] for order in results}) == 1
+    assert len(fake.orders) == 1
+
+
+def test_duplicate_id_from_a_previous_run_resolves_to_existing(bot, fake):
+    first = bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-5')
+    # A fresh process has an empty dedup index; the exchange rejects the id with -4116
+    restarted = BasicBot('test', 'test', testnet=True, client=fake, journal=OrderJournal(':memory:'))
+    restarted.risk.limits = RiskLimits.unlimited()
+
+    again = restarted.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-5')
+
+    assert again['orderId'] == first['orderId']
+    assert len(fake.orders) == 1
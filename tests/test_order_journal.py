@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from basic_bot import BasicBot
+from order_journal import OrderJournal, NOT_PLACED
+from risk_engine import RiskLimits
+from twap_engine import TwapEngine, TwapJob, RUNNING, COMPLETED
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'orders.db')
+
+
+def restart(fake, path):
+    """A new process: fresh dedup index and client ids, the same journal file and exchange."""
+    bot = BasicBot('test', 'test', testnet=True, client=fake, journal=OrderJournal(path))
+    bot.risk.limits = RiskLimits.unlimited()
+    return bot
+
+
+def market(symbol='BTCUSDT', quantity=0.001):
+    return {'symbol': symbol, 'side': 'BUY', 'type': 'MARKET', 'quantity': quantity}
+
+
+def test_intent_without_ack_that_never_landed_is_not_placed(fake, path):
+    crashed = OrderJournal(path)
+    crashed.record_intent('cid-lost', market())
+    crashed.close()
+
+    bot = restart(fake, path)
+    counts = bot.reconcile_orders()
+
+    assert counts['not_placed'] == 1
+    assert bot.journal.get_order('cid-lost')['status'] == NOT_PLACED
+    assert bot.journal.open_orders() == []
+
+
+def test_intent_without_ack_that_landed_is_reconciled(fake, path):
+    crashed = OrderJournal(path)
+    resting = {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'timeInForce': 'GTC',
+               'quantity': 0.001, 'price': 40000}
+    crashed.record_intent('cid-open', resting)
+    crashed.record_intent('cid-filled', market())
+    crashed.close()
+    # Both reached the exchange; the process died before either response came back
+    fake.futures_create_order(newClientOrderId='cid-open', **resting)
+    fake.futures_create_order(newClientOrderId='cid-filled', **market())
+
+    bot = restart(fake, path)
+    counts = bot.reconcile_orders()
+
+    assert (counts['open'], counts['closed'], counts['not_placed']) == (1, 1, 0)
+    assert bot.journal.get_order('cid-open')['status'] == 'NEW'
+    assert bot.journal.get_order('cid-filled')['status'] == 'FILLED'
+    # Resubmitting either id returns the reconciled order instead of sending it again
+    again = bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-filled')
+    assert again['clientOrderId'] == 'cid-filled'
+    assert len(fake.orders) == 2
+
+
+def test_twap_resumes_without_replacing_the_slice_in_flight(fake, path):
+    bot = restart(fake, path)
+    plan = bot._plan_twap('BTCUSDT', 'BUY', 0.003, 1, 3)
+    job = TwapJob('job-1', plan)
+    job.status = RUNNING
+    job.started_at = time.time() - 120
+    job.next_index = 1
+    job.executed_quantity = 0.001
+    bot.journal.record_twap(job.state())
+    slice_ids = [bot.client_order_ids.derive(f"twap:job-1:{i}") for i in range(3)]
+    bot.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id=slice_ids[0])
+    # Slice 2 was sent, but the process crashed before its ack was journaled
+    bot.journal.record_intent(slice_ids[1], market())
+    fake.futures_create_order(newClientOrderId=slice_ids[1], **market())
+    bot.journal.close()
+
+    bot = restart(fake, path)
+    bot.reconcile_orders()
+    engine = TwapEngine(bot)
+    try:
+        [resumed] = engine.resume()
+        deadline = time.time() + 5
+        while not resumed.done and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        engine.shutdown()
+
+    assert resumed.status == COMPLETED
+    assert resumed.executed_quantity == pytest.approx(0.003)
+    assert sorted(o['clientOrderId'] for o in fake.orders.values()) == sorted(slice_ids)
+    assert bot.journal.twap_jobs(status=RUNNING) == []
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from rate_limiter import RateLimiter, RateLimitedClient, READ_RESERVE_FRACTION, _Bucket
+
+
+def test_reads_leave_the_reserve_for_orders():
+    limiter = RateLimiter(weight_per_minute=100)
+    spendable = int(100 * (1 - READ_RESERVE_FRACTION))
+    with limiter._cond:
+        assert limiter._try_take(spendable, 0) == 0
+        # The next read would dip into the reserve; an order still fits
+        assert limiter._try_take(1, 0) > 0
+        assert limiter._try_take(1, 1) == 0
+
+
+def test_reads_wait_while_an_order_is_queued():
+    limiter = RateLimiter()
+    # Fast buckets: one order per 0.2s, plenty of weight
+    limiter.orders_10s = _Bucket(1, 0.2)
+    limiter.weight = _Bucket(6000, 1.0)
+    limiter.acquire(0, orders=1)
+
+    finished = []
+    order = threading.Thread(target=lambda: (limiter.acquire(0, orders=1), finished.append('order')))
+    order.start()
+    while not limiter._order_waiters:
+        time.sleep(0.001)
+    read = threading.Thread(target=lambda: (limiter.acquire(1), finished.append('read')))
+    read.start()
+    order.join()
+    read.join()
+
+    assert finished == ['order', 'read']
+
+
+@pytest.mark.parametrize('status_code, expected', [(418, 120.0), (429, 60.0)])
+def test_ban_without_retry_after_uses_default_backoff(status_code, expected):
+    limiter = RateLimiter()
+    limiter.on_rejected(status_code, None)
+    banned = limiter.snapshot()['banned_for_seconds']
+    assert expected - 1 < banned <= expected
+    with limiter._cond:
+        assert limiter._try_take(1, 1) > expected - 1
+
+
+def test_ban_honours_retry_after_and_blocks_every_request():
+    limiter = RateLimiter()
+    limiter.on_rejected(429, '0.2')
+    start = time.monotonic()
+    limiter.acquire(0, orders=1)
+    assert time.monotonic() - start >= 0.19
+    assert limiter.snapshot()['rate_limit_rejections'] == 1
+
+
+def test_a_later_shorter_ban_does_not_shorten_the_current_one():
+    limiter = RateLimiter()
+    limiter.on_rejected(418, '30')
+    limiter.on_rejected(429, '1')
+    assert limiter.snapshot()['banned_for_seconds'] > 29
+
+
+def test_client_429_starts_the_backoff(fake):
+    limiter = RateLimiter()
+    client = RateLimitedClient(fake, limiter)
+    fake.inject_error('MARKET', code=-1003, message='Too many requests', status_code=429)
+
+    with pytest.raises(Exception):
+        client.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=0.001)
+
+    assert limiter.snapshot()['banned_for_seconds'] > 59
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from metrics import REGISTRY
+
+from risk_engine import (RiskLimits, RiskRejected, MAX_ORDER_NOTIONAL, MAX_POSITION_NOTIONAL,
+                         MAX_ORDERS_PER_SECOND, DAILY_LOSS_LIMIT, KILL_SWITCH, NO_REFERENCE_PRICE)
+
+
+def limits(**overrides):
+    values = dict(max_order_notional=0.0, max_position_notional=0.0, max_orders_per_second=0, max_daily_loss=0.0)
+    values.update(overrides)
+    return RiskLimits(**values)
+
+
+def rejected_by(call):
+    with pytest.raises(RiskRejected) as info:
+        call()
+    return [reason['check'] for reason in info.value.reasons]
+
+
+@pytest.fixture
+def marked(bot):
+    bot.position_book.on_mark_price('BTCUSDT', 50000.0)
+    return bot
+
+
+def test_order_notional(marked, fake):
+    marked.risk.limits = limits(max_order_notional=100)
+    # 0.01 BTC at the 50000 mark is 500 USDT
+    assert rejected_by(lambda: marked.place_market_order('BTCUSDT', 'BUY', 0.01)) == [MAX_ORDER_NOTIONAL]
+    # Limit orders are priced at their limit, not the mark
+    assert rejected_by(lambda: marked.place_limit_order('BTCUSDT', 'BUY', 0.002, 60000)) == [MAX_ORDER_NOTIONAL]
+    marked.place_limit_order('BTCUSDT', 'BUY', 0.002, 40000)
+    assert len(fake.orders) == 1
+
+
+def test_position_notional_with_symbol_override(marked, fake):
+    marked.place_market_order('BTCUSDT', 'BUY', 0.001)
+    marked.risk.limits = limits(max_position_notional=1000, position_limits={'BTCUSDT': 75})
+
+    # 0.002 BTC would be 100 USDT of position, above the 75 BTCUSDT limit
+    assert rejected_by(lambda: marked.place_market_order('BTCUSDT', 'BUY', 0.001)) == [MAX_POSITION_NOTIONAL]
+    # Shrinking the position is always allowed
+    marked.place_market_order('BTCUSDT', 'SELL', 0.001)
+
+
+def test_orders_per_second(marked):
+    marked.risk.limits = limits(max_orders_per_second=2)
+    marked.place_market_order('BTCUSDT', 'BUY', 0.001)
+    marked.place_market_order('BTCUSDT', 'BUY', 0.001)
+    assert rejected_by(lambda: marked.place_market_order('BTCUSDT', 'BUY', 0.001)) == [MAX_ORDERS_PER_SECOND]
+
+
+def test_daily_loss_trips_the_kill_switch(marked):
+    marked.risk.limits = limits(max_daily_loss=10)
+    marked.place_market_order('BTCUSDT', 'BUY', 0.01)
+    # Unrealized loss of 0.01 * 2000 = 20 USDT
+    marked.position_book.on_mark_price('BTCUSDT', 48000.0)
+
+    assert rejected_by(lambda: marked.place_market_order('BTCUSDT', 'BUY', 0.001)) == [DAILY_LOSS_LIMIT]
+    assert marked.risk.snapshot()['killSwitch']
+    marked.place_market_order('BTCUSDT', 'SELL', 0.005)
+
+
+def test_kill_switch_allows_only_reduce_only_orders(marked, fake):
+    marked.place_market_order('BTCUSDT', 'BUY', 0.002)
+    marked.risk.trip('test')
+
+    assert rejected_by(lambda: marked.place_market_order('BTCUSDT', 'BUY', 0.001)) == [KILL_SWITCH]
+    # Selling more than the position would flip it short: not reduce-only
+    assert rejected_by(lambda: marked.place_market_order('BTCUSDT', 'SELL', 0.003)) == [KILL_SWITCH]
+    marked.place_market_order('BTCUSDT', 'SELL', 0.001)
+    marked.place_market_order('BTCUSDT', 'SELL', 0.001)
+    assert rejected_by(lambda: marked.place_market_order('BTCUSDT', 'SELL', 0.001)) == [KILL_SWITCH]
+
+    marked.risk.reset()
+    marked.place_market_order('BTCUSDT', 'BUY', 0.001)
+
+
+def test_unpriced_order_is_rejected_when_a_price_is_required(bot, fake, monkeypatch):
+    monkeypatch.setattr(bot.risk, 'price_source', lambda symbol: None)
+    bot.risk.limits = limits(max_order_notional=100, require_reference_price=True)
+    assert rejected_by(lambda: bot.place_market_order('BTCUSDT', 'BUY', 0.001)) == [NO_REFERENCE_PRICE]
+    assert not fake.orders
+
+
+def test_resubmitted_id_is_deduped_before_risk(marked, fake):
+    marked.risk.limits = limits(max_orders_per_second=1)
+    first = marked.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-risk')
+    marked.risk.trip('test')
+
+    # Neither the kill switch nor the spent rate slot applies to an order that already exists
+    again = marked.place_market_order('BTCUSDT', 'BUY', 0.001, client_order_id='cid-risk')
+
+    assert again['orderId'] == first['orderId']
+    assert len(fake.orders) == 1
+    assert marked.risk.rejections == 0
+
+
+def fallbacks():
+    return {labels[0]: cell['value'] for labels, cell in REGISTRY.snapshot('bot_risk_price_fallbacks_total').items()}
+
+
+def test_missing_mark_is_fetched_off_the_order_path(bot, fake):
+    gate = threading.Event()
+    mark_price = fake.futures_mark_price
+    fake.futures_mark_price = lambda **params: (gate.wait(5), mark_price(**params))[1]
+    before = fallbacks()
+
+    # The mark request is stuck; the order does not wait for it
+    bot.place_market_order('BTCUSDT', 'BUY', 0.001)
+    assert 'BTCUSDT' not in bot.position_book.marks
+    assert fallbacks().get('none', 0) == before.get('none', 0) + 1
+
+    gate.set()
+    deadline = time.time() + 5
+    while 'BTCUSDT' not in bot.position_book.marks and time.time() < deadline:
+        time.sleep(0.005)
+    assert bot.position_book.marks['BTCUSDT'][0] == 50000.0
+
+
+def test_stale_mark_is_used_and_counted(bot, fake):
+    bot.position_book.marks['BTCUSDT'] = (49000.0, time.time() - 60)
+    bot.risk.limits = limits(max_order_notional=45)
+    before = fallbacks()
+
+    # Priced at the stale 49000: 0.001 BTC is 49 USDT
+    assert rejected_by(lambda: bot.place_market_order('BTCUSDT', 'BUY', 0.001)) == [MAX_ORDER_NOTIONAL]
+    assert fallbacks().get('stale_mark', 0) == before.get('stale_mark', 0) + 1
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from async_bot import AsyncBasicBot
+from fake_exchange import AsyncFakeFuturesClient
+from risk_engine import RiskLimits
+from twap_engine import TwapEngine, COMPLETED
+
+
+def sent_quantities(fake):
+    return [float(order['origQty']) for order in fake.orders.values()]
+
+
+def test_rounding_residue_is_carried_into_later_slices(bot, fake):
+    summary = bot.execute_twap('BTCUSDT', 'BUY', 0.003, duration_minutes=0, num_orders=2)
+
+    assert sent_quantities(fake) == [0.001, 0.002]
+    assert summary['residue'] == 0.0
+
+
+def test_residue_below_one_step_is_reported(bot, fake):
+    summary = bot.execute_twap('BTCUSDT', 'BUY', 0.0035, duration_minutes=0, num_orders=3)
+
+    assert sent_quantities(fake) == [0.001, 0.001, 0.001]
+    assert summary['residue'] == pytest.approx(0.0005)
+
+
+def test_engine_slices_carry_the_residue(bot, fake):
+    engine = TwapEngine(bot)
+    try:
+        job = engine.submit('BTCUSDT', 'SELL', 0.005, duration_minutes=0, num_orders=3)
+        deadline = time.time() + 5
+        while not job.done and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        engine.shutdown()
+
+    assert job.status == COMPLETED
+    assert sent_quantities(fake) == [0.001, 0.002, 0.002]
+    assert job.executed_quantity == pytest.approx(0.005)
+    assert job.to_dict()['residue'] == 0.0
+
+
+def test_async_twap_carries_the_residue(fake):
+    async def run():
+        bot = await AsyncBasicBot.create('test', 'test', testnet=True, client=AsyncFakeFuturesClient(fake))
+        bot.risk.limits = RiskLimits.unlimited()
+        try:
+            return await bot.execute_twap('BTCUSDT', 'BUY', 0.003, duration_minutes=0, num_orders=2)
+        finally:
+            await bot.close()
+
+    summary = asyncio.run(run())
+
+    assert sent_quantities(fake) == [0.001, 0.002]
+    assert summary['residue'] == 0.0
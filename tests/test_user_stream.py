@@ -0,0 +1,163 @@
+import threading
+import time
+
+import pytest
+
+import user_stream
+from user_stream import UserDataStream
+
+
+@pytest.fixture
+def stream(fake, monkeypatch):
+    monkeypatch.setattr(user_stream, 'BALANCE_REFRESH_DEBOUNCE_SECONDS', 0.0)
+    stream = UserDataStream(fake, 'test', 'test')
+    stream._running = True
+    stream._sync(stream._generation)
+    yield stream
+    stream.stop()
+
+
+def now_ms(offset=0):
+    return int(time.time() * 1000) + offset
+
+
+def account_update(asset, wallet, event_time):
+    return {'e': 'ACCOUNT_UPDATE', 'E': event_time, 'a': {'B': [{'a': asset, 'wb': wallet, 'cw': wallet}]}}
+
+
+def order_update(order_id, status, event_time):
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': event_time,
+            'o': {'s': 'BTCUSDT', 'i': order_id, 'c': f'cid-{order_id}', 'X': status, 'T': event_time}}
+
+
+def usdt(stream):
+    return next(b for b in stream.get_balances() if b['asset'] == 'USDT')
+
+
+def test_account_update_moves_wallet_but_not_available_balance(stream):
+    stream._handle_message(account_update('USDT', '9990.0', now_ms(1000)))
+
+    balance = usdt(stream)
+    assert balance['balance'] == '9990.0'
+    assert balance['crossWalletBalance'] == '9990.0'
+    assert balance['availableBalance'] == '10000.00000000'
+    assert stream._balances_stale.is_set()
+
+
+def test_refresh_takes_available_balance_without_rolling_back_a_newer_wallet(stream, fake):
+    stream._handle_message(account_update('USDT', '9990.0', now_ms(60_000)))
+    fake.futures_account_balance = lambda: [{'asset': 'USDT', 'balance': '9995.0', 'crossWalletBalance': '9995.0',
+                                             'availableBalance': '9000.0', 'updateTime': now_ms()}]
+
+    stream.refresh_balances()
+
+    balance = usdt(stream)
+    assert balance['availableBalance'] == '9000.0'
+    assert balance['balance'] == '9990.0'
+
+
+def test_new_asset_waits_for_rest(stream):
+    stream._handle_message(account_update('BNB', '1.5', now_ms(1000)))
+    assert [b['asset'] for b in stream.get_balances()] == ['USDT']
+
+
+def test_order_event_triggers_a_debounced_refresh(stream, fake):
+    refreshed = threading.Event()
+    balances = fake.futures_account_balance
+    fake.futures_account_balance = lambda **params: (refreshed.set(), balances(**params))[1]
+    threading.Thread(target=stream._balance_loop, daemon=True).start()
+
+    stream._handle_message(order_update(1, 'FILLED', now_ms()))
+
+    assert refreshed.wait(2)
+
+
+class StubManager:
+    def __init__(self):
+        self.callback = None
+        self.stopped = False
+
+    def start(self):
+        pass
+
+    def start_futures_user_socket(self, callback):
+        self.callback = callback
+
+    def stop(self):
+        self.stopped = True
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def connecting(fake, monkeypatch):
+    monkeypatch.setattr(user_stream, 'BALANCE_REFRESH_DEBOUNCE_SECONDS', 0.0)
+    stream = UserDataStream(fake, 'test', 'test')
+    manager = StubManager()
+    stream._new_manager = lambda: manager
+    stream._running = True
+    stream._connect()
+    yield stream, manager
+    stream.stop()
+
+
+def test_not_ready_until_the_socket_connects_and_the_snapshot_loads(connecting):
+    stream, manager = connecting
+    assert manager.callback is not None
+    assert not stream.ready
+
+    stream._on_socket_connected()
+
+    assert wait_until(lambda: stream.ready)
+    assert usdt(stream)['availableBalance'] == '10000.00000000'
+
+
+def test_events_during_the_snapshot_are_buffered_then_replayed(connecting, fake):
+    stream, manager = connecting
+    release = threading.Event()
+    open_orders = fake.futures_get_open_orders
+    fake.futures_get_open_orders = lambda **params: (release.wait(2), open_orders(**params))[1]
+
+    stream._on_socket_connected()
+    # The socket callback must not block on the REST snapshot
+    manager.callback(order_update(7, 'NEW', now_ms()))
+    manager.callback(account_update('USDT', '9990.0', now_ms(60_000)))
+    assert stream.get_order(7) is None
+    assert not stream.ready
+
+    release.set()
+
+    assert wait_until(lambda: stream.ready)
+    assert stream.get_order(7)['status'] == 'NEW'
+    assert usdt(stream)['balance'] == '9990.0'
+
+
+def test_reconnect_drops_ready_until_resynced(stream, fake):
+    release = threading.Event()
+    balances = fake.futures_account_balance
+    fake.futures_account_balance = lambda **params: (release.wait(2), balances(**params))[1]
+
+    stream._on_socket_connected()
+    assert not stream.ready
+    stream._handle_message(order_update(8, 'NEW', now_ms()))
+    release.set()
+
+    assert wait_until(lambda: stream.ready)
+    assert stream.get_order(8)['status'] == 'NEW'
+
+
+def test_superseded_sync_does_not_mark_ready(stream):
+    generation = stream._generation
+    stream._running = False
+    stream._schedule_restart()
+
+    stream._sync(generation)
+
+    assert not stream.ready
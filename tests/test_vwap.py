@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from risk_engine import RiskRejected
+from twap_engine import TwapEngine, FAILED
+from vwap import VolumeProfile
+
+
+@pytest.fixture
+def engine(bot):
+    engine = TwapEngine(bot)
+    yield engine
+    engine.shutdown()
+
+
+def wait_done(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_kill_switch_fails_blocking_vwap(bot, fake):
+    bot.risk.trip('test')
+    with pytest.raises(RiskRejected):
+        bot.execute_vwap('BTCUSDT', 'BUY', 0.01, 0, 3, limit_offset_ticks=None, profile=VolumeProfile.flat())
+    assert not fake.orders
+
+
+def test_kill_switch_fails_vwap_job(bot, fake, engine):
+    bot.load_volume_profile = lambda symbol: VolumeProfile.flat()
+    bot.risk.trip('test')
+    job = wait_done(engine.submit_vwap('BTCUSDT', 'BUY', 0.01, 0, 3, limit_offset_ticks=None))
+    assert job.status == FAILED
+    assert 'Kill switch' in job.error
+    assert job.executed_quantity == 0
+    assert not fake.orders
+
+
+def test_blocking_vwap_rests_then_sends_remainder_at_market(bot, fake):
+    summary = bot.execute_vwap('BTCUSDT', 'BUY', 0.01, 0, 2, limit_offset_ticks=0, profile=VolumeProfile.flat())
+    assert summary['executed_quantity'] == pytest.approx(0.01)
+    types = sorted((o['type'], o['status']) for o in fake.orders.values())
+    assert types == [('LIMIT', 'CANCELED')] * 2 + [('MARKET', 'FILLED')] * 2
+    # The fake has no streams, so the book is a polled snapshot and no websocket is opened
+    assert bot.order_books.streaming is False
+    assert bot.order_books._manager is None
+
+
+def test_resting_child_does_not_hold_a_worker(bot, fake):
+    engine = TwapEngine(bot, max_workers=1)
+    try:
+        bot.load_volume_profile = lambda symbol: VolumeProfile.flat()
+        start_vwap = bot.start_vwap
+
+        def start_now(plan, **options):
+            # Jitter can put the first send anywhere in its window; send it straight away
+            run = start_vwap(plan, **options)
+            run.schedule[0] = (run.start,) + tuple(run.schedule[0][1:])
+            return run
+
+        bot.start_vwap = start_now
+        vwap = engine.submit_vwap('BTCUSDT', 'BUY', 0.01, 1, 2, limit_offset_ticks=0)
+        deadline = time.time() + 5
+        while not (vwap.run is not None and vwap.run.working is not None) and time.time() < deadline:
+            time.sleep(0.01)
+        child = vwap.run.working['order']
+
+        # The passive child rests for ~15s; the single worker is still free for other jobs
+        twap = wait_done(engine.submit('BTCUSDT', 'SELL', 0.002, 0, 2))
+        assert twap.status == 'COMPLETED'
+
+        fake.set_price('BTCUSDT', float(child['price']) - 10)
+        assert engine.cancel(vwap.job_id)
+        deadline = time.time() + 5
+        while not vwap.executed_quantity and time.time() < deadline:
+            time.sleep(0.01)
+        assert fake.orders[child['orderId']]['status'] == 'FILLED'
+        assert vwap.executed_quantity == pytest.approx(float(child['origQty']))
+        assert len(fake.orders) == 3
+    finally:
+        engine.shutdown()
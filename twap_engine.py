@@ -0,0 +1,446 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable
+
+
+PENDING = 'PENDING'
+RUNNING = 'RUNNING'
+COMPLETED = 'COMPLETED'
+CANCELLED = 'CANCELLED'
+FAILED = 'FAILED'
+
+TERMINAL_STATES = (COMPLETED, CANCELLED, FAILED)
+
+
+class TwapJob:
+
+    strategy = 'TWAP'
+
+    def __init__(self, job_id: str, plan: Dict[str, Any]):
+        self.job_id = job_id
+        self.symbol = plan['symbol']
+        self.side = plan['side']
+        self.total_quantity = plan['total_quantity']
+        self.num_orders = plan['num_orders']
+        self.quantity_per_order = plan['quantity_per_order']
+        # Jobs journaled before per-slice rounding only have the even share
+        self.slice_quantities = plan.get('slice_quantities') or [self.quantity_per_order] * self.num_orders
+        self.residue = plan.get('residue', 0.0)
+        self.interval_seconds = plan['interval_seconds']
+
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.slices: List[Dict[str, Any]] = []
+        self.next_index = 0
+        self.executed_quantity = 0.0
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def to_dict(self, include_slices: bool = True) -> Dict[str, Any]:
+        result = {
+            'job_id': self.job_id,
+            'strategy': self.strategy,
+            'symbol': self.symbol,
+            'side': self.side,
+            'status': self.status,
+            'total_quantity': self.total_quantity,
+            'executed_quantity': self.executed_quantity,
+            'residue': self.residue,
+            'total_orders': self.num_orders,
+            'successful_orders': self.next_index,
+            'progress': round(100.0 * self.next_index / self.num_orders, 2),
+            'interval_seconds': self.interval_seconds,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+        if include_slices:
+            result['slices'] = list(self.slices)
+        return result
+
+    def state(self) -> Dict[str, Any]:
+        """What the order journal keeps to resume this job after a restart."""
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'plan': {
+                'symbol': self.symbol,
+                'side': self.side,
+                'total_quantity': self.total_quantity,
+                'num_orders': self.num_orders,
+                'quantity_per_order': self.quantity_per_order,
+                'slice_quantities': self.slice_quantities,
+                'residue': self.residue,
+                'interval_seconds': self.interval_seconds,
+            },
+            'next_index': self.next_index,
+            'executed_quantity': self.executed_quantity,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'TwapJob':
+        job = cls(state['job_id'], state['plan'])
+        job.status = state['status']
+        job.next_index = state['next_index']
+        job.executed_quantity = state['executed_quantity']
+        job.created_at = state['created_at']
+        job.started_at = state['started_at']
+        job.finished_at = state.get('finished_at')
+        job.error = state.get('error')
+        return job
+
+
+class VwapJob:
+    """A VWAP execution run slice by slice on the engine's scheduler.
+
+    The bot's ``VwapRun`` holds the schedule, fills and carried quantity. It is
+    built on the first due slice because loading the volume profile is slow.
+    VWAP jobs are not journaled: they are kept in memory only and do not resume
+    after a restart.
+    """
+
+    strategy = 'VWAP'
+
+    def __init__(self, job_id: str, plan: Dict[str, Any], options: Dict[str, Any]):
+        self.job_id = job_id
+        self.plan = plan
+        self.options = options
+        self.symbol = plan['symbol']
+        self.side = plan['side']
+        self.total_quantity = plan['total_quantity']
+        self.num_orders = plan['num_orders']
+
+        self.run = None
+        self.summary: Optional[Dict[str, Any]] = None
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.slices: List[Dict[str, Any]] = []
+        self.next_index = 0
+        self.executed_quantity = 0.0
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def to_dict(self, include_slices: bool = True) -> Dict[str, Any]:
+        result = {
+            'job_id': self.job_id,
+            'strategy': self.strategy,
+            'symbol': self.symbol,
+            'side': self.side,
+            'status': self.status,
+            'total_quantity': self.total_quantity,
+            'executed_quantity': self.executed_quantity,
+            'total_orders': self.num_orders,
+            'successful_orders': len({s['index'] for s in self.slices}),
+            'progress': round(100.0 * self.next_index / self.num_orders, 2),
+            'profile': self.run.profile.source if self.run is not None else None,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+        if self.summary is not None:
+            result['summary'] = {k: v for k, v in self.summary.items() if k != 'orders'}
+        if include_slices:
+            result['slices'] = list(self.slices)
+        return result
+
+
+class TwapEngine:
+    """Runs TWAP and VWAP jobs in the background so callers get a job id immediately.
+
+    A single scheduler thread keeps a heap of (due time, job) entries and hands
+    due slices to a small worker pool, so many concurrent jobs do not each hold
+    a sleeping thread. Job progress is written to the bot's order journal, and
+    ``resume`` picks running TWAP jobs back up after a restart.
+    """
+
+    def __init__(self, bot, max_workers: int = 8, max_finished_jobs: int = 500):
+        self.bot = bot
+        self.max_finished_jobs = max_finished_jobs
+        self.logger = logging.getLogger('BasicBot.TwapEngine')
+
+        self._jobs: Dict[str, TwapJob] = {}
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='twap-slice')
+        self._scheduler: Optional[threading.Thread] = None
+        self._running = True
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Call ``callback('twap', job_dict)`` whenever a job starts, progresses or finishes."""
+        self._listeners.append(callback)
+
+    def _persist(self, job: TwapJob):
+        journal = getattr(self.bot, 'journal', None)
+        if journal is None or isinstance(job, VwapJob):
+            return
+        try:
+            journal.record_twap(job.state())
+        except Exception as e:
+            self.logger.error(f"Could not journal TWAP job {job.job_id}: {e}")
+
+    def resume(self) -> List[TwapJob]:
+        """Reschedule every job the journal still has as RUNNING.
+
+        Slices keep their original grid; any that came due while the process was
+        down go out immediately. Each slice's client order id is derived from
+        the job id and index, so a slice that was in flight at the crash is not
+        placed twice.
+        """
+        journal = getattr(self.bot, 'journal', None)
+        if journal is None:
+            return []
+        resumed = []
+        now = time.time()
+        with self._cond:
+            for state in journal.twap_jobs(status=RUNNING):
+                if state['job_id'] in self._jobs:
+                    continue
+                job = TwapJob.from_state(state)
+                self._ensure_scheduler()
+                self._jobs[job.job_id] = job
+                self._schedule(job, max(now, job.started_at + job.next_index * job.interval_seconds))
+                resumed.append(job)
+        for job in resumed:
+            self.logger.info(f"TWAP job {job.job_id} resumed at order {job.next_index + 1}/{job.num_orders}")
+            self._notify(job)
+        return resumed
+
+    def _notify(self, job: TwapJob):
+        self._persist(job)
+        if not self._listeners:
+            return
+        data = job.to_dict(include_slices=False)
+        for callback in self._listeners:
+            try:
+                callback('twap', data)
+            except Exception as e:
+                self.logger.error(f"TWAP listener failed: {e}")
+
+    def submit(self, symbol: str, side: str, total_quantity: float,
+               duration_minutes: int, num_orders: int = 10) -> TwapJob:
+        plan = self.bot._plan_twap(symbol, side, total_quantity, duration_minutes, num_orders)
+        job = TwapJob(uuid.uuid4().hex, plan)
+
+        with self._cond:
+            self._ensure_scheduler()
+            self._prune_finished()
+            self._jobs[job.job_id] = job
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._schedule(job, job.started_at)
+
+        self.logger.info(
+            f"TWAP job {job.job_id} submitted: {job.side} {job.total_quantity} {job.symbol} "
+            f"in {job.num_orders} orders every {job.interval_seconds:.2f}s"
+        )
+        self._notify(job)
+        return job
+
+    def submit_vwap(self, symbol: str, side: str, total_quantity: float, duration_minutes: int,
+                    num_orders: int = 10, participation_cap: float = 0.1,
+                    limit_offset_ticks: Optional[int] = 0, limit_wait_fraction: float = 0.5) -> VwapJob:
+        """Run ``bot.execute_vwap`` in the background; each slice is a scheduled entry like a TWAP slice."""
+        if not hasattr(self.bot, 'start_vwap'):
+            raise ValueError("VWAP needs the threaded bot; it is not available with BOT_ASYNC_CLIENT=1")
+        plan = self.bot._plan_vwap(symbol, side, total_quantity, duration_minutes, num_orders,
+                                   participation_cap, limit_wait_fraction)
+        job = VwapJob(uuid.uuid4().hex, plan, {
+            'participation_cap': participation_cap,
+            'limit_offset_ticks': limit_offset_ticks,
+            'limit_wait_fraction': limit_wait_fraction,
+        })
+
+        with self._cond:
+            self._ensure_scheduler()
+            self._prune_finished()
+            self._jobs[job.job_id] = job
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._schedule(job, job.started_at)
+
+        self.logger.info(
+            f"VWAP job {job.job_id} submitted: {job.side} {job.total_quantity} {job.symbol} "
+            f"in {job.num_orders} orders over {duration_minutes}min"
+        )
+        self._notify(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[TwapJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[TwapJob]:
+        return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> bool:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            self._cond.notify()
+            if isinstance(job, VwapJob) and job.run is not None and job.run.working is not None:
+                self._executor.submit(self._cancel_vwap_child, job)
+
+        self.logger.info(f"{job.strategy} job {job_id} cancelled after {job.next_index}/{job.num_orders} orders")
+        self._notify(job)
+        return True
+
+    def shutdown(self, wait: bool = False):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._executor.shutdown(wait=wait)
+
+    def _ensure_scheduler(self):
+        if self._scheduler is None or not self._scheduler.is_alive():
+            self._scheduler = threading.Thread(target=self._run, name='twap-scheduler', daemon=True)
+            self._scheduler.start()
+
+    def _schedule(self, job: TwapJob, due: float):
+        heapq.heappush(self._heap, (due, next(self._seq), job.job_id))
+        self._cond.notify()
+
+    def _prune_finished(self):
+        finished = [j for j in self._jobs.values() if j.done]
+        if len(finished) <= self.max_finished_jobs:
+            return
+        finished.sort(key=lambda j: j.finished_at or j.created_at)
+        for job in finished[:len(finished) - self.max_finished_jobs]:
+            del self._jobs[job.job_id]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, _, job_id = self._heap[0]
+                    delay = due - time.time()
+                    if delay > 0:
+                        self._cond.wait(timeout=delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    job = self._jobs.get(job_id)
+                    if job is not None and not job.done:
+                        break
+                else:
+                    return
+
+            self._executor.submit(self._execute_slice, job)
+
+    def _fail(self, job, index: int, error: Exception):
+        with self._cond:
+            if not job.done:
+                job.status = FAILED
+                job.error = str(error)
+                job.finished_at = time.time()
+        self.logger.error(f"{job.strategy} job {job.job_id} FAILED on order {index + 1}: {error}")
+        self._notify(job)
+
+    def _execute_slice(self, job: TwapJob):
+        if isinstance(job, VwapJob):
+            self._execute_vwap_slice(job)
+            return
+        index = job.next_index
+        self.logger.info(f"TWAP job {job.job_id} order {index + 1}/{job.num_orders}")
+
+        try:
+            # Same id for the same slice, so a retried or resumed slice can never fill twice
+            client_order_id = self.bot.client_order_ids.derive(f"twap:{job.job_id}:{index}")
+            order = self.bot.place_market_order(job.symbol, job.side, job.slice_quantities[index],
+                                                client_order_id=client_order_id)
+        except Exception as e:
+            self._fail(job, index, e)
+            return
+
+        with self._cond:
+            job.slices.append({
+                'index': index,
+                'timestamp': time.time(),
+                'order': order,
+            })
+            job.executed_quantity += float(order.get('executedQty') or 0)
+            job.next_index = index + 1
+
+            if not job.done:
+                if job.next_index >= job.num_orders:
+                    job.status = COMPLETED
+                    job.finished_at = time.time()
+                    self.logger.info(f"TWAP job {job.job_id} COMPLETED")
+                else:
+                    # Keep slices on a fixed grid from the start time so slow fills do not drift the schedule
+                    self._schedule(job, job.started_at + job.next_index * job.interval_seconds)
+
+        self._notify(job)
+
+    def _execute_vwap_slice(self, job: VwapJob):
+        index = job.next_index
+        try:
+            if job.run is None:
+                job.run = self.bot.start_vwap(job.plan, **job.options)
+                fills, summary = [], None
+            else:
+                fills = self.bot.run_vwap_step(job.run)
+                summary = self.bot.finish_vwap(job.run) if job.run.done else None
+        except Exception as e:
+            self._fail(job, index, e)
+            return
+
+        with self._cond:
+            now = time.time()
+            job.slices.extend({'index': fill['slice'], 'timestamp': now, 'order': fill['order'],
+                               'passive': fill['passive']} for fill in fills)
+            job.executed_quantity = job.run.executed
+            job.next_index = job.run.index
+            if job.status == CANCELLED and job.run.working is not None:
+                # Cancelled while this step was placing a passive child
+                self._executor.submit(self._cancel_vwap_child, job)
+
+            if not job.done:
+                if summary is not None:
+                    job.summary = summary
+                    job.status = COMPLETED
+                    job.finished_at = now
+                    self.logger.info(f"VWAP job {job.job_id} COMPLETED")
+                else:
+                    # The run's own jittered send times, or the resting child's deadline
+                    self._schedule(job, job.run.next_due_time())
+
+        self._notify(job)
+
+    def _cancel_vwap_child(self, job: VwapJob):
+        try:
+            # Take the resting child off the book; the cancelled job sends nothing more
+            self.bot.settle_vwap_child(job.run, send_remainder=False)
+        except Exception as e:
+            self.logger.error(f"VWAP job {job.job_id} could not cancel its resting order: {e}")
+            return
+        with self._cond:
+            job.executed_quantity = job.run.executed
@@ -0,0 +1,403 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable
+
+from lazy_imports import lazy_import
+
+
+binance = lazy_import('binance')
+
+OPEN_STATUSES = ('NEW', 'PARTIALLY_FILLED')
+
+# ORDER_TRADE_UPDATE field: REST order field
+ORDER_EVENT_FIELDS = {
+    's': 'symbol',
+    'c': 'clientOrderId',
+    'S': 'side',
+    'o': 'type',
+    'f': 'timeInForce',
+    'q': 'origQty',
+    'p': 'price',
+    'ap': 'avgPrice',
+    'sp': 'stopPrice',
+    'X': 'status',
+    'i': 'orderId',
+    'z': 'executedQty',
+    'l': 'lastFilledQty',
+    'L': 'lastFilledPrice',
+    'R': 'reduceOnly',
+    'ps': 'positionSide',
+    'ot': 'origType',
+    'T': 'updateTime',
+}
+
+# ALGO_UPDATE field: algo order REST field (conditional orders such as STOP)
+ALGO_EVENT_FIELDS = {
+    's': 'symbol',
+    'caid': 'clientAlgoId',
+    'aid': 'algoId',
+    'S': 'side',
+    'o': 'orderType',
+    'q': 'quantity',
+    'p': 'price',
+    'tp': 'triggerPrice',
+    'X': 'algoStatus',
+    'ai': 'actualOrderId',
+}
+
+RECONNECT_MIN_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 60.0
+# ACCOUNT_UPDATE carries no availableBalance, so it is refetched over REST after order or
+# balance events (one request per burst) and on this interval
+BALANCE_REFRESH_SECONDS = 30.0
+BALANCE_REFRESH_DEBOUNCE_SECONDS = 0.5
+# Events held while the snapshot loads before we give up and reconnect
+MAX_BUFFERED_EVENTS = 5000
+
+_manager_class = None
+
+
+def _connection_reporting_manager():
+    """ThreadedWebsocketManager that calls ``on_connect()`` each time a socket connects or reconnects.
+
+    python-binance has no connection callback, and a quiet user-data socket sends
+    nothing at all, so the first message cannot be waited for. Built on first use
+    to keep python-binance off the import path.
+    """
+    global _manager_class
+    if _manager_class is None:
+        class ConnectionReportingManager(binance.ThreadedWebsocketManager):
+
+            def __init__(self, on_connect: Callable[[], None], **kwargs):
+                super().__init__(**kwargs)
+                self.on_connect = on_connect
+
+            async def start_listener(self, socket, path: str, callback):
+                connect = socket.connect
+
+                async def connect_and_report():
+                    await connect()
+                    self.on_connect()
+
+                socket.connect = connect_and_report
+                await super().start_listener(socket, path, callback)
+
+        _manager_class = ConnectionReportingManager
+    return _manager_class
+
+
+class UserDataStream:
+    """Order and balance book kept current by the futures user-data stream.
+
+    A REST snapshot of open orders and balances seeds the book, then
+    ORDER_TRADE_UPDATE and ACCOUNT_UPDATE events keep it current; the stream has
+    no available balance, so that field is refetched over REST after order and
+    balance events and every ``BALANCE_REFRESH_SECONDS``. python-binance
+    creates and keeps the listen key alive. Each time the socket connects the
+    book is re-seeded, with events that arrive meanwhile buffered and replayed on
+    top of the snapshot; ``ready`` is only set once that is done. When the socket
+    gives up or the key expires the stream is restarted with backoff, so nothing
+    missed while disconnected survives as stale state.
+
+    Reads only take a lock and copy a dict; callers should fall back to REST
+    while ``ready`` is False.
+    """
+
+    def __init__(self, client, api_key: str, api_secret: str, testnet: bool = True,
+                 max_orders: int = 5000):
+        self.client = client
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self.max_orders = max_orders
+        self.logger = logging.getLogger('BasicBot.UserStream')
+
+        self.orders: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self.balances: Dict[str, Dict[str, Any]] = {}
+        self.events = 0
+        self.reconnects = 0
+        self.last_event_at: Optional[float] = None
+
+        self._ready = False
+        self._running = False
+        self._manager = None
+        self._restart_timer: Optional[threading.Timer] = None
+        self._balances_stale = threading.Event()
+        # Events received while a snapshot loads; None once the book is synced
+        self._buffer: Optional[List[Dict[str, Any]]] = []
+        # Bumped on every (re)connect and restart so a superseded sync never marks the stream ready
+        self._generation = 0
+        self._backoff = RECONNECT_MIN_SECONDS
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Call ``callback('order', order)``, ``callback('algo', algo_order)`` and
+        ``callback('balance', balances)`` after each update."""
+        self._listeners.append(callback)
+
+    def _notify(self, event: str, data: Any):
+        for callback in self._listeners:
+            try:
+                callback(event, data)
+            except Exception as e:
+                self.logger.error(f"User stream listener failed: {e}")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def start(self):
+        """Seed the book and open the socket on a background thread."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._connect, name='user-stream-connect', daemon=True).start()
+        threading.Thread(target=self._balance_loop, name='user-stream-balances', daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._ready = False
+            timer, self._restart_timer = self._restart_timer, None
+            manager, self._manager = self._manager, None
+        # Wakes the balance loop so it sees the stream is stopped
+        self._balances_stale.set()
+        if timer is not None:
+            timer.cancel()
+        if manager is not None:
+            manager.stop()
+
+    def _new_manager(self):
+        return _connection_reporting_manager()(
+            self._on_socket_connected, api_key=self.api_key, api_secret=self.api_secret, testnet=self.testnet
+        )
+
+    def _connect(self):
+        if not self._running:
+            return
+        try:
+            with self._lock:
+                self._buffer = []
+            manager = self._new_manager()
+            with self._lock:
+                self._manager = manager
+            manager.start()
+            manager.start_futures_user_socket(callback=self._handle_message)
+        except Exception as e:
+            self.logger.error(f"Failed to start user data stream: {e}")
+            self._schedule_restart()
+
+    def _on_socket_connected(self):
+        # Called on the socket's event loop: seed the book on a thread so the loop keeps reading
+        with self._lock:
+            self._ready = False
+            self._buffer = self._buffer if self._buffer is not None else []
+            self._generation += 1
+            generation = self._generation
+        threading.Thread(target=self._sync, args=(generation,), name='user-stream-sync', daemon=True).start()
+
+    def _sync(self, generation: int):
+        """Seed the book from REST, then replay the events that arrived while it loaded."""
+        replayed = 0
+        try:
+            # Older REST rows never overwrite newer stream updates (see _upsert_order)
+            self._load_snapshot()
+            while True:
+                with self._lock:
+                    if generation != self._generation:
+                        return
+                    buffered, self._buffer = self._buffer or [], []
+                    if not buffered:
+                        # Live events apply directly from here on
+                        self._buffer = None
+                        self._ready = True
+                        break
+                for msg in buffered:
+                    self._apply(msg)
+                replayed += len(buffered)
+        except Exception as e:
+            self.logger.error(f"User data stream snapshot failed: {e}")
+            self._schedule_restart()
+            return
+        self._backoff = RECONNECT_MIN_SECONDS
+        self.logger.info(f"User data stream connected; {replayed} buffered events replayed")
+
+    def _load_snapshot(self):
+        balances = self.client.futures_account_balance()
+        open_orders = self.client.futures_get_open_orders()
+        open_ids = {int(o['orderId']) for o in open_orders}
+        with self._lock:
+            self.balances = {b['asset']: dict(b) for b in balances}
+            # Orders we last saw open but the exchange no longer lists changed while we
+            # were disconnected; drop them so reads go back to REST for their final state
+            for order_id in [i for i, o in self.orders.items()
+                             if o.get('status') in OPEN_STATUSES and i not in open_ids]:
+                del self.orders[order_id]
+        for order in open_orders:
+            self._upsert_order(order)
+
+    def _balance_loop(self):
+        while True:
+            stale = self._balances_stale.wait(BALANCE_REFRESH_SECONDS)
+            if not self._running:
+                return
+            if stale:
+                # Let a burst of fills settle into one request
+                time.sleep(BALANCE_REFRESH_DEBOUNCE_SECONDS)
+            self._balances_stale.clear()
+            if self._ready:
+                self.refresh_balances()
+
+    def refresh_balances(self) -> List[Dict[str, Any]]:
+        """Refetch balances over REST; the only source of availableBalance."""
+        try:
+            balances = self.client.futures_account_balance()
+        except Exception as e:
+            self.logger.warning(f"Balance refresh failed: {e}")
+            return []
+        changed = []
+        with self._lock:
+            for row in balances:
+                current = self.balances.get(row['asset'])
+                if current is not None and current.get('updateTime', 0) > row.get('updateTime', 0):
+                    # The stream has a newer wallet balance; only the available balance is news
+                    current['availableBalance'] = row['availableBalance']
+                else:
+                    current = self.balances[row['asset']] = dict(row)
+                changed.append(dict(current))
+        if changed:
+            self._notify('balance', changed)
+        return changed
+
+    def _schedule_restart(self):
+        with self._lock:
+            self._ready = False
+            self._buffer = []
+            self._generation += 1
+            if not self._running or self._restart_timer is not None:
+                return
+            manager, self._manager = self._manager, None
+            delay, self._backoff = self._backoff, min(self._backoff * 2, RECONNECT_MAX_SECONDS)
+            self.reconnects += 1
+            self._restart_timer = threading.Timer(delay, self._restart)
+            self._restart_timer.daemon = True
+            self._restart_timer.start()
+        if manager is not None:
+            try:
+                manager.stop()
+            except Exception:
+                pass
+        self.logger.warning(f"User data stream down; reconnecting in {delay:.0f}s")
+
+    def _restart(self):
+        with self._lock:
+            self._restart_timer = None
+        self._connect()
+
+    def _handle_message(self, msg: Dict[str, Any]):
+        event = msg.get('e')
+        if event == 'error':
+            self.logger.error(f"User data stream error: {msg.get('type')}: {msg.get('m')}")
+            self._schedule_restart()
+            return
+
+        self.events += 1
+        self.last_event_at = time.monotonic()
+        with self._lock:
+            buffer = self._buffer
+            if buffer is not None and len(buffer) < MAX_BUFFERED_EVENTS:
+                buffer.append(msg)
+                return
+        if buffer is not None:
+            self.logger.error("User data stream buffer overflowed while loading the snapshot")
+            self._schedule_restart()
+            return
+        self._apply(msg)
+
+    def _apply(self, msg: Dict[str, Any]):
+        event = msg.get('e')
+        if event == 'ORDER_TRADE_UPDATE':
+            # New, filled and cancelled orders all move the margin in use
+            self._balances_stale.set()
+            order = self._upsert_order(self._order_from_event(msg['o']))
+            if order is not None:
+                self._notify('order', order)
+        elif event == 'ALGO_UPDATE':
+            # Conditional orders are not kept in the book; listeners get the status change
+            algo_order = {field: msg['o'][key] for key, field in ALGO_EVENT_FIELDS.items() if key in msg['o']}
+            algo_order['updateTime'] = msg.get('T') or msg.get('E')
+            self._notify('algo', algo_order)
+        elif event == 'ACCOUNT_UPDATE':
+            self._balances_stale.set()
+            balances = self._apply_balances(msg.get('a', {}).get('B', []), msg.get('E'))
+            if balances:
+                self._notify('balance', balances)
+        elif event == 'listenKeyExpired':
+            self.logger.warning("Listen key expired")
+            self._schedule_restart()
+
+    @staticmethod
+    def _order_from_event(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: data[key] for key, field in ORDER_EVENT_FIELDS.items() if key in data}
+
+    def _upsert_order(self, order: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        order_id = int(order['orderId'])
+        with self._lock:
+            current = self.orders.get(order_id)
+            if current is not None and current.get('updateTime', 0) > order.get('updateTime', 0):
+                return None
+            merged = dict(current or {})
+            merged.update(order)
+            self.orders[order_id] = merged
+            self.orders.move_to_end(order_id)
+            while len(self.orders) > self.max_orders:
+                self.orders.popitem(last=False)
+            return dict(merged)
+
+    def _apply_balances(self, updates: List[Dict[str, Any]], event_time: Optional[int]) -> List[Dict[str, Any]]:
+        changed = []
+        with self._lock:
+            for update in updates:
+                balance = self.balances.get(update['a'])
+                if balance is None:
+                    # A new asset has no availableBalance yet; the REST refresh adds it
+                    continue
+                if event_time and balance.get('updateTime', 0) > event_time:
+                    continue
+                balance['balance'] = update['wb']
+                balance['crossWalletBalance'] = update.get('cw', balance['crossWalletBalance'])
+                if event_time:
+                    balance['updateTime'] = event_time
+                changed.append(dict(balance))
+        return changed
+
+    def remember_order(self, order: Dict[str, Any]):
+        """Record an order fetched or placed over REST so later reads are served locally."""
+        if 'orderId' in order:
+            self._upsert_order(order)
+
+    def get_order(self, order_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            order = self.orders.get(int(order_id))
+            return dict(order) if order is not None else None
+
+    def get_balances(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(b) for b in self.balances.values()]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'ready': self._ready,
+                'orders_tracked': len(self.orders),
+                'assets_tracked': len(self.balances),
+                'events': self.events,
+                'reconnects': self.reconnects,
+                'seconds_since_last_event': (
+                    round(time.monotonic() - self.last_event_at, 3) if self.last_event_at else None
+                ),
+            }
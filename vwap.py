@@ -0,0 +1,144 @@
+"""Intraday volume profiles and randomized VWAP slice schedules."""
+import random
+from typing import Optional, List, Sequence, Tuple
+
+from lazy_imports import lazy_import
+
+
+np = lazy_import('numpy')
+
+MINUTES_PER_DAY = 1440
+
+
+class VolumeProfile:
+    """Expected share of daily volume per minute of the UTC day."""
+
+    def __init__(self, minute_weights: Sequence[float], source: str = 'custom',
+                 daily_volume: Optional[float] = None):
+        if len(minute_weights) != MINUTES_PER_DAY:
+            raise ValueError(f"Volume profile needs {MINUTES_PER_DAY} minute weights. Got: {len(minute_weights)}")
+        total = float(sum(minute_weights))
+        if total <= 0:
+            raise ValueError("Volume profile weights must sum to a positive value")
+        self.weights = [float(w) / total for w in minute_weights]
+        self.source = source
+        # Average base-asset volume per day, when known; lets live volume be compared to the profile
+        self.daily_volume = daily_volume
+        # Prefix sums so the share of any window is two lookups
+        self._cumulative = [0.0]
+        for weight in self.weights:
+            self._cumulative.append(self._cumulative[-1] + weight)
+
+    @classmethod
+    def flat(cls) -> 'VolumeProfile':
+        return cls([1.0] * MINUTES_PER_DAY, source='flat')
+
+    @classmethod
+    def from_klines(cls, open_times, volumes, interval_ms: int = 60_000,
+                    source: str = 'klines') -> 'VolumeProfile':
+        """Average volume by minute of day; each bar's volume is spread over the minutes it covers."""
+        open_times = np.asarray(open_times, dtype=np.int64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if not len(open_times):
+            raise ValueError("No klines to build a volume profile from")
+        span = max(1, int(interval_ms // 60_000))
+        minutes = (open_times // 60_000) % MINUTES_PER_DAY
+        weights = np.zeros(MINUTES_PER_DAY)
+        for offset in range(span):
+            np.add.at(weights, (minutes + offset) % MINUTES_PER_DAY, volumes / span)
+        days = max((int(open_times.max()) - int(open_times.min()) + interval_ms) / 86_400_000,
+                   1 / MINUTES_PER_DAY)
+        return cls(weights.tolist(), source=source, daily_volume=float(volumes.sum()) / days)
+
+    def expected_volume(self, start: float, end: float) -> Optional[float]:
+        if self.daily_volume is None:
+            return None
+        return self.share(start, end) * self.daily_volume
+
+    def share(self, start: float, end: float) -> float:
+        """Expected share of daily volume between two epoch-second timestamps."""
+        if end <= start:
+            return 0.0
+        start_minute, end_minute = start / 60.0, end / 60.0
+        days, remainder = divmod(end_minute - start_minute, MINUTES_PER_DAY)
+        offset = start_minute % MINUTES_PER_DAY
+        return days + self._share_within_day(offset, offset + remainder)
+
+    def _share_within_day(self, start_minute: float, end_minute: float) -> float:
+        if end_minute > MINUTES_PER_DAY:
+            return (self._share_within_day(start_minute, MINUTES_PER_DAY)
+                    + self._share_within_day(0.0, end_minute - MINUTES_PER_DAY))
+        return self._cumulative_at(end_minute) - self._cumulative_at(start_minute)
+
+    def _cumulative_at(self, minute: float) -> float:
+        whole = min(int(minute), MINUTES_PER_DAY)
+        value = self._cumulative[whole]
+        if whole < MINUTES_PER_DAY:
+            value += self.weights[whole] * (minute - whole)
+        return value
+
+
+def plan_vwap_slices(profile: VolumeProfile, start: float, duration_seconds: float, num_orders: int,
+                     time_jitter: float = 0.3, size_jitter: float = 0.1,
+                     rng: Optional[random.Random] = None) -> List[Tuple[float, float, float]]:
+    """Return ``(send_time, window_seconds, fraction)`` per slice, weighted by profile volume and jittered."""
+    if not 0 <= time_jitter < 1:
+        raise ValueError(f"Time jitter must be in [0, 1). Got: {time_jitter}")
+    if not 0 <= size_jitter < 1:
+        raise ValueError(f"Size jitter must be in [0, 1). Got: {size_jitter}")
+    rng = rng or random.Random()
+    window = duration_seconds / num_orders
+
+    weights = []
+    for i in range(num_orders):
+        expected = profile.share(start + i * window, start + (i + 1) * window)
+        # A zero-volume window still gets a token share so every slice is placed
+        weight = max(expected, 1e-9) * (1 + rng.uniform(-size_jitter, size_jitter))
+        weights.append(weight)
+    total = sum(weights)
+
+    return [
+        (start + i * window + rng.uniform(0, time_jitter) * window, window, weight / total)
+        for i, weight in enumerate(weights)
+    ]
+
+
+class VwapRun:
+    """Schedule, fills and carried quantity of one VWAP execution, worked by ``BasicBot.run_vwap_step``."""
+
+    def __init__(self, symbol: str, side: str, total_quantity: float, profile: VolumeProfile,
+                 schedule: List[Tuple[float, float, float]], start: float, arrival_price: Optional[float],
+                 participation_cap: float, limit_offset_ticks: Optional[int], limit_wait_fraction: float):
+        self.symbol = symbol
+        self.side = side
+        self.total_quantity = total_quantity
+        self.profile = profile
+        self.schedule = schedule
+        self.start = start
+        self.arrival_price = arrival_price
+        self.participation_cap = participation_cap
+        self.limit_offset_ticks = limit_offset_ticks
+        self.limit_wait_fraction = limit_wait_fraction
+
+        self.index = 0
+        self.fills: List[dict] = []
+        self.executed = 0.0
+        self.carry = 0.0
+        # Passive child resting on the book until its deadline: slice, order, quantity, target, deadline
+        self.working: Optional[dict] = None
+        # Live volume for the first slice is measured over one window before it
+        self.last_check = start - schedule[0][1]
+
+    @property
+    def num_orders(self) -> int:
+        return len(self.schedule)
+
+    @property
+    def done(self) -> bool:
+        return self.working is None and (self.index >= self.num_orders or self.executed >= self.total_quantity)
+
+    def next_due_time(self) -> float:
+        """The working child's deadline, else the next slice's send time."""
+        if self.working is not None:
+            return self.working['deadline']
+        return self.schedule[self.index][0]